@@ -0,0 +1,246 @@
+"""
+Banking Analytics API
+FastAPI service exposing BankingAnalytics results to Looker and other BI consumers.
+
+The engine is built once at startup and kept warm. Every result is
+addressed by the data version plus its query parameters, which gives a
+strong ETag; identical requests in flight at the same time share a single
+computation, and finished payloads are kept in a small LRU cache.
+
+Run with: uvicorn backend.api.main:app --port 8000
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import sys
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services.analytics_engine import BankingAnalytics
+from backend.services.data_generator import BankingDataGenerator
+from backend.services.query_plan import RESULT_NAMES
+from backend.services.risk_model import MicroBatchScorer, RiskModel, build_features
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow responses are optional
+    pa = None
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+CACHE_MAX_AGE = int(os.environ.get('BANKING_API_CACHE_MAX_AGE', '300'))
+RESULT_CACHE_SIZE = int(os.environ.get('BANKING_API_RESULT_CACHE_SIZE', '256'))
+RISK_MODEL_PATH = os.environ.get('BANKING_RISK_MODEL', 'models/risk_model.joblib')
+RISK_MAX_BATCH_ROWS = int(os.environ.get('BANKING_RISK_MAX_BATCH_ROWS', '256'))
+RISK_MAX_WAIT_MS = float(os.environ.get('BANKING_RISK_MAX_WAIT_MS', '5'))
+
+
+def load_engine() -> BankingAnalytics:
+    """Build the engine from the CSV exports, or from generated data when absent."""
+    data_path = os.environ.get('BANKING_DATA_DIR', 'data')
+    files = {name: os.path.join(data_path, f'{name}.csv')
+             for name in ('customers', 'transactions', 'products')}
+    if all(os.path.exists(path) for path in files.values()):
+        frames = {name: pd.read_csv(path) for name, path in files.items()}
+    else:
+        num_customers = int(os.environ.get('BANKING_NUM_CUSTOMERS', '5000'))
+        frames = BankingDataGenerator().generate_complete_dataset(num_customers)
+    return BankingAnalytics(frames['customers'], frames['transactions'], frames['products'])
+
+
+def load_scorer(engine: BankingAnalytics) -> MicroBatchScorer:
+    """Micro-batching risk scorer, from the saved model or a model trained on the engine."""
+    if os.path.exists(RISK_MODEL_PATH):
+        model = RiskModel.load(RISK_MODEL_PATH)
+    else:
+        model = RiskModel.train_from(engine)
+    features = build_features(engine.customers, engine.transactions, engine.products)
+    return MicroBatchScorer(model, features, RISK_MAX_BATCH_ROWS, RISK_MAX_WAIT_MS)
+
+
+def data_version(engine: BankingAnalytics) -> str:
+    """Content hash of the engine frames; changes whenever the data does."""
+    digest = hashlib.sha256()
+    for frame in (engine.customers, engine.transactions, engine.products):
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+class RequestCoalescer:
+    """Share one computation between identical concurrent requests."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.computations = 0
+
+    async def run(self, key: str, func: Callable, *args):
+        task = self._inflight.get(key)
+        if task is None:
+            # The computation is its own task, so cancelling the request that
+            # started it does not strand the others waiting on its result
+            task = asyncio.ensure_future(asyncio.to_thread(func, *args))
+            self._inflight[key] = task
+            self.computations += 1
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved when nobody else was waiting on it
+            task.exception()
+
+
+class ResultCache:
+    """Bounded LRU of serialized payloads keyed by ETag."""
+
+    def __init__(self, max_size: int = RESULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._items: OrderedDict = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        if key not in self._items:
+            return None
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def put(self, key: str, payload: bytes):
+        self._items[key] = payload
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+
+def to_frame(result) -> pd.DataFrame:
+    if isinstance(result, dict):
+        return pd.DataFrame([result])
+    return result
+
+
+def serialize(result, media_type: str) -> bytes:
+    frame = to_frame(result)
+    if media_type == ARROW_MEDIA_TYPE:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue()
+    if isinstance(result, dict):
+        return pd.Series(result).to_json().encode()
+    return frame.to_json(orient='records', date_format='iso').encode()
+
+
+def negotiate(request: Request, format: Optional[str]) -> str:
+    wants_arrow = format == 'arrow' or (
+        format is None and ARROW_MEDIA_TYPE in request.headers.get('accept', ''))
+    if not wants_arrow:
+        return 'application/json'
+    if pa is None:
+        raise HTTPException(status_code=406, detail='pyarrow is not installed')
+    return ARROW_MEDIA_TYPE
+
+
+def create_app(engine_factory: Callable[[], BankingAnalytics] = load_engine) -> FastAPI:
+    """Create the API; ``engine_factory`` is called once at startup."""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        engine = await asyncio.to_thread(engine_factory)
+        app.state.engine = engine
+        app.state.version = await asyncio.to_thread(data_version, engine)
+        yield
+        if app.state.scorer is not None:
+            app.state.scorer.close()
+
+    app = FastAPI(title='Banking Analytics API', lifespan=lifespan)
+    app.state.coalescer = RequestCoalescer()
+    app.state.cache = ResultCache()
+    app.state.scorer = None
+    scorer_lock = asyncio.Lock()
+
+    def compute(name: str, filters: Tuple, media_type: str) -> bytes:
+        start, end, segments, product_types, channels = filters
+        query = app.state.engine.query()
+        if start is not None or end is not None:
+            transaction_dates = app.state.engine.transactions['transaction_date']
+            query = query.between(start or transaction_dates.min(), end or transaction_dates.max())
+        if segments:
+            query = query.segments(segments)
+        if product_types:
+            query = query.product_types(product_types)
+        if channels:
+            query = query.channels(channels)
+        return serialize(getattr(query, name)(), media_type)
+
+    @app.get('/health')
+    async def health():
+        return {'status': 'ok', 'data_version': app.state.version}
+
+    @app.get('/analytics')
+    async def list_results():
+        return {'results': sorted(RESULT_NAMES)}
+
+    @app.get('/analytics/{name}')
+    async def analytics_result(
+        name: str,
+        request: Request,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        segments: Optional[List[str]] = Query(None),
+        product_types: Optional[List[str]] = Query(None),
+        channels: Optional[List[str]] = Query(None),
+        format: Optional[str] = Query(None, pattern='^(json|arrow)$'),
+    ):
+        if name not in RESULT_NAMES:
+            raise HTTPException(status_code=404, detail=f"Unknown result '{name}'")
+        media_type = negotiate(request, format)
+        filters = (start, end,
+                   tuple(sorted(segments or ())),
+                   tuple(sorted(product_types or ())),
+                   tuple(sorted(channels or ())))
+        key = hashlib.sha256(repr((app.state.version, name, filters, media_type)).encode()).hexdigest()
+        etag = f'"{key[:32]}"'
+        headers = {'ETag': etag, 'Cache-Control': f'public, max-age={CACHE_MAX_AGE}'}
+        if etag in request.headers.get('if-none-match', ''):
+            return Response(status_code=304, headers=headers)
+
+        payload = app.state.cache.get(key)
+        if payload is None:
+            payload = await app.state.coalescer.run(key, compute, name, filters, media_type)
+            app.state.cache.put(key, payload)
+        return Response(content=payload, media_type=media_type, headers=headers)
+
+    @app.get('/risk/{customer_id}')
+    async def risk(customer_id: str):
+        # Concurrent requests are answered by one vectorized predict per micro-batch
+        async with scorer_lock:
+            if app.state.scorer is None:
+                app.state.scorer = await asyncio.to_thread(load_scorer, app.state.engine)
+        try:
+            future = app.state.scorer.submit(customer_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"Unknown customer '{customer_id}'")
+        probability = await asyncio.wrap_future(future)
+        return {'customer_id': customer_id, 'risk_probability': probability}
+
+    @app.get('/risk')
+    async def risk_stats():
+        if app.state.scorer is None:
+            return {}
+        return app.state.scorer.stats()
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,357 @@
+"""
+Nightly KPI Pipeline
+Apache Beam batch pipeline computing daily KPIs, segment analysis, RFM
+scores and credit-risk scores from the warehouse load files.
+
+Every aggregation is a CombineFn, so runners lift the combiners and
+pre-aggregate on each worker before the shuffle; only one compact
+accumulator per key crosses the network. Per-customer transaction
+statistics are computed once and shared by the segment, RFM and
+credit-risk outputs.
+
+Runs on the DirectRunner locally and on a distributed runner (e.g.
+Dataflow) with the usual pipeline options:
+
+    python -m backend.pipelines.nightly_kpis \\
+        --customers 'data/customers.csv' \\
+        --transactions 'data/load/transactions/*/*.parquet' \\
+        --products 'data/products.csv' \\
+        --output out/kpis
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import argparse
+import bisect
+import csv
+import io
+import json
+import math
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import apache_beam as beam
+from apache_beam.io.filesystems import FileSystems
+from apache_beam.options.pipeline_options import PipelineOptions
+
+from backend.services.customer_risk import RISK_BOUNDS, RISK_LABELS, combine_m2, risk_score
+
+RFM_SEGMENTS = [(4, 'At Risk'), (7, 'Regular'), (10, 'Loyal'), (12, 'Champion')]
+
+
+# ── Reading ──────────────────────────────────────────────────────────
+
+def _csv_header(pattern: str) -> List[str]:
+    first = FileSystems.match([pattern])[0].metadata_list[0].path
+    with FileSystems.open(first) as handle:
+        return next(csv.reader(io.TextIOWrapper(handle, encoding='utf-8')))
+
+
+def read_table(pipeline, pattern: str, label: str):
+    """Read CSV or Parquet files matching ``pattern`` as dicts."""
+    if pattern.endswith('.parquet'):
+        return pipeline | f'Read {label}' >> beam.io.ReadFromParquet(pattern)
+    header = _csv_header(pattern)
+    return (
+        pipeline
+        | f'Read {label}' >> beam.io.ReadFromText(pattern, skip_header_lines=1)
+        | f'Split {label} lines' >> beam.Map(lambda line: dict(zip(header, next(csv.reader([line])))))
+    )
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1')
+    return bool(value)
+
+
+def _to_date(value) -> str:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+def parse_transaction(record: Dict) -> Dict:
+    return {
+        'customer_id': record['customer_id'],
+        'date': _to_date(record['transaction_date']),
+        'amount': float(record['amount']),
+        'is_fraud': _to_bool(record['is_fraud']),
+    }
+
+
+def parse_customer(record: Dict) -> Dict:
+    return {
+        'customer_id': record['customer_id'],
+        'segment': record['segment'],
+        'age': float(record['age']),
+        'income': float(record['income']),
+        'credit_score': float(record['credit_score']),
+        'is_active': _to_bool(record['is_active']),
+    }
+
+
+def parse_product(record: Dict) -> Dict:
+    return {'customer_id': record['customer_id'], 'balance': float(record['balance'])}
+
+
+# ── Combiners ────────────────────────────────────────────────────────
+
+class DailyKpiFn(beam.CombineFn):
+    """(transactions, volume, active customers, fraud) from per-(date, customer) partials."""
+
+    def create_accumulator(self):
+        return (0, 0.0, 0, 0)
+
+    def add_input(self, acc, partial):
+        count, volume, fraud = partial
+        return (acc[0] + count, acc[1] + volume, acc[2] + 1, acc[3] + fraud)
+
+    def merge_accumulators(self, accumulators):
+        return tuple(map(sum, zip(*accumulators)))
+
+    def extract_output(self, acc):
+        return acc
+
+
+class CustomerStatsFn(beam.CombineFn):
+    """Per-customer count, sum, centered sum of squares (M2), fraud count and last date."""
+
+    def create_accumulator(self):
+        return (0, 0.0, 0.0, 0, '')
+
+    def add_input(self, acc, txn):
+        m2 = float(combine_m2(acc[0], acc[1], acc[2], 1, txn['amount'], 0.0))
+        return (acc[0] + 1, acc[1] + txn['amount'], m2,
+                acc[3] + int(txn['is_fraud']), max(acc[4], txn['date']))
+
+    def merge_accumulators(self, accumulators):
+        count, total, m2, fraud, last = 0, 0.0, 0.0, 0, ''
+        for acc in accumulators:
+            m2 = float(combine_m2(count, total, m2, acc[0], acc[1], acc[2]))
+            count += acc[0]
+            total += acc[1]
+            fraud += acc[3]
+            last = max(last, acc[4])
+        return (count, total, m2, fraud, last)
+
+    def extract_output(self, acc):
+        return acc
+
+
+class SumTuplesFn(beam.CombineFn):
+    """Element-wise sum of fixed-length numeric tuples."""
+
+    def __init__(self, width: int):
+        self.width = width
+
+    def create_accumulator(self):
+        return (0,) * self.width
+
+    def add_input(self, acc, value):
+        return tuple(a + v for a, v in zip(acc, value))
+
+    def merge_accumulators(self, accumulators):
+        return tuple(map(sum, zip(*accumulators)))
+
+    def extract_output(self, acc):
+        return acc
+
+
+# ── Output rows ──────────────────────────────────────────────────────
+
+def daily_kpi_row(item: Tuple[str, Tuple]) -> Dict:
+    day, (count, volume, active, fraud) = item
+    return {
+        'transaction_date': day,
+        'daily_transactions': count,
+        'daily_volume': round(volume, 2),
+        'daily_active_customers': active,
+        'daily_fraud_count': fraud,
+        'daily_fraud_rate': fraud / count if count else None,
+    }
+
+
+def segment_row(item: Tuple[str, Tuple]) -> Dict:
+    segment, (customers, age, income, credit, balance, products, txns, volume, fraud) = item
+    return {
+        'segment': segment,
+        'customer_count': customers,
+        'avg_age': round(age / customers, 2),
+        'avg_income': round(income / customers, 2),
+        'avg_credit_score': round(credit / customers, 2),
+        'total_balance': round(balance, 2),
+        'avg_balance': round(balance / products, 2) if products else None,
+        'total_transactions': txns,
+        'total_transaction_volume': round(volume, 2),
+        'fraud_count': fraud,
+    }
+
+
+def _std(count: int, m2: float) -> float:
+    """Sample standard deviation; 0 when undefined, as after the engine's fillna(0)."""
+    if count < 2:
+        return 0.0
+    return math.sqrt(m2 / (count - 1))
+
+
+def credit_risk_row(customer: Dict, stats: Optional[Tuple]) -> Dict:
+    """Risk score and level from customer_risk, as BankingAnalytics.score_risk."""
+    count, total, m2, fraud, _ = stats or (0, 0.0, 0.0, 0, '')
+    avg = total / count if count else 0.0
+    std = _std(count, m2)
+    score = float(risk_score(fraud, std, avg, customer['credit_score']))
+    level = RISK_LABELS[bisect.bisect_left(RISK_BOUNDS, score)]
+    return {
+        'customer_id': customer['customer_id'],
+        'segment': customer['segment'],
+        'credit_score': customer['credit_score'],
+        'txn_count': count,
+        'total_amount': round(total, 2),
+        'avg_amount': round(avg, 2),
+        'std_amount': round(std, 2),
+        'fraud_count': fraud,
+        'risk_score': score,
+        'risk_level': level,
+    }
+
+
+def _quartile(value: float, bounds: List[float]) -> int:
+    """1-4 quartile of ``value`` given the approximate quantiles [min, q1, q2, q3, max]."""
+    return min(bisect.bisect_right(bounds[1:4], value) + 1, 4)
+
+
+def rfm_row(item: Tuple[str, Tuple], reference: str, quantiles: Dict[str, List[float]]) -> Dict:
+    customer_id, (count, total, _, _, last) = item
+    recency = (date.fromisoformat(reference) - date.fromisoformat(last)).days
+    scores = {
+        'recency_score': 5 - _quartile(recency, quantiles['recency']),
+        'frequency_score': _quartile(count, quantiles['frequency']),
+        'monetary_score': _quartile(total, quantiles['monetary']),
+    }
+    rfm_score = sum(scores.values())
+    return {
+        'customer_id': customer_id,
+        'recency': recency,
+        'frequency': count,
+        'monetary': round(total, 2),
+        **scores,
+        'rfm_score': rfm_score,
+        'segment': next(label for bound, label in RFM_SEGMENTS if rfm_score <= bound),
+    }
+
+
+# ── Pipeline ─────────────────────────────────────────────────────────
+
+class NightlyKpis(beam.PTransform):
+    """Parsed (customers, transactions, products) -> dict of result PCollections."""
+
+    def expand(self, tables):
+        customers, transactions, products = tables
+
+        daily_kpis = (
+            transactions
+            | 'Key by day and customer' >> beam.Map(
+                lambda t: ((t['date'], t['customer_id']), (1, t['amount'], int(t['is_fraud']))))
+            | 'Combine day-customer' >> beam.CombinePerKey(SumTuplesFn(3))
+            | 'Key by day' >> beam.Map(lambda kv: (kv[0][0], kv[1]))
+            | 'Combine day' >> beam.CombinePerKey(DailyKpiFn())
+            | 'Daily KPI rows' >> beam.Map(daily_kpi_row)
+        )
+
+        customer_stats = (
+            transactions
+            | 'Key by customer' >> beam.Map(lambda t: (t['customer_id'], t))
+            | 'Combine customer' >> beam.CombinePerKey(CustomerStatsFn())
+        )
+        product_stats = (
+            products
+            | 'Key products' >> beam.Map(lambda p: (p['customer_id'], (1, p['balance'])))
+            | 'Combine products' >> beam.CombinePerKey(SumTuplesFn(2))
+        )
+        keyed_customers = customers | 'Key customers' >> beam.Map(lambda c: (c['customer_id'], c))
+        joined = (
+            {'customer': keyed_customers, 'txn': customer_stats, 'products': product_stats}
+            | 'Join customer stats' >> beam.CoGroupByKey()
+            | 'Drop orphans' >> beam.Filter(lambda kv: kv[1]['customer'])
+        )
+
+        def segment_partial(kv):
+            rows = kv[1]
+            customer = rows['customer'][0]
+            if not customer['is_active']:
+                return
+            count, total, _, fraud, _ = rows['txn'][0] if rows['txn'] else (0, 0.0, 0.0, 0, '')
+            n_products, balance = rows['products'][0] if rows['products'] else (0, 0.0)
+            yield customer['segment'], (1, customer['age'], customer['income'],
+                                        customer['credit_score'], balance, n_products,
+                                        count, total, fraud)
+
+        segment_analysis = (
+            joined
+            | 'Segment partials' >> beam.FlatMap(segment_partial)
+            | 'Combine segment' >> beam.CombinePerKey(SumTuplesFn(9))
+            | 'Segment rows' >> beam.Map(segment_row)
+        )
+
+        credit_risk = joined | 'Credit risk rows' >> beam.Map(
+            lambda kv: credit_risk_row(kv[1]['customer'][0], kv[1]['txn'][0] if kv[1]['txn'] else None))
+
+        last_day = (
+            customer_stats
+            | 'Last dates' >> beam.Map(lambda kv: kv[1][4])
+            | 'Max date' >> beam.CombineGlobally(lambda dates: max(dates, default=''))
+        )
+        reference = last_day | 'Reference date' >> beam.Map(
+            lambda day: (date.fromisoformat(day) + timedelta(days=1)).isoformat() if day else day)
+        metric_values = customer_stats | 'RFM metrics' >> beam.FlatMap(
+            lambda kv, ref: [('recency', (date.fromisoformat(ref) - date.fromisoformat(kv[1][4])).days),
+                             ('frequency', kv[1][0]),
+                             ('monetary', kv[1][1])],
+            ref=beam.pvalue.AsSingleton(reference))
+        quantiles = (
+            metric_values
+            | 'RFM quartiles' >> beam.ApproximateQuantiles.PerKey(5)
+        )
+        rfm = customer_stats | 'RFM rows' >> beam.Map(
+            rfm_row, reference=beam.pvalue.AsSingleton(reference),
+            quantiles=beam.pvalue.AsDict(quantiles))
+
+        return {
+            'daily_kpis': daily_kpis,
+            'segment_analysis': segment_analysis,
+            'rfm_scores': rfm,
+            'credit_risk': credit_risk,
+        }
+
+
+def build_pipeline(pipeline, customers: str, transactions: str, products: str, output: str):
+    tables = (
+        read_table(pipeline, customers, 'customers') | 'Parse customers' >> beam.Map(parse_customer),
+        read_table(pipeline, transactions, 'transactions') | 'Parse transactions' >> beam.Map(parse_transaction),
+        read_table(pipeline, products, 'products') | 'Parse products' >> beam.Map(parse_product),
+    )
+    results = tables | 'Nightly KPIs' >> NightlyKpis()
+    for name, rows in results.items():
+        (rows
+         | f'Serialize {name}' >> beam.Map(json.dumps)
+         | f'Write {name}' >> beam.io.WriteToText(
+             f'{output}/{name}/part', file_name_suffix='.jsonl.gz'))
+    return results
+
+
+def run(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Nightly KPI and RFM pipeline')
+    parser.add_argument('--customers', required=True, help='customers file pattern (CSV or Parquet)')
+    parser.add_argument('--transactions', required=True, help='transactions file pattern (CSV or Parquet)')
+    parser.add_argument('--products', required=True, help='products file pattern (CSV or Parquet)')
+    parser.add_argument('--output', required=True, help='output directory or bucket prefix')
+    args, pipeline_args = parser.parse_known_args(argv)
+    with beam.Pipeline(options=PipelineOptions(pipeline_args)) as pipeline:
+        build_pipeline(pipeline, args.customers, args.transactions, args.products, args.output)
+
+
+if __name__ == '__main__':
+    run()
@@ -9,9 +9,23 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
-import warnings
 
-warnings.filterwarnings('ignore')
+from .cdc import ChangeDataCapture
+from .cohorts import CohortMatrix
+from .customer_risk import risk_level, risk_score
+from .leaderboard import Leaderboard
+from .query_plan import AnalyticsQuery, extend_transaction_indexes
+from .sampling import ApproximateQuery, StratifiedSample
+
+
+def _own(frame: pd.DataFrame) -> pd.DataFrame:
+    """A copy of ``frame`` that later writes on either side cannot leak through.
+
+    Under copy-on-write (always on from pandas 3) a shallow copy suffices
+    and keeps memory-mapped columns mapped; older pandas needs a deep copy.
+    """
+    copy_on_write = int(pd.__version__.split('.')[0]) >= 3 or pd.get_option('mode.copy_on_write') is True
+    return frame.copy(deep=not copy_on_write)
 
 
 class BankingAnalytics:
@@ -20,9 +34,9 @@ class BankingAnalytics:
     def __init__(self, customers_df: pd.DataFrame,
                  transactions_df: pd.DataFrame,
                  products_df: pd.DataFrame):
-        self.customers = customers_df.copy()
-        self.transactions = transactions_df.copy()
-        self.products = products_df.copy()
+        self.customers = _own(customers_df)
+        self.transactions = _own(transactions_df)
+        self.products = _own(products_df)
 
         if 'transaction_date' in self.transactions.columns:
             self.transactions['transaction_date'] = pd.to_datetime(self.transactions['transaction_date'])
@@ -30,6 +44,84 @@ class BankingAnalytics:
             self.customers['account_opening_date'] = pd.to_datetime(self.customers['account_opening_date'])
         if 'opening_date' in self.products.columns:
             self.products['opening_date'] = pd.to_datetime(self.products['opening_date'])
+        self._indexes: Dict = {}
+        self._cdc: Optional[ChangeDataCapture] = None
+        self._sample: Optional[StratifiedSample] = None
+        self._leaderboard: Optional[Leaderboard] = None
+        self._cohorts: Optional[CohortMatrix] = None
+
+    def query(self) -> AnalyticsQuery:
+        """Start a lazy, chainable query, e.g. ``query().between(a, b).daily_volume()``."""
+        return AnalyticsQuery(self)
+
+    def change_capture(self) -> ChangeDataCapture:
+        """Incremental upsert/CDC path for products and customers.
+
+        Once enabled, product performance and segment analysis over the
+        engine's own frames are served from aggregates maintained by delta.
+        """
+        if self._cdc is None:
+            self._cdc = ChangeDataCapture(self)
+        return self._cdc
+
+    def sample(self) -> StratifiedSample:
+        """Persistent stratified sample of the transactions, rebuilt once they change."""
+        if self._sample is None or not self._sample.is_current():
+            self._sample = StratifiedSample(self)
+        return self._sample
+
+    def approximate(self, latency_target: float = 0.05, confidence: float = 0.95) -> ApproximateQuery:
+        """Fraud, channel and volume estimates with confidence intervals over all transactions."""
+        return self.query().approximate(latency_target, confidence=confidence)
+
+    def leaderboard(self, capacity: int = 100) -> Leaderboard:
+        """Running top-K customer leaderboards, kept current by append_transactions."""
+        if (self._leaderboard is None or self._leaderboard.customers is not self.customers
+                or self._leaderboard.capacity < capacity):
+            self._leaderboard = Leaderboard(self, capacity)
+        return self._leaderboard
+
+    def top_customers(self, metric: str = 'volume', k: int = 10) -> pd.DataFrame:
+        """Top ``k`` customers by 'volume', 'transactions', 'fraud_exposure' or 'risk_score'."""
+        return self.leaderboard().top(metric, k)
+
+    def cohorts(self) -> CohortMatrix:
+        """Monthly cohort activity and retention matrices, extended by append_transactions."""
+        if self._cohorts is None or self._cohorts.customers is not self.customers:
+            self._cohorts = CohortMatrix(self)
+        return self._cohorts
+
+    def append_transactions(self, transactions_df: pd.DataFrame):
+        """Append new transactions, invalidating their indexes and extending the running state."""
+        transactions_df = transactions_df.copy()
+        transactions_df['transaction_date'] = pd.to_datetime(transactions_df['transaction_date'])
+        self.transactions = pd.concat([self.transactions, transactions_df], ignore_index=True)
+        self.transactions_changed(appended=transactions_df)
+
+    def transactions_changed(self, appended: Optional[pd.DataFrame] = None):
+        """Bring the transaction indexes and running state up to date.
+
+        ``appended`` rows, the tail of ``self.transactions``, extend the
+        indexes, leaderboard and cohorts incrementally; without them
+        existing rows were rewritten, so all are rebuilt on next use.
+        """
+        if appended is None:
+            for key in [k for k in self._indexes
+                        if k == 'transaction_date' or (isinstance(k, tuple) and k[0] == 'transactions')]:
+                self._indexes.pop(key)
+            self._leaderboard = None
+            self._cohorts = None
+            return
+        extend_transaction_indexes(self, len(appended))
+        if self._leaderboard is not None:
+            self._leaderboard.append(appended)
+        if self._cohorts is not None:
+            self._cohorts.extend(appended)
+
+    def customers_changed(self):
+        """Rebuild customer-derived running state (risk scores, cohorts) on next use."""
+        self._leaderboard = None
+        self._cohorts = None
 
     def get_daily_transaction_volume(self, transactions_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
         if transactions_df is None:
@@ -50,6 +142,8 @@ class BankingAnalytics:
 
     def get_customer_segment_analysis(self, customers_df: Optional[pd.DataFrame] = None,
                                       products_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        if customers_df is None and products_df is None and self._cdc is not None:
+            return self._cdc.segment_analysis()
         if customers_df is None:
             customers_df = self.customers
         if products_df is None:
@@ -93,6 +187,8 @@ class BankingAnalytics:
         return daily_fraud.sort_values('date')
 
     def get_product_performance(self, products_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        if products_df is None and self._cdc is not None:
+            return self._cdc.product_performance()
         if products_df is None:
             products_df = self.products
         product_performance = products_df.groupby('product_type').agg({
@@ -155,19 +251,29 @@ class BankingAnalytics:
         }).reset_index()
         customer_txn.columns = ['customer_id', 'total_amount', 'avg_amount', 'std_amount',
                                 'txn_count', 'fraud_count']
+        return self.score_risk(customers_df, customer_txn)
+
+    @staticmethod
+    def score_risk(customers_df: pd.DataFrame, customer_txn: pd.DataFrame) -> pd.DataFrame:
+        """Score customers from per-customer transaction aggregates.
+
+        ``customer_txn`` holds customer_id, total_amount, avg_amount,
+        std_amount, txn_count and fraud_count.
+        """
         risk_df = customers_df.merge(customer_txn, on='customer_id', how='left').fillna(0)
-        risk_df['risk_score'] = (
-            (risk_df['fraud_count'] * 50) +
-            (risk_df['std_amount'] / risk_df['avg_amount'].replace(0, 1) * 10) +
-            ((850 - risk_df['credit_score']) / 10)
-        ).round(2)
-        risk_df['risk_level'] = pd.cut(
-            risk_df['risk_score'],
-            bins=[-float('inf'), 10, 25, 50, float('inf')],
-            labels=['Low', 'Medium', 'High', 'Critical']
-        )
+        risk_df['risk_score'] = risk_score(risk_df['fraud_count'], risk_df['std_amount'],
+                                           risk_df['avg_amount'], risk_df['credit_score'])
+        risk_df['risk_level'] = risk_level(risk_df['risk_score'])
         return risk_df
 
+    def stress_test(self, scenarios: int = 10000, seed: int = 42, workers: Optional[int] = None,
+                    memory_cap_mb: float = 64) -> pd.DataFrame:
+        """Monte Carlo loss quantiles per segment for the product balances."""
+        # scipy is only needed here; keep it out of the engine's import time
+        from .stress_test import StressTest
+        result = StressTest(self.products, self.customers).run(scenarios, seed, workers, memory_cap_mb)
+        return result.quantiles()
+
     def generate_insights(self) -> Dict[str, str]:
         insights = {}
         top_segment = self.customers['segment'].value_counts().index[0]
@@ -0,0 +1,291 @@
+"""
+Change Data Capture
+Incremental upserts for the products and customers tables.
+
+Rows are keyed by (customer_id, product_type) for products and by
+customer_id for customers, and a hash of each row's values is kept so a
+full snapshot can be diffed into inserts, updates and deletes without
+comparing every column. Applying a change set touches only the changed
+rows: updates are written in place through a persistent key index,
+inserts and deletes rebuild the frame once per batch, and the
+product-performance and segment aggregates move by the delta of the
+changed rows.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from typing import Dict, List
+
+PRODUCT_KEY = ['customer_id', 'product_type']
+CUSTOMER_KEY = ['customer_id']
+
+# Audit columns are stamped on apply and never part of change detection
+AUDIT_COLUMNS = ['created_at', 'updated_at']
+
+_SEGMENT_STATS = ['balance_sum', 'balance_count', 'rows', 'income_sum', 'credit_sum', 'customers']
+
+
+def key_index(df: pd.DataFrame, key: List[str]) -> pd.Index:
+    """Index of the key values of ``df``, aligned with its rows."""
+    if len(key) > 1:
+        return pd.MultiIndex.from_frame(df[key])
+    return pd.Index(df[key[0]])
+
+
+def row_hashes(df: pd.DataFrame, key: List[str]) -> np.ndarray:
+    """64-bit hash of each row's non-key, non-audit values."""
+    values = [c for c in df.columns if c not in key and c not in AUDIT_COLUMNS]
+    return pd.util.hash_pandas_object(df[values], index=False).to_numpy().copy()
+
+
+class ChangeSet:
+    """Inserted, updated and deleted rows of one table."""
+
+    def __init__(self, inserts: pd.DataFrame, updates: pd.DataFrame, deletes: pd.DataFrame):
+        self.inserts = inserts
+        self.updates = updates
+        self.deletes = deletes
+
+    def __len__(self) -> int:
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+    def summary(self) -> Dict[str, int]:
+        return {'inserts': len(self.inserts), 'updates': len(self.updates), 'deletes': len(self.deletes)}
+
+    @classmethod
+    def from_feed(cls, feed: pd.DataFrame, op_column: str = 'op') -> 'ChangeSet':
+        """Split a change feed whose ``op`` column holds 'I', 'U' or 'D'."""
+        ops = feed[op_column].str.upper()
+        rows = feed.drop(columns=op_column)
+        return cls(rows[ops == 'I'], rows[ops == 'U'], rows[ops == 'D'])
+
+
+class _KeyedTable:
+    """Key -> row position index and row hashes of one engine frame."""
+
+    def __init__(self, engine, table: str, key: List[str]):
+        self.engine = engine
+        self.table = table
+        self.key = key
+        self.reindex()
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        return getattr(self.engine, self.table)
+
+    def reindex(self):
+        self.index = key_index(self.frame, self.key)
+        self.hashes = row_hashes(self.frame, self.key)
+
+    def positions(self, rows: pd.DataFrame) -> np.ndarray:
+        return self.index.get_indexer(key_index(rows, self.key))
+
+    def normalize(self, changes: ChangeSet) -> ChangeSet:
+        """Upsert semantics: route rows by whether their key exists."""
+        upserts = pd.concat([changes.updates, changes.inserts], ignore_index=True)
+        # The last change to a key within one batch wins
+        upserts = upserts[~key_index(upserts, self.key).duplicated(keep='last')]
+        exists = self.positions(upserts) >= 0 if len(upserts) else np.zeros(0, dtype=bool)
+        deletes = changes.deletes
+        if len(deletes):
+            deletes = deletes[self.positions(deletes) >= 0]
+        return ChangeSet(upserts[~exists], upserts[exists], deletes)
+
+    def diff(self, snapshot: pd.DataFrame) -> ChangeSet:
+        new_index = key_index(snapshot, self.key)
+        positions = self.index.get_indexer(new_index)
+        inserted = positions < 0
+        changed = ~inserted
+        changed[changed] = row_hashes(snapshot[changed], self.key) != self.hashes[positions[changed]]
+        deleted = ~self.index.isin(new_index)
+        return ChangeSet(snapshot[inserted], snapshot[changed], self.frame[deleted])
+
+    def apply(self, changes: ChangeSet):
+        """Write ``changes`` into the engine frame."""
+        frame = self.frame
+        now = pd.Timestamp(datetime.now())
+        if len(changes.updates):
+            positions = self.positions(changes.updates)
+            for column in changes.updates.columns:
+                if column in frame.columns and column not in self.key:
+                    frame.iloc[positions, frame.columns.get_loc(column)] = changes.updates[column].to_numpy()
+            if 'updated_at' in frame.columns:
+                frame.iloc[positions, frame.columns.get_loc('updated_at')] = now
+            self.hashes[positions] = row_hashes(frame.iloc[positions], self.key)
+        if len(changes.deletes) or len(changes.inserts):
+            if len(changes.deletes):
+                keep = np.ones(len(frame), dtype=bool)
+                keep[self.positions(changes.deletes)] = False
+                frame = frame[keep]
+            if len(changes.inserts):
+                inserts = changes.inserts.reindex(columns=frame.columns)
+                for column in AUDIT_COLUMNS:
+                    if column in frame.columns:
+                        inserts[column] = now
+                frame = pd.concat([frame, inserts], ignore_index=True)
+            setattr(self.engine, self.table, frame.reset_index(drop=True))
+            self.reindex()
+
+
+def _increment(total: pd.DataFrame, delta: pd.DataFrame, sign: float = 1.0) -> pd.DataFrame:
+    """Add ``delta`` into ``total`` row by row, growing it only for new keys."""
+    if delta.empty:
+        return total
+    missing = delta.index.difference(total.index)
+    if len(missing):
+        total = pd.concat([total, pd.DataFrame(0.0, index=missing, columns=total.columns)])
+    total.loc[delta.index, delta.columns] += delta.to_numpy() * sign
+    return total
+
+
+class ChangeDataCapture:
+    """Hash-tracked keyed state and delta-maintained aggregates for an engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._products = _KeyedTable(engine, 'products', PRODUCT_KEY)
+        self._customers = _KeyedTable(engine, 'customers', CUSTOMER_KEY)
+        self.rebuild()
+
+    # ── Aggregate state ──────────────────────────────────────────────
+
+    def rebuild(self):
+        """Recompute every aggregate from the current frames."""
+        products = self.engine.products
+        self._product_stats = self._product_stats_of(products)
+        self._customer_products = self._customer_products_of(products)
+        self._segment_stats = self._segment_contribution(self.engine.customers)
+
+    @staticmethod
+    def _product_stats_of(products: pd.DataFrame) -> pd.DataFrame:
+        return products.groupby('product_type').agg(
+            balance_sum=('balance', 'sum'),
+            balance_count=('balance', 'count'),
+            rows=('balance', 'size'),
+        ).astype(float)
+
+    @staticmethod
+    def _customer_products_of(products: pd.DataFrame) -> pd.DataFrame:
+        return products.groupby('customer_id').agg(
+            n=('balance', 'size'),
+            balance_sum=('balance', 'sum'),
+            balance_count=('balance', 'count'),
+        ).astype(float)
+
+    def _segment_contribution(self, customers: pd.DataFrame) -> pd.DataFrame:
+        """Per-segment sums that ``customers`` add to the left merge with products."""
+        held = self._customer_products.reindex(customers['customer_id']).fillna(0).to_numpy()
+        rows = np.maximum(held[:, 0], 1)
+        contribution = pd.DataFrame({
+            'segment': customers['segment'].to_numpy(),
+            'balance_sum': held[:, 1],
+            'balance_count': held[:, 2],
+            'rows': rows,
+            'income_sum': customers['income'].to_numpy() * rows,
+            'credit_sum': customers['credit_score'].to_numpy() * rows,
+            'customers': 1.0,
+        })
+        return contribution.groupby('segment')[_SEGMENT_STATS].sum()
+
+    def _customer_rows(self, customer_ids) -> pd.DataFrame:
+        positions = self._customers.index.get_indexer(pd.Index(customer_ids))
+        return self.engine.customers.iloc[positions[positions >= 0]]
+
+    # ── Change detection ─────────────────────────────────────────────
+
+    def diff_products(self, snapshot: pd.DataFrame) -> ChangeSet:
+        """Changes turning the current products into ``snapshot``."""
+        return self._products.diff(snapshot)
+
+    def diff_customers(self, snapshot: pd.DataFrame) -> ChangeSet:
+        """Changes turning the current customers into ``snapshot``."""
+        return self._customers.diff(snapshot)
+
+    # ── Applying changes ─────────────────────────────────────────────
+
+    def _drop_indexes(self, *keys):
+        for key in keys:
+            self.engine._indexes.pop(key, None)
+
+    def apply_products(self, changes: ChangeSet) -> ChangeSet:
+        """Apply product upserts/deletes and move the aggregates by their delta."""
+        changes = self._products.normalize(changes)
+        if not len(changes):
+            return changes
+        old_keys = pd.concat([changes.updates, changes.deletes], ignore_index=True)
+        old_rows = self.engine.products.iloc[self._products.positions(old_keys)] if len(old_keys) \
+            else self.engine.products.iloc[:0]
+        new_rows = pd.concat([changes.updates, changes.inserts], ignore_index=True)
+
+        affected = self._customer_rows(pd.concat([old_rows['customer_id'], new_rows['customer_id']]).unique())
+        self._segment_stats = _increment(self._segment_stats, self._segment_contribution(affected), -1)
+        self._product_stats = _increment(self._product_stats, self._product_stats_of(old_rows), -1)
+        self._product_stats = _increment(self._product_stats, self._product_stats_of(new_rows))
+        self._customer_products = _increment(self._customer_products, self._customer_products_of(old_rows), -1)
+        self._customer_products = _increment(self._customer_products, self._customer_products_of(new_rows))
+        self._segment_stats = _increment(self._segment_stats, self._segment_contribution(affected))
+
+        self._products.apply(changes)
+        if len(changes.inserts) or len(changes.deletes):
+            self._drop_indexes(('products', 'segment'), ('products', 'product_type'))
+        return changes
+
+    def apply_customers(self, changes: ChangeSet) -> ChangeSet:
+        """Apply customer upserts/deletes and move the segment aggregates by their delta."""
+        changes = self._customers.normalize(changes)
+        if not len(changes):
+            return changes
+        old_rows = self._customer_rows(pd.concat([changes.updates, changes.deletes])['customer_id'])
+        new_rows = pd.concat([changes.updates, changes.inserts], ignore_index=True)
+        self._segment_stats = _increment(self._segment_stats, self._segment_contribution(old_rows), -1)
+        self._segment_stats = _increment(self._segment_stats, self._segment_contribution(new_rows))
+
+        segment_moved = bool(len(changes.inserts) or len(changes.deletes))
+        if not segment_moved and 'segment' in changes.updates:
+            previous = old_rows.set_index('customer_id')['segment'].reindex(changes.updates['customer_id'])
+            segment_moved = not (previous.to_numpy() == changes.updates['segment'].to_numpy()).all()
+        self._customers.apply(changes)
+        self.engine.customers_changed()
+        if segment_moved:
+            self._drop_indexes(('customers', 'segment'), ('transactions', 'segment'),
+                               ('products', 'segment'))
+        return changes
+
+    def sync_products(self, snapshot: pd.DataFrame) -> ChangeSet:
+        """Diff a full products snapshot against the current state and apply it."""
+        return self.apply_products(self.diff_products(snapshot))
+
+    def sync_customers(self, snapshot: pd.DataFrame) -> ChangeSet:
+        """Diff a full customers snapshot against the current state and apply it."""
+        return self.apply_customers(self.diff_customers(snapshot))
+
+    # ── Aggregates ───────────────────────────────────────────────────
+
+    def product_performance(self) -> pd.DataFrame:
+        """Same frame as BankingAnalytics.get_product_performance, from maintained sums."""
+        stats = self._product_stats[self._product_stats['rows'].round() > 0]
+        performance = pd.DataFrame({
+            'total_balance': stats['balance_sum'],
+            'avg_balance': stats['balance_sum'] / stats['balance_count'],
+            'account_count': stats['balance_count'].round().astype(int),
+            'customer_count': stats['rows'].round().astype(int),
+        }).sort_index().round(2)
+        performance.index.name = 'product_type'
+        return performance.reset_index()
+
+    def segment_analysis(self) -> pd.DataFrame:
+        """Same frame as BankingAnalytics.get_customer_segment_analysis, from maintained sums."""
+        stats = self._segment_stats[self._segment_stats['customers'].round() > 0]
+        analysis = pd.DataFrame({
+            'avg_balance': stats['balance_sum'] / stats['balance_count'].replace(0, np.nan),
+            'total_balance': stats['balance_sum'],
+            'product_count': stats['balance_count'].round().astype(int),
+            'customer_count': stats['customers'].round().astype(int),
+            'avg_income': stats['income_sum'] / stats['rows'],
+            'avg_credit_score': stats['credit_sum'] / stats['rows'],
+        }).sort_index().round(2)
+        analysis.index.name = 'segment'
+        return analysis.reset_index()
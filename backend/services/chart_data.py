@@ -0,0 +1,173 @@
+"""
+Chart Data Layer
+Shrinks chart payloads before they are serialized for the browser.
+
+Histograms are binned in NumPy so only bin counts are shipped instead of
+every raw value, long time series are downsampled with LTTB
+(largest-triangle-three-buckets) to a pixel budget, and serialized figure
+JSON is cached per filter state so reruns with the same selections skip
+figure construction entirely. Cached JSON is handed to the Streamlit chart
+element as-is where the installed Streamlit's internals allow it, and
+through ``st.plotly_chart`` otherwise.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import inspect
+import json
+import threading
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Hashable, Optional, Tuple
+
+DEFAULT_PIXEL_BUDGET = 800
+
+
+def histogram_bins(values, nbins: int = 20,
+                   value_range: Optional[Tuple[float, float]] = None) -> pd.DataFrame:
+    """Bin ``values`` into ``nbins`` equal-width bins.
+
+    Returns one row per bin with its edges, midpoint, width and count.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if value_range is None and len(values) == 0:
+        value_range = (0.0, 1.0)
+    counts, edges = np.histogram(values, bins=nbins, range=value_range)
+    return pd.DataFrame({
+        'bin_start': edges[:-1],
+        'bin_end': edges[1:],
+        'bin_mid': (edges[:-1] + edges[1:]) / 2,
+        'bin_width': np.diff(edges),
+        'count': counts,
+    })
+
+
+def lttb_indices(x, y, threshold: int) -> np.ndarray:
+    """Indices of the points kept by largest-triangle-three-buckets.
+
+    The first and last points are always kept; each bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the average of the next bucket.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket boundaries for the n - 2 interior points
+    bounds = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        next_start, next_end = bounds[i + 1], bounds[i + 2] if i + 2 < len(bounds) else n
+        if next_end <= next_start:
+            next_end = next_start + 1
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_series(df: pd.DataFrame, x: str, y: str,
+                      max_points: int = DEFAULT_PIXEL_BUDGET) -> pd.DataFrame:
+    """Downsample a series sorted by ``x`` to at most ``max_points`` rows with LTTB."""
+    if len(df) <= max_points:
+        return df
+    x_values = df[x]
+    if pd.api.types.is_datetime64_any_dtype(x_values):
+        x_values = x_values.astype('int64')
+    keep = lttb_indices(x_values.to_numpy(), df[y].to_numpy(), max_points)
+    return df.iloc[keep]
+
+
+class FigureCache:
+    """Bounded LRU of serialized Plotly figure JSON keyed by panel and filter state.
+
+    One cache is shared by every session's script thread, so lookups and
+    evictions hold a lock; figures are built outside it.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_json(self, key: Hashable, build: Callable) -> str:
+        """Return the cached figure JSON for ``key``, calling ``build()`` on a miss."""
+        with self._lock:
+            if key in self._items:
+                self.hits += 1
+                self._items.move_to_end(key)
+                return self._items[key]
+            self.misses += 1
+        figure_json = build().to_json()
+        with self._lock:
+            self._items[key] = figure_json
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return figure_json
+
+
+@lru_cache(maxsize=None)
+def _direct_chart_support() -> bool:
+    """Whether this Streamlit's chart internals match the calls plotly_json_chart makes."""
+    try:
+        from streamlit.delta_generator import DeltaGenerator
+        from streamlit.elements.lib.layout_utils import LayoutConfig
+        from streamlit.elements.lib.utils import compute_and_register_element_id
+        from streamlit.proto.PlotlyChart_pb2 import PlotlyChart
+    except ImportError:
+        return False
+    register = inspect.signature(compute_and_register_element_id).parameters
+    required = {name for name, parameter in register.items()
+                if parameter.kind is parameter.KEYWORD_ONLY and parameter.default is parameter.empty}
+    return (required <= {'user_key', 'key_as_main_identity', 'dg'}
+            and any(parameter.kind is parameter.VAR_KEYWORD for parameter in register.values())
+            and 'layout_config' in inspect.signature(DeltaGenerator._enqueue).parameters
+            and {'width', 'height'} <= set(inspect.signature(LayoutConfig).parameters)
+            and {'spec', 'config', 'id', 'theme'} <= set(PlotlyChart.DESCRIPTOR.fields_by_name))
+
+
+def plotly_json_chart(figure_json: str):
+    """Render serialized figure JSON in the active Streamlit container.
+
+    ``st.plotly_chart`` rebuilds and validates a Plotly figure from whatever
+    it is given and serializes it again. The cached JSON already is the chart
+    spec, so it is enqueued directly when this Streamlit's internals match;
+    otherwise it goes through ``st.plotly_chart``.
+    """
+    import streamlit as st
+    figure = json.loads(figure_json)
+    if not _direct_chart_support():
+        return st.plotly_chart(figure, use_container_width=True)
+    from streamlit.elements.lib.layout_utils import LayoutConfig
+    from streamlit.elements.lib.utils import compute_and_register_element_id
+    from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+
+    height = int(figure.get('layout', {}).get('height') or 450)
+    proto = PlotlyChartProto()
+    proto.theme = 'streamlit'
+    proto.spec = figure_json
+    proto.config = json.dumps({})
+    proto.id = compute_and_register_element_id(
+        'plotly_chart', user_key=None, key_as_main_identity=False, dg=st._main,
+        plotly_spec=proto.spec, plotly_config=proto.config, selection_mode=('points', 'box', 'lasso'),
+        is_selection_activated=False, theme='streamlit', width='stretch', height=height, alt=None,
+    )
+    return st._main._enqueue('plotly_chart', proto,
+                             layout_config=LayoutConfig(width='stretch', height=height))
@@ -0,0 +1,143 @@
+"""
+Cohort Analysis
+Monthly cohorts by account_opening_date with activity and retention by
+months since opening.
+
+Dates become integer month codes (months since 1970-01). For each
+calendar month the engine keeps one bit per customer for "transacted
+that month", and the matrices are filled by bincount over a flat
+(cohort, age) code. There are no per-cohort loops. The activity,
+retention, volume and transaction matrices persist between calls.
+Extending them with a new batch of transactions only recounts the
+months the batch touches, so appending a month costs one pass over that
+month.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+
+def month_codes(dates) -> np.ndarray:
+    """Months since 1970-01 of each date."""
+    return pd.to_datetime(pd.Series(dates)).to_numpy().astype('datetime64[M]').astype(np.int64)
+
+
+def _month_start(code: int) -> pd.Timestamp:
+    return pd.Timestamp(np.datetime64(int(code), 'M'))
+
+
+class CohortMatrix:
+    """Persistent cohort x months-since-opening matrices for an engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.customers = engine.customers
+        self._customer_index = pd.Index(self.customers['customer_id'])
+        self._cohort = month_codes(self.customers['account_opening_date'])
+        self.first_cohort = int(self._cohort.min()) if len(self._cohort) else 0
+        self._sizes = np.bincount(self._cohort - self.first_cohort)
+        # Month code -> per-customer "active that month" bits
+        self._active: Dict[int, np.ndarray] = {}
+        self._activity = np.zeros((len(self._sizes), 0), dtype=np.int64)
+        self._transactions = np.zeros((len(self._sizes), 0), dtype=np.int64)
+        self._volume = np.zeros((len(self._sizes), 0))
+        self.extend(engine.transactions)
+
+    @property
+    def months(self) -> int:
+        """Number of months-since-opening columns."""
+        return self._activity.shape[1]
+
+    def _widen(self, last_month: int):
+        ages = last_month - self.first_cohort + 1
+        if ages <= self.months:
+            return
+        pad = ((0, 0), (0, ages - self.months))
+        self._activity = np.pad(self._activity, pad)
+        self._transactions = np.pad(self._transactions, pad)
+        self._volume = np.pad(self._volume, pad)
+
+    def _cells(self, month: int) -> np.ndarray:
+        """Flat (cohort, age) codes of the customers active in ``month``."""
+        rows = np.flatnonzero(self._active[month])
+        cohort = self._cohort[rows]
+        return (cohort - self.first_cohort) * self.months + (month - cohort)
+
+    def extend(self, transactions: pd.DataFrame):
+        """Fold a batch of transactions into the matrices, recounting only the months it touches."""
+        codes = self._customer_index.get_indexer(transactions['customer_id'])
+        month = month_codes(transactions['transaction_date'])
+        keep = codes >= 0
+        keep[keep] = month[keep] >= self._cohort[codes[keep]]
+        codes, month = codes[keep], month[keep]
+        amount = transactions['amount'].to_numpy(dtype=float)[keep]
+        if not len(codes):
+            return
+        self._widen(int(month.max()))
+        size = self._activity.size
+        cell = (self._cohort[codes] - self.first_cohort) * self.months + (month - self._cohort[codes])
+        self._transactions += np.bincount(cell, minlength=size).reshape(self._activity.shape)
+        self._volume += np.bincount(cell, weights=amount, minlength=size).reshape(self._volume.shape)
+
+        for m in np.unique(month):
+            m = int(m)
+            if m in self._active:
+                before = np.bincount(self._cells(m), minlength=size)
+            else:
+                self._active[m] = np.zeros(len(self._cohort), dtype=bool)
+                before = 0
+            self._active[m][codes[month == m]] = True
+            after = np.bincount(self._cells(m), minlength=size)
+            self._activity += (after - before).reshape(self._activity.shape)
+
+    # ── Matrices ─────────────────────────────────────────────────────
+
+    def _observed(self) -> np.ndarray:
+        """Cells whose calendar month lies within the transaction history."""
+        if not self._active:
+            return np.zeros(self._activity.shape, dtype=bool)
+        calendar = (self.first_cohort + np.arange(len(self._sizes)))[:, None] + np.arange(self.months)
+        return (calendar >= min(self._active)) & (calendar <= max(self._active))
+
+    def _frame(self, values: np.ndarray) -> pd.DataFrame:
+        values = np.where(self._observed(), values, np.nan)
+        frame = pd.DataFrame(values, columns=pd.RangeIndex(self.months, name='months_since_opening'))
+        frame.index = pd.DatetimeIndex([_month_start(self.first_cohort + i) for i in range(len(self._sizes))],
+                                       name='cohort')
+        return frame[self._sizes > 0]
+
+    def cohort_sizes(self) -> pd.Series:
+        sizes = pd.Series(self._sizes, name='customers',
+                          index=pd.DatetimeIndex([_month_start(self.first_cohort + i)
+                                                  for i in range(len(self._sizes))], name='cohort'))
+        return sizes[sizes > 0]
+
+    def activity_matrix(self) -> pd.DataFrame:
+        """Distinct active customers per cohort and months since opening; NaN where unobserved."""
+        return self._frame(self._activity)
+
+    def retention_matrix(self) -> pd.DataFrame:
+        """Share of each cohort active N months after opening."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self._frame(self._activity / self._sizes[:, None])
+
+    def transaction_matrix(self) -> pd.DataFrame:
+        return self._frame(self._transactions)
+
+    def volume_matrix(self) -> pd.DataFrame:
+        return self._frame(self._volume)
+
+    def retention_curve(self, cohorts: Optional[int] = None) -> pd.Series:
+        """Customer-weighted retention by months since opening over the latest ``cohorts`` cohorts."""
+        activity = np.where(self._observed(), self._activity, 0)
+        exposed = np.where(self._observed(), self._sizes[:, None], 0)
+        if cohorts is not None:
+            rows = np.flatnonzero(self._sizes)[-cohorts:]
+            activity, exposed = activity[rows], exposed[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            curve = activity.sum(axis=0) / exposed.sum(axis=0)
+        return pd.Series(curve, index=pd.RangeIndex(self.months, name='months_since_opening'),
+                         name='retention').dropna()
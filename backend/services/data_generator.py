@@ -7,16 +7,21 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import json
 
+# Bump whenever generation logic changes so cached datasets are rebuilt
+GENERATOR_VERSION = 1
+
 class BankingDataGenerator:
     """Generate realistic banking data for analytics dashboard"""
     
-    def __init__(self, seed: int = 42):
-        """Initialize the data generator with a random seed"""
+    def __init__(self, seed: int = 42, as_of: Optional[datetime] = None):
+        """Initialize the data generator with a random seed and an optional reference time"""
         np.random.seed(seed)
         random.seed(seed)
+        self.seed = seed
+        self.as_of = as_of
         
         # Customer segments
         self.customer_segments = ['Premium', 'Gold', 'Silver', 'Bronze']
@@ -42,18 +47,22 @@ class BankingDataGenerator:
             'Recife', 'Porto Alegre', 'Goiânia', 'Belém'
         ]
     
-    def generate_customers(self, num_customers: int = 10000) -> pd.DataFrame:
-        """Generate customer data"""
+    def _now(self) -> datetime:
+        """Reference time generated dates count back from"""
+        return self.as_of or datetime.now()
+    
+    def generate_customers(self, num_customers: int = 10000, offset: int = 0) -> pd.DataFrame:
+        """Generate customer data, numbering customer IDs from ``offset + 1``"""
         customers = []
         
         for i in range(num_customers):
             customer = {
-                'customer_id': f'CUST_{i+1:06d}',
+                'customer_id': f'CUST_{offset+i+1:06d}',
                 'age': np.random.normal(45, 15),
                 'income': np.random.lognormal(10, 0.8),
                 'segment': np.random.choice(self.customer_segments, p=self.segment_weights),
                 'city': np.random.choice(self.cities),
-                'account_opening_date': datetime.now() - timedelta(days=np.random.randint(30, 3650)),
+                'account_opening_date': self._now() - timedelta(days=np.random.randint(30, 3650)),
                 'is_active': np.random.choice([True, False], p=[0.85, 0.15]),
                 'credit_score': np.random.normal(650, 100),
                 'num_products': np.random.poisson(2.5) + 1
@@ -95,7 +104,7 @@ class BankingDataGenerator:
                                  segment_multiplier[customer['segment']])
             
             for _ in range(num_transactions):
-                transaction_date = datetime.now() - timedelta(
+                transaction_date = self._now() - timedelta(
                     days=np.random.randint(0, days_back)
                 )
                 
@@ -169,13 +178,17 @@ class BankingDataGenerator:
         
         return pd.DataFrame(products_data)
     
-    def generate_complete_dataset(self, num_customers: int = 10000) -> Dict[str, pd.DataFrame]:
-        """Generate complete banking dataset"""
+    def generate_complete_dataset(self, num_customers: int = 10000, days_back: int = 365,
+                                  cache=None) -> Dict[str, pd.DataFrame]:
+        """Generate complete banking dataset, or load it from a DatasetCache"""
+        if cache is not None:
+            return cache.load(num_customers, seed=self.seed, days_back=days_back)
+        
         print(f"Generating {num_customers} customers...")
         customers_df = self.generate_customers(num_customers)
         
         print("Generating transactions...")
-        transactions_df = self.generate_transactions(customers_df)
+        transactions_df = self.generate_transactions(customers_df, days_back)
         
         print("Generating product holdings...")
         products_df = self.generate_products(customers_df)
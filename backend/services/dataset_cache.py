@@ -0,0 +1,191 @@
+"""
+Dataset Cache
+Content-addressed on-disk cache of generated banking datasets.
+
+A dataset is keyed by a hash of (seed, num_customers, days_back,
+GENERATOR_VERSION). It is stored as one .npy file per column, and a hit
+memory-maps those files. Numeric, boolean and datetime columns are used
+in place from the page cache without a copy. String columns are stored
+dictionary-encoded, as integer codes plus an array of unique values,
+and only they are decoded on load; missing strings come back missing.
+
+Customers are generated in fixed-size blocks, each seeded from (seed,
+block start), so a block's rows do not depend on how many customers
+follow it. A new size reuses the full blocks of the closest cached
+dataset with the same seed and days_back and generates only the rest.
+Generated dates count back from the first build's as_of time, which
+every later size of the same dataset inherits.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_generator import GENERATOR_VERSION, BankingDataGenerator
+
+BLOCK_CUSTOMERS = 1000
+TABLES = ('customers', 'transactions', 'products')
+DEFAULT_ROOT = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'cache')
+
+
+def dataset_key(seed: int, num_customers: int, days_back: int,
+                version: Optional[int] = None) -> str:
+    """Content address of a generated dataset; ``version`` defaults to GENERATOR_VERSION."""
+    payload = json.dumps({'seed': seed, 'num_customers': num_customers, 'days_back': days_back,
+                          'version': GENERATOR_VERSION if version is None else version}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def block_seed(seed: int, start: int) -> int:
+    """Generator seed of the customer block starting at ``start``."""
+    return int(np.random.SeedSequence([seed, start]).generate_state(1)[0])
+
+
+def _write_table(directory: str, name: str, frame: pd.DataFrame) -> Dict:
+    columns = []
+    for column in frame.columns:
+        path = os.path.join(directory, f'{name}.{column}')
+        values = frame[column]
+        if pd.api.types.is_string_dtype(values) or values.dtype == object:
+            codes, uniques = pd.factorize(values)
+            np.save(f'{path}.codes.npy', codes.astype(np.int32))
+            np.save(f'{path}.values.npy', np.asarray(uniques, dtype=str))
+            columns.append({'name': column, 'encoding': 'dictionary'})
+        else:
+            np.save(f'{path}.npy', values.to_numpy())
+            columns.append({'name': column, 'encoding': 'plain'})
+    return {'rows': len(frame), 'columns': columns}
+
+
+def _read_table(directory: str, name: str, meta: Dict) -> pd.DataFrame:
+    data = {}
+    for column in meta['columns']:
+        path = os.path.join(directory, f"{name}.{column['name']}")
+        if column['encoding'] == 'dictionary':
+            codes = np.load(f'{path}.codes.npy', mmap_mode='r')
+            # factorize codes missing values as -1, which selects the trailing None
+            values = np.append(np.load(f'{path}.values.npy').astype(object), None)
+            data[column['name']] = values[codes]
+        else:
+            # Copy-on-write mapping: shared with the page cache until a caller writes to it
+            data[column['name']] = np.load(f'{path}.npy', mmap_mode='c')
+    return pd.DataFrame(data, copy=False)
+
+
+class DatasetCache:
+    """Generated datasets on disk, loaded by memory mapping and extended block by block."""
+
+    def __init__(self, root: Optional[str] = None, block_customers: int = BLOCK_CUSTOMERS):
+        self.root = os.path.abspath(root or os.environ.get('BANKING_DATASET_CACHE', DEFAULT_ROOT))
+        self.block_customers = block_customers
+        self.hits = 0
+        self.misses = 0
+        self.generated_customers = 0
+        self.reused_customers = 0
+
+    def path(self, num_customers: int, seed: int = 42, days_back: int = 365) -> str:
+        return os.path.join(self.root, dataset_key(seed, num_customers, days_back))
+
+    def load(self, num_customers: int, seed: int = 42, days_back: int = 365) -> Dict[str, pd.DataFrame]:
+        """Customers, transactions and products, generating and storing them on a miss."""
+        directory = self.path(num_customers, seed, days_back)
+        if os.path.exists(os.path.join(directory, 'meta.json')):
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._build(directory, num_customers, seed, days_back)
+        return self._read(directory)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _read(self, directory: str) -> Dict[str, pd.DataFrame]:
+        meta = self._meta(directory)
+        return {name: _read_table(directory, name, meta['tables'][name]) for name in TABLES}
+
+    @staticmethod
+    def _meta(directory: str) -> Dict:
+        with open(os.path.join(directory, 'meta.json')) as handle:
+            return json.load(handle)
+
+    def _base(self, num_customers: int, seed: int, days_back: int) -> Tuple[Optional[str], Optional[Dict], int]:
+        """Cached dataset of the same seed and days_back sharing the most full blocks with the new size."""
+        best, best_meta, best_blocks = None, None, -1
+        if not os.path.isdir(self.root):
+            return best, best_meta, 0
+        for entry in sorted(os.listdir(self.root)):
+            directory = os.path.join(self.root, entry)
+            if entry.startswith('.') or not os.path.exists(os.path.join(directory, 'meta.json')):
+                continue
+            meta = self._meta(directory)
+            if (meta['seed'], meta['days_back'], meta['version'], meta['block_customers']) != \
+                    (seed, days_back, GENERATOR_VERSION, self.block_customers):
+                continue
+            blocks = min(meta['num_customers'], num_customers) // self.block_customers
+            if blocks > best_blocks:
+                best, best_meta, best_blocks = directory, meta, blocks
+        return best, best_meta, max(best_blocks, 0)
+
+    def _build(self, directory: str, num_customers: int, seed: int, days_back: int):
+        base, base_meta, reused = self._base(num_customers, seed, days_back)
+        as_of = (datetime.fromisoformat(base_meta['as_of']) if base_meta
+                 else datetime.now().replace(microsecond=0))
+
+        blocks, parts = [], {name: [] for name in TABLES}
+        if reused:
+            blocks = base_meta['blocks'][:reused]
+            cached = self._read(base)
+            for name in TABLES:
+                rows = sum(block[name] for block in blocks)
+                parts[name].append(cached[name].iloc[:rows])
+            self.reused_customers += reused * self.block_customers
+
+        for start in range(reused * self.block_customers, num_customers, self.block_customers):
+            size = min(self.block_customers, num_customers - start)
+            generator = BankingDataGenerator(seed=block_seed(seed, start), as_of=as_of)
+            customers = generator.generate_customers(size, offset=start)
+            block = {
+                'customers': customers,
+                'transactions': generator.generate_transactions(customers, days_back),
+                'products': generator.generate_products(customers),
+            }
+            for name in TABLES:
+                parts[name].append(block[name])
+            blocks.append({'start': start, **{name: len(block[name]) for name in TABLES}})
+            self.generated_customers += size
+
+        tables = {name: pd.concat([part for part in parts[name] if len(part)], ignore_index=True)
+                  if any(len(part) for part in parts[name]) else pd.DataFrame()
+                  for name in TABLES}
+        # Transaction IDs are numbered across blocks, as in a single generation run
+        transactions = tables['transactions']
+        if len(transactions):
+            transactions['transaction_id'] = [f'TXN_{i + 1:08d}' for i in range(len(transactions))]
+
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.root, prefix=f'.{os.path.basename(directory)}-')
+        try:
+            meta = {
+                'seed': seed, 'num_customers': num_customers, 'days_back': days_back,
+                'version': GENERATOR_VERSION, 'block_customers': self.block_customers,
+                'as_of': as_of.isoformat(), 'blocks': blocks,
+                'tables': {name: _write_table(staging, name, tables[name]) for name in TABLES},
+            }
+            with open(os.path.join(staging, 'meta.json'), 'w') as handle:
+                json.dump(meta, handle)
+            os.rename(staging, directory)
+        except OSError:
+            # Another process stored the same dataset first
+            if not os.path.exists(os.path.join(directory, 'meta.json')):
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,118 @@
+"""
+Customer Leaderboards
+Top-K customers by volume, transaction count, fraud exposure and risk
+score without sorting the whole customer base.
+
+Per-customer moments (count, amount, centered sum of squares, fraud
+amount and count, see customer_risk) are accumulated with bincount, and
+the top K is chosen with argpartition, so only the K winners are sorted:
+O(n + k log k). The running leaderboard keeps these moments and its
+current top K. Each appended batch only touches its own customers.
+Volume, count and fraud exposure never decrease on append, so the new
+top K comes from the old top K plus the touched customers. The risk
+score can fall, so it rescans with argpartition, and only when a
+leader's score drops.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+from .customer_risk import MOMENTS, customer_moments, merge_moments, moment_risk_scores
+
+METRICS = ('volume', 'transactions', 'fraud_exposure', 'risk_score')
+
+# Metrics that can only grow as transactions are appended
+MONOTONE = {'volume', 'transactions', 'fraud_exposure'}
+
+
+def top_k_positions(values: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` largest values, largest first; NaN ranks last."""
+    values = np.where(np.isnan(values), -np.inf, values)
+    k = min(k, len(values))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < len(values):
+        candidates = np.argpartition(-values, k - 1)[:k]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.lexsort((candidates, -values[candidates]))]
+
+
+def metric_values(stats: Dict[str, np.ndarray], credit_score: np.ndarray, metric: str) -> np.ndarray:
+    """``metric`` per customer from the customer_risk moments."""
+    if metric == 'volume':
+        return stats['amount']
+    if metric == 'transactions':
+        return stats['count']
+    if metric == 'fraud_exposure':
+        return stats['fraud_amount']
+    if metric == 'risk_score':
+        return moment_risk_scores(stats, credit_score)
+    raise ValueError(f"Unknown metric '{metric}'. Available: {list(METRICS)}")
+
+
+def leaderboard_frame(customers: pd.DataFrame, values: np.ndarray, positions: np.ndarray,
+                      metric: str) -> pd.DataFrame:
+    board = customers.iloc[positions][['customer_id', 'segment']].reset_index(drop=True)
+    board[metric] = values[positions]
+    board.insert(0, 'rank', np.arange(1, len(board) + 1))
+    return board
+
+
+class Leaderboard:
+    """Running top-``capacity`` customers per metric, updated as transactions are appended."""
+
+    def __init__(self, engine, capacity: int = 100):
+        self.engine = engine
+        self.capacity = capacity
+        self.customers = engine.customers
+        self._customer_index = pd.Index(self.customers['customer_id'])
+        self._credit_score = self.customers['credit_score'].to_numpy(dtype=float)
+        self._stats = {name: np.zeros(len(self.customers)) for name in MOMENTS}
+        self._accumulate(engine.transactions)
+        self._values = {metric: metric_values(self._stats, self._credit_score, metric) for metric in METRICS}
+        self._top = {metric: top_k_positions(self._values[metric], capacity) for metric in METRICS}
+        self.rescans = 0
+
+    def _accumulate(self, transactions: pd.DataFrame) -> np.ndarray:
+        """Merge ``transactions`` into the moments; returns the touched customer positions."""
+        codes = self._customer_index.get_indexer(transactions['customer_id'])
+        batch = customer_moments(codes, transactions['amount'].to_numpy(dtype=float),
+                                 transactions['is_fraud'].to_numpy(dtype=float), len(self.customers))
+        merge_moments(self._stats, batch)
+        return np.unique(codes[codes >= 0])
+
+    def append(self, transactions: pd.DataFrame):
+        """Fold a batch of appended transactions into the running leaderboards."""
+        touched = self._accumulate(transactions)
+        if not len(touched):
+            return
+        touched_stats = {name: values[touched] for name, values in self._stats.items()}
+        for metric in METRICS:
+            values = self._values[metric]
+            previous = values[touched]
+            values[touched] = metric_values(touched_stats, self._credit_score[touched], metric)
+            top = self._top[metric]
+            leader_fell = metric not in MONOTONE and np.any(
+                (values[touched] < previous) & np.isin(touched, top))
+            if leader_fell:
+                # A leader may have dropped below someone outside the tracked set
+                self._top[metric] = top_k_positions(values, self.capacity)
+                self.rescans += 1
+            else:
+                candidates = np.union1d(top, touched)
+                self._top[metric] = candidates[top_k_positions(values[candidates], self.capacity)]
+
+    def values(self, metric: str) -> np.ndarray:
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Available: {list(METRICS)}")
+        return self._values[metric]
+
+    def top(self, metric: str = 'volume', k: int = 10) -> pd.DataFrame:
+        """Top ``k`` customers by ``metric`` with rank, customer_id, segment and value."""
+        values = self.values(metric)
+        positions = self._top[metric][:k] if k <= self.capacity else top_k_positions(values, k)
+        return leaderboard_frame(self.customers, values, positions, metric)
@@ -0,0 +1,186 @@
+"""
+Dashboard Load Testing
+Headless concurrent-session load test for the Streamlit dashboard.
+
+The dashboard's render is callable code: the app module defines
+``dashboard_engine()``, ``filter_options(engine)`` and
+``render(engine, filters, session)``. The harness imports the app once
+and runs Streamlit in bare mode, so element calls build their payloads
+without a browser. Each simulated analyst is a thread in one process.
+It renders the page once plus several reruns, each with random filters:
+date range, segments, product types, ranking metric and preview. Every
+session shares the app's ``cache_resource`` engine and figure cache, as
+sessions on one server do.
+
+The app times its panels through startup.RECORDER, which only records
+sessions the harness has tagged. Each load level reports per-panel
+latency percentiles, page throughput, and CPU seconds and memory growth
+per session. The clock starts once every worker thread is running and
+the app has rendered a warm-up page. The saturation point is the
+concurrency after which throughput stops growing.
+
+    python -m backend.services.loadtest --sessions 1,2,4,8 --reruns 3
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .startup import RECORDER
+
+DEFAULT_APP = os.path.join(os.path.dirname(__file__), '..', '..', 'frontend', 'app.py')
+
+_APPS: Dict[str, ModuleType] = {}
+_APPS_LOCK = threading.Lock()
+
+
+def rss_bytes() -> int:
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def load_app(app_path: str) -> ModuleType:
+    """Import the app script once per process, with Streamlit in bare mode."""
+    app_path = os.path.abspath(app_path)
+    with _APPS_LOCK:
+        if app_path not in _APPS:
+            from streamlit import config, logger
+            # Bare mode warns on every element call made without a script run;
+            # parse the config first so it does not reset the level later
+            config.get_config_options()
+            logger.set_log_level('error')
+            spec = importlib.util.spec_from_file_location(f'loadtest_app_{len(_APPS)}', app_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _APPS[app_path] = module
+        return _APPS[app_path]
+
+
+# ── Sessions ─────────────────────────────────────────────────────────
+
+def random_filters(options: Dict, rng: random.Random) -> Dict:
+    """A random date range, non-empty segment and product subsets, metric and preview."""
+    low, high = options['date_range']
+    span = (high - low).days
+    start = low + timedelta(days=rng.randint(0, max(span - 1, 0)))
+    end = start + timedelta(days=rng.randint(0, (high - start).days))
+    return {
+        'date_range': (start, end),
+        'segments': rng.sample(options['segments'], rng.randint(1, len(options['segments']))),
+        'product_types': rng.sample(options['product_types'], rng.randint(1, len(options['product_types']))),
+        'metric': rng.choice(options['metric']),
+        'preview': rng.random() < 0.5,
+    }
+
+
+def run_session(app: Union[str, ModuleType], session: str, reruns: int = 3,
+                seed: int = 0) -> Tuple[List[Tuple[str, float, float]], float]:
+    """Render the page ``1 + reruns`` times with random filters.
+
+    Returns the session's panel timings and the CPU seconds its thread used.
+    """
+    if isinstance(app, str):
+        app = load_app(app)
+    rng = random.Random(seed)
+    cpu = time.thread_time()
+    try:
+        engine = app.dashboard_engine()
+        options = app.filter_options(engine)
+        for _ in range(1 + reruns):
+            with RECORDER.panel(session, 'page'):
+                app.render(engine, random_filters(options, rng), session)
+    except Exception as error:
+        RECORDER.drain(session)
+        raise RuntimeError(f"session {session} failed: {error}") from error
+    return RECORDER.drain(session), time.thread_time() - cpu
+
+
+def run_level(app: Union[str, ModuleType], sessions: int, reruns: int = 3, seed: int = 0) -> Dict:
+    """Run ``sessions`` concurrent sessions and summarize latency, throughput, CPU and memory."""
+    if isinstance(app, str):
+        app = load_app(app)
+    with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix='session') as pool:
+        # Every worker thread is started before the clock is
+        ready = threading.Barrier(sessions + 1)
+        for _ in range(sessions):
+            pool.submit(ready.wait)
+        ready.wait()
+        rss, started = rss_bytes(), time.perf_counter()
+        futures = [pool.submit(run_session, app, f'{sessions}-{i}', reruns, seed * 1000 + i)
+                   for i in range(sessions)]
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+    memory = max(rss_bytes() - rss, 0)
+
+    records = pd.DataFrame([record for result, _ in results for record in result],
+                           columns=['panel', 'wall', 'cpu']).astype({'wall': float, 'cpu': float})
+    pages = records[records['panel'] == 'page']
+    panels = records.groupby('panel')['wall'].quantile([0.5, 0.95, 0.99]).unstack() * 1000
+    panels.columns = ['p50_ms', 'p95_ms', 'p99_ms']
+    panels['renders'] = records.groupby('panel').size()
+    return {
+        'sessions': sessions,
+        'pages': len(pages),
+        'seconds': elapsed,
+        'pages_per_second': len(pages) / elapsed if elapsed > 0 else 0.0,
+        'page_p95_ms': float(pages['wall'].quantile(0.95) * 1000) if len(pages) else 0.0,
+        'cpu_seconds_per_session': sum(cpu for _, cpu in results) / sessions,
+        'memory_mb_per_session': memory / sessions / 2 ** 20,
+        'panels': panels.reset_index(),
+    }
+
+
+def find_saturation(levels: List[Dict], min_gain: float = 0.1) -> int:
+    """Concurrency after which page throughput grows by less than ``min_gain``."""
+    for previous, current in zip(levels, levels[1:]):
+        if current['pages_per_second'] < previous['pages_per_second'] * (1 + min_gain):
+            return previous['sessions']
+    return levels[-1]['sessions'] if levels else 0
+
+
+def run(app_path: str = DEFAULT_APP, levels: Tuple[int, ...] = (1, 2, 4, 8), reruns: int = 3,
+        seed: int = 0) -> Dict:
+    """Warm the app with one session, then run every load level; returns levels and saturation."""
+    app = load_app(app_path)
+    run_session(app, 'warmup', 0, seed - 1)
+    results = [run_level(app, sessions, reruns, seed) for sessions in levels]
+    return {'levels': results, 'saturation_sessions': find_saturation(results)}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Concurrent-session dashboard load test')
+    parser.add_argument('--app', default=DEFAULT_APP)
+    parser.add_argument('--sessions', default='1,2,4,8', help='comma-separated concurrency levels')
+    parser.add_argument('--reruns', type=int, default=3, help='filter changes per session')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    levels = tuple(int(level) for level in args.sessions.split(','))
+    report = run(args.app, levels, args.reruns, args.seed)
+    for level in report['levels']:
+        print(f"\n{level['sessions']} sessions: {level['pages_per_second']:.2f} pages/s, "
+              f"page p95 {level['page_p95_ms']:.0f} ms, "
+              f"{level['cpu_seconds_per_session']:.2f} CPU s/session, "
+              f"{level['memory_mb_per_session']:.1f} MB/session")
+        print(level['panels'].round(1).to_string(index=False))
+    print(f"\nsaturation: {report['saturation_sessions']} concurrent sessions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""
+Parallel Analytics Executor
+Partition-parallel map-reduce over the BankingAnalytics frames.
+
+Transactions and products are encoded once into numeric columns (day
+codes, category codes, amounts) held in shared memory. Rows are grouped
+into contiguous partitions, by customer hash or by date, and a process
+pool computes partial states (bincount sums, counts and the customer_risk
+moments) over zero-copy views of each partition. The partial states are
+summed, the moments merged, and finished into the same frames the engine
+returns. Per-customer states cover only the customers a partition
+touches and are scattered into the result, so their reduce cost does
+not grow with the partition count.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pandas as pd
+import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+from .customer_risk import MOMENTS, amount_mean_std, customer_moments, merge_moments
+
+# Result name -> partial states it needs
+AGGREGATES = {
+    'daily_volume': ['daily'],
+    'fraud_trend': ['daily'],
+    'channel_analysis': ['channel'],
+    'fraud_statistics': ['fraud'],
+    'product_performance': ['product'],
+    'credit_risk': ['customer'],
+}
+
+# Per-customer partial states, returned for the customers a partition touches only
+CUSTOMER_STATES = tuple(f'customer_{name}' for name in MOMENTS)
+
+_WORKER_COLUMNS: Dict[str, np.ndarray] = {}
+_WORKER_BLOCKS: List[shared_memory.SharedMemory] = []
+
+
+def _attach(specs: Dict[str, Tuple[str, str, tuple]]):
+    """Pool initializer: map the shared column blocks into this process."""
+    for column, (name, dtype, shape) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        _WORKER_BLOCKS.append(block)
+        _WORKER_COLUMNS[column] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _customer_partial(customer: np.ndarray, amount: np.ndarray, fraud: np.ndarray,
+                      stride: int) -> Dict[str, np.ndarray]:
+    """Per-customer moments of one partition, keyed by the global codes in 'customer_codes'."""
+    if stride and len(customer):
+        # A customer partition owns the codes congruent to one residue, so local codes are dense
+        local = customer // stride
+        moments = customer_moments(local, amount, fraud, int(local.max()) + 1)
+        present = np.flatnonzero(moments['count'])
+        codes = present * stride + customer[0] % stride
+    else:
+        codes, local = np.unique(customer, return_inverse=True)
+        moments = customer_moments(local.ravel(), amount, fraud, len(codes))
+        present = np.arange(len(codes))
+    out = {'customer_codes': codes}
+    out.update({f'customer_{name}': values[present] for name, values in moments.items()})
+    return out
+
+
+def _partial(columns: Dict[str, np.ndarray], sizes: Dict[str, int],
+             txn_range: Tuple[int, int], prod_range: Tuple[int, int],
+             states: List[str]) -> Dict[str, np.ndarray]:
+    """Additive partial state of one partition."""
+    start, end = txn_range
+    day = columns['day'][start:end]
+    amount = columns['amount'][start:end]
+    fraud = columns['is_fraud'][start:end]
+    out = {}
+    if 'daily' in states:
+        out['day_amount'] = np.bincount(day, weights=amount, minlength=sizes['days'])
+        out['day_count'] = np.bincount(day, minlength=sizes['days'])
+        out['day_fraud'] = np.bincount(day, weights=fraud, minlength=sizes['days'])
+    if 'channel' in states:
+        channel = columns['channel'][start:end]
+        out['channel_amount'] = np.bincount(channel, weights=amount, minlength=sizes['channels'])
+        out['channel_count'] = np.bincount(channel, minlength=sizes['channels'])
+        out['channel_fraud'] = np.bincount(channel, weights=fraud, minlength=sizes['channels'])
+    if 'fraud' in states:
+        out['fraud'] = np.array([len(amount), fraud.sum(), amount[fraud == 1].sum(), amount.sum()])
+    if 'customer' in states:
+        out.update(_customer_partial(columns['customer'][start:end], amount, fraud,
+                                     sizes['customer_stride']))
+    if 'product' in states:
+        p_start, p_end = prod_range
+        product = columns['product_type'][p_start:p_end]
+        balance = columns['balance'][p_start:p_end]
+        owner = columns['product_customer'][p_start:p_end]
+        out['product_balance'] = np.bincount(product, weights=balance, minlength=sizes['products'])
+        out['product_count'] = np.bincount(product, minlength=sizes['products'])
+        # Products are always partitioned by customer, so distinct owners add up
+        pairs = np.unique(product.astype(np.int64) * (sizes['customers'] + 1) + owner)
+        out['product_customers'] = np.bincount(pairs // (sizes['customers'] + 1),
+                                               minlength=sizes['products'])
+    return out
+
+
+def _worker_partial(sizes, txn_range, prod_range, states):
+    return _partial(_WORKER_COLUMNS, sizes, txn_range, prod_range, states)
+
+
+def _ranges(keys: np.ndarray, partitions: int) -> List[Tuple[int, int]]:
+    """Contiguous row ranges of rows already sorted by partition key."""
+    bounds = np.searchsorted(keys, np.arange(partitions + 1), side='left')
+    return [(int(bounds[i]), int(bounds[i + 1])) for i in range(partitions)]
+
+
+class ParallelAnalytics:
+    """Run BankingAnalytics aggregations as map-reduce over a process pool.
+
+    ``partition_by`` is 'customer' (hash of the customer) or 'date'
+    (contiguous day ranges of similar row counts). With ``workers=1`` the
+    partitions are processed in-process, without shared memory.
+    """
+
+    def __init__(self, engine, workers: Optional[int] = None,
+                 partition_by: str = 'customer', partitions: Optional[int] = None):
+        if partition_by not in ('customer', 'date'):
+            raise ValueError("partition_by must be 'customer' or 'date'")
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        self.partition_by = partition_by
+        self.partitions = partitions or self.workers * 4
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._encode()
+
+    # ── Encoding and partitioning ────────────────────────────────────
+
+    def _encode(self):
+        txns = self.engine.transactions
+        products = self.engine.products
+        customer_index = pd.Index(self.engine.customers['customer_id'])
+        self._customer_index = customer_index
+        n_customers = len(customer_index)
+
+        days = txns['transaction_date'].to_numpy().astype('datetime64[D]')
+        self._base_day = days.min() if len(days) else np.datetime64('1970-01-01')
+        day = (days - self._base_day).astype(np.int64)
+        customer = customer_index.get_indexer(txns['customer_id'])
+        customer = np.where(customer < 0, n_customers, customer).astype(np.int64)
+        channel, self._channels = pd.factorize(txns['channel'], sort=True)
+        product_type, self._product_types = pd.factorize(products['product_type'], sort=True)
+        product_customer = customer_index.get_indexer(products['customer_id'])
+        product_customer = np.where(product_customer < 0, n_customers, product_customer).astype(np.int64)
+
+        self._sizes = {
+            'days': int(day.max()) + 1 if len(day) else 0,
+            'customers': n_customers,
+            'channels': len(self._channels),
+            'products': len(self._product_types),
+            # Customer partitions own every partitions-th customer code
+            'customer_stride': self.partitions if self.partition_by == 'customer' else 0,
+        }
+
+        if self.partition_by == 'customer':
+            txn_key = customer % self.partitions
+        else:
+            # Split the day axis so every partition holds a similar number of rows
+            cut = np.quantile(day, np.linspace(0, 1, self.partitions + 1)[1:-1]) if len(day) else []
+            txn_key = np.searchsorted(np.asarray(cut), day, side='right')
+        prod_key = product_customer % self.partitions
+        txn_order = np.argsort(txn_key, kind='stable')
+        prod_order = np.argsort(prod_key, kind='stable')
+        self._txn_ranges = _ranges(txn_key[txn_order], self.partitions)
+        self._prod_ranges = _ranges(prod_key[prod_order], self.partitions)
+
+        self._columns = {
+            'day': day[txn_order],
+            'amount': txns['amount'].to_numpy(dtype=np.float64)[txn_order],
+            'is_fraud': txns['is_fraud'].to_numpy(dtype=bool).astype(np.int8)[txn_order],
+            'channel': channel.astype(np.int64)[txn_order],
+            'customer': customer[txn_order],
+            'product_type': product_type.astype(np.int64)[prod_order],
+            'balance': products['balance'].to_numpy(dtype=np.float64)[prod_order],
+            'product_customer': product_customer[prod_order],
+        }
+
+    def _share(self) -> Dict[str, Tuple[str, str, tuple]]:
+        specs = {}
+        for column, values in self._columns.items():
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            self._blocks.append(block)
+            specs[column] = (block.name, values.dtype.str, values.shape)
+        return specs
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             initializer=_attach, initargs=(self._share(),))
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── Map and reduce ───────────────────────────────────────────────
+
+    def _reduce(self, states: List[str]) -> Dict[str, np.ndarray]:
+        tasks = list(zip(self._txn_ranges, self._prod_ranges))
+        if self.workers == 1:
+            partials = [_partial(self._columns, self._sizes, txn, prod, states) for txn, prod in tasks]
+        else:
+            pool = self._get_pool()
+            futures = [pool.submit(_worker_partial, self._sizes, txn, prod, states) for txn, prod in tasks]
+            partials = [future.result() for future in futures]
+        merged: Dict[str, np.ndarray] = {}
+        for partial in partials:
+            codes = partial.pop('customer_codes', None)
+            if codes is not None:
+                if CUSTOMER_STATES[0] not in merged:
+                    # The last bucket collects transactions of unknown customers
+                    merged.update({key: np.zeros(self._sizes['customers'] + 1) for key in CUSTOMER_STATES})
+                merge_moments({name: merged[f'customer_{name}'] for name in MOMENTS},
+                              {name: partial.pop(f'customer_{name}') for name in MOMENTS}, codes)
+            for key, value in partial.items():
+                merged[key] = merged[key] + value if key in merged else value
+        return merged
+
+    def run(self, *names: str) -> Dict:
+        """Compute several results with a single map-reduce pass."""
+        unknown = [name for name in names if name not in AGGREGATES]
+        if unknown:
+            raise ValueError(f"Unknown aggregates {unknown}. Available: {sorted(AGGREGATES)}")
+        states = sorted({state for name in names for state in AGGREGATES[name]})
+        merged = self._reduce(states)
+        return {name: getattr(self, f'_finish_{name}')(merged) for name in names}
+
+    # ── Finishing merged states into engine-shaped results ───────────
+
+    def _days(self, mask: np.ndarray) -> pd.Series:
+        codes = np.flatnonzero(mask)
+        return pd.to_datetime(self._base_day + codes.astype('timedelta64[D]'))
+
+    def _finish_daily_volume(self, merged) -> pd.DataFrame:
+        present = merged['day_count'] > 0
+        return pd.DataFrame({'date': self._days(present), 'volume': merged['day_amount'][present]})
+
+    def _finish_fraud_trend(self, merged) -> pd.DataFrame:
+        present = merged['day_count'] > 0
+        trend = pd.DataFrame({
+            'date': self._days(present),
+            'fraud_count': merged['day_fraud'][present].astype(np.int64),
+            'total_count': merged['day_count'][present],
+        })
+        trend['fraud_rate'] = (trend['fraud_count'] / trend['total_count'] * 100).round(2)
+        return trend
+
+    def _finish_channel_analysis(self, merged) -> pd.DataFrame:
+        count = merged['channel_count']
+        analysis = pd.DataFrame({
+            'channel': self._channels,
+            'total_volume': merged['channel_amount'],
+            'avg_amount': merged['channel_amount'] / np.maximum(count, 1),
+            'transaction_count': count,
+            'fraud_count': merged['channel_fraud'].astype(np.int64),
+        }).round(2)
+        analysis['fraud_rate'] = (analysis['fraud_count'] / analysis['transaction_count'] * 100).round(2)
+        return analysis
+
+    def _finish_fraud_statistics(self, merged) -> Dict:
+        total, fraud_count, fraud_amount, total_amount = merged['fraud']
+        return {
+            'total_transactions': int(total),
+            'fraud_count': int(fraud_count),
+            'fraud_rate': fraud_count / total if total > 0 else 0,
+            'fraud_amount': fraud_amount,
+            'avg_fraud_amount': fraud_amount / fraud_count if fraud_count > 0 else 0,
+            'total_amount': total_amount,
+        }
+
+    def _finish_product_performance(self, merged) -> pd.DataFrame:
+        count = merged['product_count']
+        return pd.DataFrame({
+            'product_type': self._product_types,
+            'total_balance': merged['product_balance'],
+            'avg_balance': merged['product_balance'] / np.maximum(count, 1),
+            'account_count': count,
+            'customer_count': merged['product_customers'],
+        }).round(2)
+
+    def _finish_credit_risk(self, merged) -> pd.DataFrame:
+        moments = {name: merged[f'customer_{name}'][:-1] for name in MOMENTS}
+        active = moments['count'] > 0
+        mean, std = amount_mean_std(moments)
+        customer_txn = pd.DataFrame({
+            'customer_id': self._customer_index[active],
+            'total_amount': moments['amount'][active],
+            'avg_amount': mean[active],
+            'std_amount': std[active],
+            'txn_count': moments['count'][active].astype(np.int64),
+            'fraud_count': moments['fraud_count'][active].astype(np.int64),
+        })
+        return self.engine.score_risk(self.engine.customers, customer_txn)
+
+    # ── Engine-compatible accessors ──────────────────────────────────
+
+    def get_daily_transaction_volume(self) -> pd.DataFrame:
+        return self.run('daily_volume')['daily_volume']
+
+    def get_fraud_trend(self) -> pd.DataFrame:
+        return self.run('fraud_trend')['fraud_trend']
+
+    def get_channel_analysis(self) -> pd.DataFrame:
+        return self.run('channel_analysis')['channel_analysis']
+
+    def get_fraud_statistics(self) -> Dict:
+        return self.run('fraud_statistics')['fraud_statistics']
+
+    def get_product_performance(self) -> pd.DataFrame:
+        return self.run('product_performance')['product_performance']
+
+    def credit_risk_score(self) -> pd.DataFrame:
+        return self.run('credit_risk')['credit_risk']
@@ -0,0 +1,305 @@
+"""
+Lazy Query Plans
+Chainable, deferred queries over a BankingAnalytics engine.
+
+Filters are recorded rather than applied; nothing is scanned until a
+result is requested. Date ranges are resolved through a sorted date index
+and categorical filters through cached factorized codes, so no boolean
+mask over the full frames and no full-width copies are built. Each result
+only materializes the columns it reads, and results requested together
+through ``collect`` share a single scan per table.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import timedelta
+from typing import Dict, List, Optional, Iterable, Tuple
+
+from .customer_risk import customer_moments
+from .leaderboard import leaderboard_frame, metric_values, top_k_positions
+
+
+# Result name -> (engine method, columns read per table). ``None`` keeps
+# every column, for results that echo the input rows back.
+_OPERATIONS = {
+    'daily_volume': ('get_daily_transaction_volume',
+                     {'transactions': ['transaction_date', 'amount']}),
+    'transaction_types': ('get_transaction_type_distribution',
+                          {'transactions': ['transaction_type']}),
+    'segment_analysis': ('get_customer_segment_analysis',
+                         {'customers': ['customer_id', 'segment', 'income', 'credit_score'],
+                          'products': ['customer_id', 'balance']}),
+    'fraud_statistics': ('get_fraud_statistics',
+                         {'transactions': ['is_fraud', 'amount']}),
+    'fraud_trend': ('get_fraud_trend',
+                    {'transactions': ['transaction_date', 'is_fraud']}),
+    'product_performance': ('get_product_performance',
+                            {'products': ['product_type', 'balance', 'customer_id']}),
+    'channel_analysis': ('get_channel_analysis',
+                         {'transactions': ['channel', 'amount', 'is_fraud']}),
+    'rfm_segmentation': ('rfm_segmentation',
+                         {'transactions': ['customer_id', 'transaction_date', 'amount']}),
+    'credit_risk': ('credit_risk_score',
+                    {'customers': None,
+                     'transactions': ['customer_id', 'amount', 'is_fraud']}),
+}
+
+RESULT_NAMES = tuple(_OPERATIONS)
+
+_TABLES = ('customers', 'transactions', 'products')
+
+
+def _date_index(engine) -> Tuple:
+    """Row order of ``engine.transactions`` by date and the sorted dates."""
+    if 'transaction_date' not in engine._indexes:
+        dates = engine.transactions['transaction_date'].to_numpy()
+        order = np.argsort(dates, kind='stable')
+        engine._indexes['transaction_date'] = (order, dates[order])
+    return engine._indexes['transaction_date']
+
+
+def _column_values(engine, frame: pd.DataFrame, table: str, column: str):
+    if column == 'segment' and table != 'customers':
+        segment_by_customer = engine.customers.set_index('customer_id')['segment']
+        return frame['customer_id'].map(segment_by_customer)
+    return frame[column]
+
+
+def _code_index(engine, table: str, column: str) -> Tuple[np.ndarray, pd.Index]:
+    """Factorized codes of ``column`` aligned with the rows of ``table``.
+
+    ``segment`` is resolved through ``customer_id`` for the transactions
+    and products tables, so a segment filter reaches every table.
+    """
+    key = (table, column)
+    if key not in engine._indexes:
+        codes, categories = pd.factorize(_column_values(engine, getattr(engine, table), table, column))
+        engine._indexes[key] = (codes, categories)
+    return engine._indexes[key]
+
+
+def extend_transaction_indexes(engine, appended: int):
+    """Extend the built transaction indexes over the last ``appended`` rows.
+
+    The new dates are sorted on their own and merged into the date index,
+    and only the new rows are factorized, so an append never re-sorts or
+    re-maps the whole table. Each index is replaced rather than modified,
+    so readers holding the previous one keep a consistent view.
+    """
+    frame = engine.transactions
+    offset = len(frame) - appended
+    new_rows = frame.iloc[offset:]
+    for key in list(engine._indexes):
+        if key == 'transaction_date':
+            order, dates = engine._indexes[key]
+            new_dates = new_rows['transaction_date'].to_numpy().astype(dates.dtype)
+            new_order = np.argsort(new_dates, kind='stable')
+            new_dates = new_dates[new_order]
+            # Ties go after the existing rows, as a stable sort of the whole table would put them
+            positions = np.searchsorted(dates, new_dates, side='right')
+            engine._indexes[key] = (np.insert(order, positions, new_order + offset),
+                                    np.insert(dates, positions, new_dates))
+        elif isinstance(key, tuple) and key[0] == 'transactions':
+            codes, categories = engine._indexes[key]
+            values = pd.Index(_column_values(engine, new_rows, *key))
+            new_codes = categories.get_indexer(values)
+            unseen = (new_codes < 0) & ~values.isna()
+            if unseen.any():
+                extra = pd.Index(pd.unique(values[unseen]))
+                new_codes[unseen] = len(categories) + extra.get_indexer(values[unseen])
+                categories = categories.append(extra)
+            engine._indexes[key] = (np.concatenate([codes, new_codes.astype(codes.dtype)]), categories)
+
+
+def warm_indexes(engine):
+    """Build every index a query can use, ahead of the first query."""
+    _date_index(engine)
+    for table in _TABLES:
+        _code_index(engine, table, 'segment')
+    _code_index(engine, 'transactions', 'channel')
+    _code_index(engine, 'products', 'product_type')
+
+
+class AnalyticsQuery:
+    """Deferred, chainable query over the frames of a BankingAnalytics engine.
+
+    Filter methods return a new query and leave the receiver untouched,
+    so a base query can be refined in several directions.
+    """
+
+    def __init__(self, engine, filters: Optional[Dict] = None):
+        self._engine = engine
+        self._filters = dict(filters or {})
+        self._rows: Dict[str, Optional[np.ndarray]] = {}
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    # ── Filters ──────────────────────────────────────────────────────
+
+    def _with(self, **filters) -> 'AnalyticsQuery':
+        return AnalyticsQuery(self._engine, {**self._filters, **filters})
+
+    def between(self, start, end) -> 'AnalyticsQuery':
+        """Keep transactions dated from ``start`` to ``end``, both days inclusive."""
+        return self._with(between=(pd.Timestamp(start).normalize(),
+                                   pd.Timestamp(end).normalize() + timedelta(days=1)))
+
+    def segments(self, segments: Iterable[str]) -> 'AnalyticsQuery':
+        """Keep customers in ``segments`` along with their transactions and products."""
+        return self._with(segment=tuple(segments))
+
+    def product_types(self, product_types: Iterable[str]) -> 'AnalyticsQuery':
+        return self._with(product_type=tuple(product_types))
+
+    def channels(self, channels: Iterable[str]) -> 'AnalyticsQuery':
+        return self._with(channel=tuple(channels))
+
+    # ── Planning ─────────────────────────────────────────────────────
+
+    def _categorical_filters(self, table: str) -> List[Tuple[str, tuple]]:
+        applicable = {
+            'customers': ['segment'],
+            'transactions': ['segment', 'channel'],
+            'products': ['segment', 'product_type'],
+        }[table]
+        return [(column, self._filters[column]) for column in applicable
+                if column in self._filters]
+
+    def _select_rows(self, table: str) -> Optional[np.ndarray]:
+        """Sorted row positions of ``table`` passing the filters, ``None`` for all rows."""
+        if table in self._rows:
+            return self._rows[table]
+        rows = None
+        if table == 'transactions' and 'between' in self._filters:
+            start, end = self._filters['between']
+            order, dates = _date_index(self._engine)
+            lo = np.searchsorted(dates, start.to_datetime64(), side='left')
+            hi = np.searchsorted(dates, end.to_datetime64(), side='left')
+            rows = np.sort(order[lo:hi])
+        for column, wanted in self._categorical_filters(table):
+            codes, categories = _code_index(self._engine, table, column)
+            wanted_codes = categories.get_indexer(list(wanted))
+            keep = np.isin(codes, wanted_codes[wanted_codes >= 0])
+            rows = np.flatnonzero(keep) if rows is None else rows[keep[rows]]
+        self._rows[table] = rows
+        return rows
+
+    def _scan(self, table: str, columns: Optional[Iterable[str]]) -> pd.DataFrame:
+        """Filtered ``table`` restricted to ``columns``, reusing any wider earlier scan."""
+        source = getattr(self._engine, table)
+        wanted = list(source.columns) if columns is None else list(columns)
+        cached = self._frames.get(table)
+        if cached is not None:
+            if set(wanted).issubset(cached.columns):
+                return cached[wanted]
+            wanted = list(cached.columns) + [c for c in wanted if c not in cached.columns]
+        rows = self._select_rows(table)
+        frame = source[wanted] if rows is None else source[wanted].iloc[rows]
+        self._frames[table] = frame
+        return frame if columns is None else frame[list(columns)]
+
+    def _required_columns(self, names: Iterable[str]) -> Dict[str, Optional[List[str]]]:
+        required: Dict[str, Optional[List[str]]] = {}
+        for name in names:
+            if name not in _OPERATIONS:
+                raise ValueError(f"Unknown result '{name}'. Available: {sorted(_OPERATIONS)}")
+            for table, columns in _OPERATIONS[name][1].items():
+                if table in required and required[table] is None:
+                    continue
+                if columns is None:
+                    required[table] = None
+                else:
+                    merged = required.get(table) or []
+                    required[table] = merged + [c for c in columns if c not in merged]
+        return required
+
+    def explain(self, *names: str) -> str:
+        """Describe how the given results would be executed."""
+        names = names or tuple(_OPERATIONS)
+        lines = []
+        for table, columns in self._required_columns(names).items():
+            access = 'full scan'
+            if table == 'transactions' and 'between' in self._filters:
+                access = 'date index range'
+            filters = [column for column, _ in self._categorical_filters(table)]
+            if filters:
+                access += ' + code filter on ' + ', '.join(filters)
+            projection = '*' if columns is None else ', '.join(columns)
+            lines.append(f"scan {table} [{access}] -> {projection}")
+        lines.extend(f"compute {name}" for name in names)
+        return '\n'.join(lines)
+
+    # ── Execution ────────────────────────────────────────────────────
+
+    def frame(self, table: str, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Filtered rows of ``table`` ('customers', 'transactions' or 'products')."""
+        if table not in _TABLES:
+            raise ValueError(f"Unknown table '{table}'. Available: {list(_TABLES)}")
+        return self._scan(table, columns)
+
+    def count(self, table: str) -> int:
+        rows = self._select_rows(table)
+        return len(getattr(self._engine, table)) if rows is None else len(rows)
+
+    def collect(self, *names: str) -> Dict:
+        """Compute several results with one pruned scan per table."""
+        required = self._required_columns(names)
+        for table, columns in required.items():
+            self._scan(table, columns)
+        results = {}
+        for name in names:
+            method, reads = _OPERATIONS[name]
+            kwargs = {f'{table}_df': self._scan(table, required[table]) for table in reads}
+            results[name] = getattr(self._engine, method)(**kwargs)
+        return results
+
+    def approximate(self, latency_target: float = 0.05, rows: Optional[int] = None,
+                    confidence: float = 0.95):
+        """Estimates over the engine's stratified sample, restricted to this query's filters.
+
+        The sample is sized to ``latency_target`` seconds unless ``rows`` is given.
+        """
+        return self._engine.sample().query(self._filters, rows, latency_target, confidence)
+
+    def top_customers(self, metric: str = 'volume', k: int = 10) -> pd.DataFrame:
+        """Top ``k`` customers by ``metric`` over the filtered transactions, without a full sort."""
+        customers = self._engine.customers
+        if 'segment' in self._filters:
+            customers = self._scan('customers', None)
+        transactions = self._scan('transactions', ['customer_id', 'amount', 'is_fraud'])
+        codes = pd.Index(customers['customer_id']).get_indexer(transactions['customer_id'])
+        stats = customer_moments(codes, transactions['amount'].to_numpy(dtype=float),
+                                 transactions['is_fraud'].to_numpy(dtype=float), len(customers))
+        values = metric_values(stats, customers['credit_score'].to_numpy(dtype=float), metric)
+        return leaderboard_frame(customers, values, top_k_positions(values, k), metric)
+
+    def _compute(self, name: str):
+        return self.collect(name)[name]
+
+    def daily_volume(self) -> pd.DataFrame:
+        return self._compute('daily_volume')
+
+    def transaction_types(self) -> pd.DataFrame:
+        return self._compute('transaction_types')
+
+    def segment_analysis(self) -> pd.DataFrame:
+        return self._compute('segment_analysis')
+
+    def fraud_statistics(self) -> Dict:
+        return self._compute('fraud_statistics')
+
+    def fraud_trend(self) -> pd.DataFrame:
+        return self._compute('fraud_trend')
+
+    def product_performance(self) -> pd.DataFrame:
+        return self._compute('product_performance')
+
+    def channel_analysis(self) -> pd.DataFrame:
+        return self._compute('channel_analysis')
+
+    def rfm_segmentation(self) -> pd.DataFrame:
+        return self._compute('rfm_segmentation')
+
+    def credit_risk(self) -> pd.DataFrame:
+        return self._compute('credit_risk')
@@ -0,0 +1,296 @@
+"""
+Credit Risk Model Scoring
+Offline-trained credit risk classifier served through a micro-batching
+scorer.
+
+Feature vectors are built per customer from the profile and from the
+same transaction and product aggregates credit_risk_score uses. There
+are no observed default outcomes yet, so the model learns the
+rule-based High/Critical risk levels. The model is a gradient-boosted
+tree ensemble, trained offline and saved with joblib. The scorer queues
+requests and flushes them as one vectorized predict_proba call. A flush
+happens when M rows are waiting or the oldest request has waited N
+milliseconds. Per-request latency and batch sizes are recorded, and
+throughput and p99 latency are reported under concurrent load.
+
+    python -m backend.services.risk_model --out models/risk_model.joblib --clients 32
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+FEATURES = [
+    'age', 'income', 'credit_score', 'num_products', 'tenure_days', 'is_active',
+    'total_amount', 'avg_amount', 'std_amount', 'txn_count', 'fraud_count',
+    'total_balance', 'product_count',
+]
+
+# Rule-based risk levels treated as the positive class
+HIGH_RISK_LEVELS = ('High', 'Critical')
+
+
+def build_features(customers: pd.DataFrame, transactions: pd.DataFrame,
+                   products: pd.DataFrame) -> pd.DataFrame:
+    """One row of FEATURES per customer, indexed by customer_id."""
+    customer_txn = transactions.groupby('customer_id').agg(
+        total_amount=('amount', 'sum'),
+        avg_amount=('amount', 'mean'),
+        std_amount=('amount', 'std'),
+        txn_count=('amount', 'size'),
+        fraud_count=('is_fraud', 'sum'),
+    )
+    customer_products = products.groupby('customer_id').agg(
+        total_balance=('balance', 'sum'),
+        product_count=('balance', 'size'),
+    )
+    features = customers.set_index('customer_id')
+    opened = pd.to_datetime(features['account_opening_date'])
+    features = features.assign(
+        tenure_days=(pd.Timestamp(datetime.now()) - opened).dt.days,
+        is_active=features['is_active'].astype(float),
+    ).join(customer_txn).join(customer_products)
+    return features[FEATURES].astype(float).fillna(0)
+
+
+def risk_labels(engine) -> pd.Series:
+    """1 for customers the rule-based credit_risk_score rates High or Critical."""
+    risk = engine.credit_risk_score().set_index('customer_id')
+    return risk['risk_level'].isin(HIGH_RISK_LEVELS).astype(int)
+
+
+class RiskModel:
+    """Gradient-boosted credit risk classifier over FEATURES."""
+
+    def __init__(self, estimator=None, features: Optional[List[str]] = None):
+        self.estimator = estimator
+        self.features = list(features or FEATURES)
+        self.metrics: Dict[str, float] = {}
+
+    @classmethod
+    def train(cls, features: pd.DataFrame, labels: pd.Series, seed: int = 42) -> 'RiskModel':
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        from sklearn.metrics import roc_auc_score
+        from sklearn.model_selection import train_test_split
+
+        X = features[FEATURES].to_numpy()
+        y = labels.reindex(features.index).fillna(0).to_numpy(dtype=int)
+        stratify = y if 1 < y.sum() < len(y) - 1 else None
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=seed,
+                                                            stratify=stratify)
+        estimator = HistGradientBoostingClassifier(max_iter=200, learning_rate=0.1, random_state=seed)
+        estimator.fit(X_train, y_train)
+        model = cls(estimator)
+        model.metrics['train_rows'] = len(X_train)
+        if len(np.unique(y_test)) > 1:
+            model.metrics['test_auc'] = float(roc_auc_score(y_test, model.predict_proba(X_test)))
+        return model
+
+    @classmethod
+    def train_from(cls, engine, seed: int = 42) -> 'RiskModel':
+        features = build_features(engine.customers, engine.transactions, engine.products)
+        return cls.train(features, risk_labels(engine), seed)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probability of high credit risk for each row of ``X``."""
+        return self.estimator.predict_proba(X)[:, 1]
+
+    def save(self, path: str):
+        import joblib
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        joblib.dump({'estimator': self.estimator, 'features': self.features, 'metrics': self.metrics}, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'RiskModel':
+        import joblib
+        state = joblib.load(path)
+        model = cls(state['estimator'], state['features'])
+        model.metrics = state['metrics']
+        return model
+
+
+class MicroBatchScorer:
+    """Coalesce scoring requests into vectorized predictions.
+
+    A batch is flushed once ``max_batch_rows`` rows are waiting or the
+    oldest waiting request is ``max_wait_ms`` old, whichever comes first.
+    """
+
+    def __init__(self, model: RiskModel, features: pd.DataFrame,
+                 max_batch_rows: int = 256, max_wait_ms: float = 5.0):
+        self.model = model
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self._index = pd.Index(features.index)
+        self._matrix = features[model.features].to_numpy(dtype=float)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self.reset_stats()
+        self._thread = threading.Thread(target=self._run, name='risk-scorer', daemon=True)
+        self._thread.start()
+
+    def submit(self, customer_ids: Union[str, Iterable[str]]) -> Future:
+        """Queue ``customer_ids``; the future resolves to a probability, or an array for a list."""
+        single = isinstance(customer_ids, str)
+        ids = [customer_ids] if single else list(customer_ids)
+        positions = self._index.get_indexer(ids)
+        if (positions < 0).any():
+            raise KeyError(f"Unknown customers: {[i for i, p in zip(ids, positions) if p < 0]}")
+        future: Future = Future()
+        self._queue.put((positions, future, single, time.perf_counter()))
+        return future
+
+    def score(self, customer_ids: Union[str, Iterable[str]]):
+        return self.submit(customer_ids).result()
+
+    def _collect(self, first) -> List:
+        batch, rows = [first], len(first[0])
+        deadline = first[3] + self.max_wait
+        while rows < self.max_batch_rows:
+            # Past the deadline, only take what is already waiting
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            # Requests cancelled while queued (e.g. a dropped API call) are not scored
+            batch = [item for item in self._collect(first) if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            positions = np.concatenate([item[0] for item in batch])
+            try:
+                scores = self.model.predict_proba(self._matrix[positions])
+            except Exception as error:
+                for _, future, _, _ in batch:
+                    self._resolve(future, exception=error)
+                continue
+            done = time.perf_counter()
+            with self._lock:
+                self._latencies.extend(done - item[3] for item in batch)
+                self._batches += 1
+                self._rows += len(positions)
+                self._first = self._first or min(item[3] for item in batch)
+                self._last = done
+            offset = 0
+            for rows, future, single, _ in batch:
+                result = scores[offset:offset + len(rows)]
+                offset += len(rows)
+                self._resolve(future, result=float(result[0]) if single else result)
+
+    @staticmethod
+    def _resolve(future: Future, result=None, exception: Optional[BaseException] = None):
+        """Settle ``future``; a future that cannot be settled must not stop the scorer thread."""
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def reset_stats(self):
+        with self._lock:
+            self._latencies: deque = deque(maxlen=100000)
+            self._batches = 0
+            self._rows = 0
+            self._first: Optional[float] = None
+            self._last: Optional[float] = None
+
+    def stats(self) -> Dict[str, float]:
+        """Requests, rows, batches, throughput (rows/s) and latency percentiles (ms)."""
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            elapsed = (self._last - self._first) if self._first is not None else 0.0
+            return {
+                'requests': len(latencies),
+                'rows': self._rows,
+                'batches': self._batches,
+                'avg_batch_rows': self._rows / self._batches if self._batches else 0.0,
+                'throughput_rows_per_s': self._rows / elapsed if elapsed > 0 else 0.0,
+                'p50_latency_ms': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+                'p99_latency_ms': float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+            }
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_test(scorer: MicroBatchScorer, customer_ids: List[str], clients: int = 32,
+              requests_per_client: int = 200, seed: int = 42) -> Dict[str, float]:
+    """Score random customers from ``clients`` concurrent threads; returns the scorer stats."""
+    rng = np.random.default_rng(seed)
+    plans = [rng.choice(customer_ids, size=requests_per_client) for _ in range(clients)]
+    scorer.reset_stats()
+
+    def client(plan):
+        for customer_id in plan:
+            scorer.score(customer_id)
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, plans))
+    return scorer.stats()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Train the credit risk model and load-test the scorer')
+    parser.add_argument('--num-customers', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='models/risk_model.joblib')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=200, help='requests per client')
+    parser.add_argument('--max-batch-rows', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+    from backend.services.analytics_engine import BankingAnalytics
+    from backend.services.data_generator import BankingDataGenerator
+
+    data = BankingDataGenerator(seed=args.seed).generate_complete_dataset(args.num_customers)
+    engine = BankingAnalytics(data['customers'], data['transactions'], data['products'])
+    model = RiskModel.train_from(engine, args.seed)
+    model.save(args.out)
+    print(f"model saved to {args.out}: {model.metrics}")
+
+    features = build_features(engine.customers, engine.transactions, engine.products)
+    ids = list(features.index)
+    for label, rows in (('unbatched', 1), ('micro-batched', args.max_batch_rows)):
+        with MicroBatchScorer(model, features, rows, args.max_wait_ms) as scorer:
+            stats = load_test(scorer, ids, args.clients, args.requests, args.seed)
+        print(f"{label:>14}: {stats['throughput_rows_per_s']:,.0f} rows/s, "
+              f"p99 {stats['p99_latency_ms']:.1f} ms, avg batch {stats['avg_batch_rows']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
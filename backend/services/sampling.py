@@ -0,0 +1,253 @@
+"""
+Approximate Analytics
+Stratified transaction samples that answer fraud, channel and volume
+queries with confidence intervals.
+
+Transactions are stratified by segment, channel and fraud label, and
+every row gets a fixed random priority. Within each stratum the rows are
+kept in priority order, so a sample of any size is a prefix of every
+stratum. Samples are persistent and nested, and a larger sample only
+refines a smaller one. Each stratum keeps a minimum number of rows, so
+the rare fraud class is always present. Totals use the stratified
+(Horvitz-Thompson) estimator, and rates use a linearized ratio estimator.
+The sample size comes from a latency target and the measured estimator
+throughput.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import time
+from statistics import NormalDist
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .query_plan import _code_index
+
+STRATA = ['segment', 'channel', 'is_fraud']
+
+# Rows used to measure estimator throughput for latency targets
+CALIBRATION_ROWS = 20000
+
+
+class _Draw:
+    """Sampled rows with their stratum and the stratum sample/population sizes."""
+
+    def __init__(self, sample: 'StratifiedSample', taken: np.ndarray):
+        self.taken = taken
+        self.population = sample._sizes.astype(float)
+        positions = np.concatenate([sample._order[start:start + n]
+                                    for start, n in zip(sample._starts, taken)])
+        self.stratum = np.repeat(np.arange(len(taken)), taken)
+        self.columns = {name: values[positions] for name, values in sample._columns.items()}
+
+    def __len__(self) -> int:
+        return len(self.stratum)
+
+
+class StratifiedSample:
+    """Persistent stratified sample of an engine's transactions."""
+
+    def __init__(self, engine, min_per_stratum: int = 30, seed: int = 42):
+        self.engine = engine
+        self.frame = engine.transactions
+        self.min_per_stratum = min_per_stratum
+        segment, self.segments = _code_index(engine, 'transactions', 'segment')
+        channel, self.channels = _code_index(engine, 'transactions', 'channel')
+        self._segment_index = engine._indexes[('transactions', 'segment')]
+        fraud = self.frame['is_fraud'].to_numpy().astype(bool)
+
+        # Codes are shifted by one so rows with an unknown segment form their own strata
+        stratum = ((segment + 1) * (len(self.channels) + 1) + channel + 1) * 2 + fraud
+        priority = np.random.default_rng(seed).random(len(self.frame))
+        self._order = np.lexsort((priority, stratum))
+        _, self._starts, self._sizes = np.unique(stratum[self._order], return_index=True,
+                                                 return_counts=True)
+        self._columns = {
+            'date': self.frame['transaction_date'].to_numpy().astype('datetime64[D]'),
+            'amount': self.frame['amount'].to_numpy(dtype=float),
+            'is_fraud': fraud.astype(float),
+            'segment': segment,
+            'channel': channel,
+        }
+        self._draws: Dict[int, _Draw] = {}
+        self._rows_per_second: Optional[float] = None
+
+    def is_current(self) -> bool:
+        """Whether the engine's transactions and segments are the ones sampled."""
+        return (self.engine.transactions is self.frame
+                and self.engine._indexes.get(('transactions', 'segment')) is self._segment_index)
+
+    @property
+    def population(self) -> int:
+        return int(self._sizes.sum())
+
+    def allocate(self, rows: int) -> np.ndarray:
+        """Rows per stratum: proportional to its size, at least ``min_per_stratum``."""
+        proportional = np.ceil(rows * self._sizes / max(self.population, 1)).astype(int)
+        return np.minimum(np.maximum(proportional, self.min_per_stratum), self._sizes)
+
+    def draw(self, rows: int) -> _Draw:
+        taken = self.allocate(rows)
+        key = int(taken.sum())
+        if key not in self._draws:
+            self._draws[key] = _Draw(self, taken)
+        return self._draws[key]
+
+    def rows_for(self, latency_target: float) -> int:
+        """Sample size whose estimates are expected to finish within ``latency_target`` seconds."""
+        if self._rows_per_second is None:
+            draw = self.draw(min(CALIBRATION_ROWS, self.population))
+            query = ApproximateQuery(self, {}, len(draw))
+            started = time.perf_counter()
+            query.fraud_statistics()
+            query.channel_analysis()
+            query.daily_volume()
+            self._rows_per_second = len(draw) / max(time.perf_counter() - started, 1e-6)
+        return int(min(max(self._rows_per_second * latency_target, 1), self.population))
+
+    def query(self, filters: Optional[Dict] = None, rows: Optional[int] = None,
+              latency_target: float = 0.05, confidence: float = 0.95) -> 'ApproximateQuery':
+        if rows is None:
+            rows = self.rows_for(latency_target)
+        return ApproximateQuery(self, filters or {}, rows, confidence)
+
+
+class ApproximateQuery:
+    """Fraud, channel and volume estimates over one sample draw.
+
+    ``filters`` are those of an AnalyticsQuery; the date range, segment
+    and channel filters restrict the estimates to that domain.
+    """
+
+    def __init__(self, sample: StratifiedSample, filters: Dict, rows: int, confidence: float = 0.95):
+        self.sample = sample
+        self.filters = filters
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.draw = sample.draw(rows)
+        self.mask = self._domain()
+
+    def _domain(self) -> np.ndarray:
+        columns = self.draw.columns
+        mask = np.ones(len(self.draw), dtype=bool)
+        if 'between' in self.filters:
+            start, end = self.filters['between']
+            mask &= (columns['date'] >= start.to_datetime64()) & (columns['date'] < end.to_datetime64())
+        for column, categories in (('segment', self.sample.segments), ('channel', self.sample.channels)):
+            if column in self.filters:
+                wanted = categories.get_indexer(list(self.filters[column]))
+                mask &= np.isin(columns[column], wanted[wanted >= 0])
+        return mask
+
+    # ── Estimators ───────────────────────────────────────────────────
+
+    def _total(self, y: np.ndarray, groups: Optional[np.ndarray] = None,
+               n_groups: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Stratified estimate of the total of ``y`` per group, and its variance."""
+        strata = len(self.draw.taken)
+        key = self.draw.stratum if groups is None else groups * strata + self.draw.stratum
+        s1 = np.bincount(key, weights=y, minlength=n_groups * strata).reshape(n_groups, strata)
+        s2 = np.bincount(key, weights=y * y, minlength=n_groups * strata).reshape(n_groups, strata)
+        n = self.draw.taken.astype(float)
+        N = self.draw.population
+        estimate = (s1 * (N / n)).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            within = np.where(n > 1, (s2 - s1 ** 2 / n) / (n - 1), 0.0)
+        variance = (N ** 2 * (1 - n / N) * np.maximum(within, 0) / n).sum(axis=1)
+        return estimate, variance
+
+    def _ratio(self, y: np.ndarray, x: np.ndarray, groups: Optional[np.ndarray] = None,
+               n_groups: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Ratio of two totals per group, with its linearized variance."""
+        total_y, _ = self._total(y, groups, n_groups)
+        total_x, _ = self._total(x, groups, n_groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(total_x > 0, total_y / total_x, 0.0)
+        residual = y - (ratio[groups] if groups is not None else ratio[0]) * x
+        _, variance = self._total(residual, groups, n_groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance = np.where(total_x > 0, variance / total_x ** 2, 0.0)
+        return ratio, variance
+
+    def _interval(self, estimate, variance, low: float = 0.0, high: float = np.inf):
+        margin = self.z * np.sqrt(variance)
+        return np.clip(estimate - margin, low, high), np.clip(estimate + margin, low, high)
+
+    def _columns(self):
+        columns = self.draw.columns
+        one = self.mask.astype(float)
+        return one, columns['amount'] * one, columns['is_fraud'] * one
+
+    # ── Results ──────────────────────────────────────────────────────
+
+    def fraud_statistics(self) -> Dict:
+        """Estimate of BankingAnalytics.get_fraud_statistics with confidence intervals."""
+        one, amount, fraud = self._columns()
+        fraud_amount = amount * fraud
+        estimates = {
+            'total_transactions': self._total(one),
+            'fraud_count': self._total(fraud),
+            'fraud_rate': self._ratio(fraud, one),
+            'fraud_amount': self._total(fraud_amount),
+            'avg_fraud_amount': self._ratio(fraud_amount, fraud),
+            'total_amount': self._total(amount),
+        }
+        result: Dict = {}
+        intervals = {}
+        for name, (estimate, variance) in estimates.items():
+            low, high = self._interval(estimate, variance, high=1.0 if name == 'fraud_rate' else np.inf)
+            result[name] = float(estimate[0])
+            intervals[name] = (float(low[0]), float(high[0]))
+        result['total_transactions'] = int(round(result['total_transactions']))
+        result['fraud_count'] = int(round(result['fraud_count']))
+        result.update(confidence_intervals=intervals, confidence=self.confidence,
+                      sample_rows=int(self.mask.sum()), approximate=True)
+        return result
+
+    def channel_analysis(self) -> pd.DataFrame:
+        """Estimate of BankingAnalytics.get_channel_analysis with interval columns."""
+        one, amount, fraud = self._columns()
+        channel = np.maximum(self.draw.columns['channel'], 0)
+        n_channels = len(self.sample.channels)
+        volume = self._total(amount, channel, n_channels)
+        count = self._total(one, channel, n_channels)
+        fraud_count = self._total(fraud, channel, n_channels)
+        avg_amount, _ = self._ratio(amount, one, channel, n_channels)
+        fraud_rate, rate_variance = self._ratio(fraud, one, channel, n_channels)
+
+        analysis = pd.DataFrame({
+            'channel': np.asarray(self.sample.channels, dtype=object),
+            'total_volume': volume[0],
+            'avg_amount': avg_amount,
+            'transaction_count': np.round(count[0]).astype(int),
+            'fraud_count': np.round(fraud_count[0]).astype(int),
+            'fraud_rate': fraud_rate * 100,
+        })
+        analysis['total_volume_low'], analysis['total_volume_high'] = self._interval(*volume)
+        analysis['transaction_count_low'], analysis['transaction_count_high'] = self._interval(*count)
+        low, high = self._interval(fraud_rate, rate_variance, high=1.0)
+        analysis['fraud_rate_low'], analysis['fraud_rate_high'] = low * 100, high * 100
+        seen = np.bincount(channel[self.mask], minlength=n_channels) > 0
+        return analysis[seen].sort_values('channel').round(2).reset_index(drop=True)
+
+    def daily_volume(self) -> pd.DataFrame:
+        """Estimate of BankingAnalytics.get_daily_transaction_volume with interval columns."""
+        _, amount, _ = self._columns()
+        dates = self.draw.columns['date']
+        if not self.mask.any():
+            return pd.DataFrame(columns=['date', 'volume', 'volume_low', 'volume_high'])
+        first = dates[self.mask].min()
+        day = np.where(self.mask, (dates - first).astype(np.int64), 0)
+        n_days = int(day.max()) + 1
+        volume, variance = self._total(amount, day, n_days)
+        low, high = self._interval(volume, variance)
+        seen = np.bincount(day[self.mask], minlength=n_days) > 0
+        daily = pd.DataFrame({
+            'date': pd.to_datetime(first + np.arange(n_days)),
+            'volume': volume,
+            'volume_low': low,
+            'volume_high': high,
+        })
+        return daily[seen].reset_index(drop=True)
@@ -0,0 +1,180 @@
+"""
+Startup Profiling
+Cold-start helpers for the dashboard: lazy imports, background warm-up
+and an import/startup timing report, plus the per-panel recorder the
+load-test harness reads.
+
+Run ``python -m backend.services.startup --budget 5`` to time the imports
+the dashboard pays before its first render; the command exits non-zero
+when the total exceeds the budget, so it can guard the container image.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import argparse
+import importlib
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Modules frontend/app.py imports before it can render anything
+DASHBOARD_MODULES = [
+    'streamlit',
+    'pandas',
+    'numpy',
+    'backend.services.startup',
+    'backend.services.dataset_cache',
+    'backend.services.analytics_engine',
+    'backend.services.chart_data',
+    'backend.services.query_plan',
+]
+
+LAZY = os.environ.get('BANKING_STARTUP_MODE', 'lazy') != 'eager'
+
+
+class StartupProfiler:
+    """Wall-clock timings of named startup phases, each recorded once."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.phases.setdefault(name, (start - self.started, end - start))
+
+    def report(self) -> List[Dict]:
+        """Phases ordered by start, with offsets and durations in milliseconds."""
+        return [
+            {'phase': name, 'start_ms': round(offset * 1000, 1), 'duration_ms': round(duration * 1000, 1)}
+            for name, (offset, duration) in sorted(self.phases.items(), key=lambda item: item[1][0])
+        ]
+
+
+PROFILER = StartupProfiler()
+
+
+class PanelRecorder:
+    """Wall and CPU time of each rendered panel, per load-test session."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: Dict[str, List[Tuple[str, float, float]]] = defaultdict(list)
+
+    @contextmanager
+    def panel(self, session: Optional[str], name: str):
+        if session is None:
+            yield
+            return
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            record = (name, time.perf_counter() - wall, time.thread_time() - cpu)
+            with self._lock:
+                self._records[session].append(record)
+
+    def drain(self, session: str) -> List[Tuple[str, float, float]]:
+        with self._lock:
+            return self._records.pop(session, [])
+
+
+# Only sessions tagged by the load-test harness are recorded
+RECORDER = PanelRecorder()
+
+
+def lazy_import(name: str):
+    """Import ``name`` on first use and record how long the import took."""
+    if name in sys.modules:
+        return sys.modules[name]
+    with PROFILER.phase(f'import {name}'):
+        return importlib.import_module(name)
+
+
+class BackgroundWarmup:
+    """Run ``factory`` on a daemon thread; ``result()`` waits for it."""
+
+    def __init__(self, factory: Callable, name: str = 'warmup'):
+        self._result = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, args=(factory, name),
+                                        name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self, factory: Callable, name: str):
+        try:
+            with PROFILER.phase(name):
+                self._result = factory()
+        except BaseException as exc:
+            self._error = exc
+
+    @property
+    def ready(self) -> bool:
+        return not self._thread.is_alive()
+
+    def result(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise TimeoutError('warm-up still running')
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def import_times(modules: List[str]) -> List[Dict]:
+    """Cumulative import time per module from a fresh ``python -X importtime``."""
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+    code = '; '.join(f'import {module}' for module in modules)
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, cwd=root, check=True
+    )
+    pattern = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = pattern.match(line)
+        if match:
+            rows.append({
+                'module': match.group(4),
+                'self_ms': int(match.group(1)) / 1000,
+                'cumulative_ms': int(match.group(2)) / 1000,
+                'top_level': len(match.group(3)) == 1,
+            })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Dashboard import/startup timing report')
+    parser.add_argument('--budget', type=float, default=None,
+                        help='fail when total import time exceeds this many seconds')
+    parser.add_argument('--top', type=int, default=15, help='slowest modules to list')
+    parser.add_argument('modules', nargs='*', default=DASHBOARD_MODULES)
+    args = parser.parse_args(argv)
+
+    rows = import_times(args.modules)
+    total_ms = sum(row['cumulative_ms'] for row in rows if row['top_level'])
+    print(f"{'module':<50} {'self ms':>10} {'cumul ms':>10}")
+    for row in sorted(rows, key=lambda r: r['cumulative_ms'], reverse=True)[:args.top]:
+        print(f"{row['module']:<50} {row['self_ms']:>10.1f} {row['cumulative_ms']:>10.1f}")
+    print(f"\nTotal import time: {total_ms / 1000:.2f}s")
+    if args.budget is not None and total_ms / 1000 > args.budget:
+        print(f"Over cold-start budget of {args.budget:.2f}s")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,21 +3,27 @@ Banking Analytics Dashboard - Main Streamlit Application
 Advanced GCP/Looker Integration for Financial Services
 """
 
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
-from datetime import datetime, timedelta
 import os
 import sys
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Add src directory to path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from backend.services.startup import LAZY, PROFILER, RECORDER, BackgroundWarmup, lazy_import
 
-from data_generator import BankingDataGenerator
-from analytics_engine import BankingAnalytics
+with PROFILER.phase('import streamlit'):
+    import streamlit as st
+with PROFILER.phase('import backend'):
+    import pandas as pd
+    import numpy as np
+    from backend.services.dataset_cache import DatasetCache
+    from backend.services.analytics_engine import BankingAnalytics
+    from backend.services.chart_data import FigureCache, downsample_series, histogram_bins, plotly_json_chart
+    from backend.services.query_plan import warm_indexes
+
+if not LAZY:
+    lazy_import('plotly.express')
 
 # Page configuration
 st.set_page_config(
@@ -52,9 +58,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
 def load_data():
-    """Load or generate banking data"""
+    """Load or generate banking data (called once, from the shared warm-up)"""
     data_path = "../data/"
     
     # Check if data files exist
@@ -72,47 +77,66 @@ def load_data():
         products['opening_date'] = pd.to_datetime(products['opening_date'])
         
     else:
-        # Generate new data
-        generator = BankingDataGenerator()
-        datasets = generator.generate_complete_dataset(5000)
+        # Generated data is cached on disk and memory-mapped on later runs
+        datasets = DatasetCache().load(5000)
         
         customers = datasets['customers']
         transactions = datasets['transactions']
         products = datasets['products']
-        
-        # Create data directory if it doesn't exist
-        os.makedirs(data_path, exist_ok=True)
-        
-        # Save data
-        customers.to_csv(f"{data_path}customers.csv", index=False)
-        transactions.to_csv(f"{data_path}transactions.csv", index=False)
-        products.to_csv(f"{data_path}products.csv", index=False)
     
     return customers, transactions, products
 
-def main():
-    """Main application function"""
-    
-    # Header
-    st.markdown('<h1 class="main-header">🏦 Banking Analytics Dashboard</h1>', 
-                unsafe_allow_html=True)
-    st.markdown('<p style="text-align: center; color: #666; font-size: 1.1rem;">Advanced GCP/Looker Integration for Financial Services</p>', 
-                unsafe_allow_html=True)
-    
-    # Load data
-    with st.spinner("Loading banking data..."):
-        customers, transactions, products = load_data()
-    
-    # Initialize analytics engine
+def build_analytics():
+    """Load the data, build the analytics engine, its query indexes and its sample"""
+    customers, transactions, products = load_data()
     analytics = BankingAnalytics(customers, transactions, products)
-    
-    # Sidebar
+    warm_indexes(analytics)
+    analytics.sample()
+    return analytics
+
+@st.cache_resource
+def analytics_warmup():
+    """Analytics engine shared by every session, built on a background thread"""
+    return BackgroundWarmup(build_analytics, name='build analytics')
+
+@st.cache_resource
+def figure_cache():
+    """Serialized figures shared by every rerun, keyed by panel and filter state"""
+    return FigureCache()
+
+LEADERBOARD_METRICS = {
+    'Transaction Volume': 'volume',
+    'Fraud Exposure': 'fraud_exposure',
+    'Risk Score': 'risk_score',
+    'Transactions': 'transactions'
+}
+
+def dashboard_engine():
+    """Analytics engine shared by every session, waiting for the warm-up if needed"""
+    try:
+        return analytics_warmup().result()
+    except Exception:
+        # Drop the failed warm-up so the next rerun retries instead of re-raising it
+        analytics_warmup.clear()
+        raise
+
+def filter_options(analytics):
+    """Values each filter can take: the date bounds and the selectable options"""
+    dates = analytics.transactions['transaction_date']
+    return {
+        'date_range': (dates.min().date(), dates.max().date()),
+        'segments': list(analytics.customers['segment'].unique()),
+        'product_types': list(analytics.products['product_type'].unique()),
+        'metric': list(LEADERBOARD_METRICS)
+    }
+
+def sidebar_filters(options):
+    """Render the sidebar controls and return the selected filters"""
     st.sidebar.markdown('<div class="sidebar-header">📊 Dashboard Controls</div>', 
                        unsafe_allow_html=True)
     
     # Date range filter
-    min_date = transactions['transaction_date'].min().date()
-    max_date = transactions['transaction_date'].max().date()
+    min_date, max_date = options['date_range']
     
     date_range = st.sidebar.date_input(
         "Select Date Range",
@@ -124,61 +148,92 @@ def main():
     # Customer segment filter
     segments = st.sidebar.multiselect(
         "Customer Segments",
-        options=customers['segment'].unique(),
-        default=customers['segment'].unique()
+        options=options['segments'],
+        default=options['segments']
     )
     
     # Product filter
     product_types = st.sidebar.multiselect(
         "Product Types",
-        options=products['product_type'].unique(),
-        default=products['product_type'].unique()
+        options=options['product_types'],
+        default=options['product_types']
+    )
+    
+    # Sampled estimates render first and are replaced once the exact result is ready
+    preview = st.sidebar.checkbox(
+        "Approximate preview",
+        value=True,
+        help="Show sampled estimates with 95% confidence intervals while exact results compute"
     )
     
-    # Filter data based on selections
+    return {
+        'date_range': tuple(date_range),
+        'segments': segments,
+        'product_types': product_types,
+        'preview': preview
+    }
+
+def render(analytics, filters, session=None):
+    """Render every dashboard panel for the given filters
+    
+    Panel timings are recorded for load-test sessions, which also choose the
+    leaderboard ranking through ``filters['metric']``.
+    """
+    date_range, segments, product_types = filters['date_range'], filters['segments'], filters['product_types']
+    
+    # Build a lazy query for the selections; nothing is filtered until a panel reads it
+    query = analytics.query().segments(segments).product_types(product_types)
     if len(date_range) == 2:
         start_date, end_date = date_range
-        filtered_transactions = transactions[
-            (transactions['transaction_date'].dt.date >= start_date) &
-            (transactions['transaction_date'].dt.date <= end_date)
-        ]
-    else:
-        filtered_transactions = transactions
+        query = query.between(start_date, end_date)
+    filter_state = (tuple(date_range), tuple(sorted(segments)), tuple(sorted(product_types)))
+    with RECORDER.panel(session, 'approximate_preview'):
+        approx_stats = query.approximate().fraud_statistics() if filters['preview'] else None
+    figures = figure_cache()
     
-    filtered_customers = customers[customers['segment'].isin(segments)]
-    filtered_products = products[products['product_type'].isin(product_types)]
+    def chart(panel, build):
+        with PROFILER.phase(f'first render {panel}'), RECORDER.panel(session, panel):
+            plotly_json_chart(figures.get_json((panel, filter_state), build))
     
     # Key Metrics Row
     st.markdown("## 📈 Key Performance Indicators")
     
     col1, col2, col3, col4 = st.columns(4)
     
-    with col1:
-        total_customers = len(filtered_customers)
+    with col1, RECORDER.panel(session, 'total_customers'):
+        total_customers = query.count('customers')
         st.metric(
             label="Total Customers",
             value=f"{total_customers:,}",
             delta=f"+{int(total_customers * 0.05):,} vs last month"
         )
     
-    with col2:
-        total_transactions = len(filtered_transactions)
+    with col2, RECORDER.panel(session, 'total_transactions'):
+        total_transactions = query.count('transactions')
         st.metric(
             label="Total Transactions",
             value=f"{total_transactions:,}",
             delta=f"+{int(total_transactions * 0.12):,} vs last month"
         )
     
-    with col3:
-        total_volume = filtered_transactions['amount'].sum()
-        st.metric(
+    with col3, RECORDER.panel(session, 'transaction_volume'):
+        volume_metric = st.empty()
+        if approx_stats:
+            low, high = approx_stats['confidence_intervals']['total_amount']
+            volume_metric.metric(
+                label="Transaction Volume",
+                value=f"≈ R$ {approx_stats['total_amount']:,.0f}",
+                help=f"Estimated: R$ {low:,.0f} – R$ {high:,.0f} (95% CI)"
+            )
+        total_volume = query.frame('transactions', ['amount'])['amount'].sum()
+        volume_metric.metric(
             label="Transaction Volume",
             value=f"R$ {total_volume:,.0f}",
             delta=f"+R$ {int(total_volume * 0.08):,} vs last month"
         )
     
-    with col4:
-        avg_balance = filtered_products['balance'].mean()
+    with col4, RECORDER.panel(session, 'avg_balance'):
+        avg_balance = query.frame('products', ['balance'])['balance'].mean()
         st.metric(
             label="Avg Account Balance",
             value=f"R$ {avg_balance:,.0f}",
@@ -191,29 +246,34 @@ def main():
     col1, col2 = st.columns(2)
     
     with col1:
-        # Daily transaction volume
-        daily_volume = analytics.get_daily_transaction_volume(filtered_transactions)
-        fig_volume = px.line(
-            daily_volume, 
-            x='date', 
-            y='volume',
-            title="Daily Transaction Volume",
-            labels={'volume': 'Volume (R$)', 'date': 'Date'}
-        )
-        fig_volume.update_layout(height=400)
-        st.plotly_chart(fig_volume, use_container_width=True)
+        # Daily transaction volume, downsampled to the chart's pixel budget
+        def build_volume():
+            px = lazy_import('plotly.express')
+            daily_volume = downsample_series(query.daily_volume(), 'date', 'volume')
+            fig_volume = px.line(
+                daily_volume, 
+                x='date', 
+                y='volume',
+                title="Daily Transaction Volume",
+                labels={'volume': 'Volume (R$)', 'date': 'Date'}
+            )
+            fig_volume.update_layout(height=400)
+            return fig_volume
+        chart('daily_volume', build_volume)
     
     with col2:
         # Transaction type distribution
-        type_dist = analytics.get_transaction_type_distribution(filtered_transactions)
-        fig_types = px.pie(
-            type_dist,
-            values='count',
-            names='transaction_type',
-            title="Transaction Types Distribution"
-        )
-        fig_types.update_layout(height=400)
-        st.plotly_chart(fig_types, use_container_width=True)
+        def build_types():
+            px = lazy_import('plotly.express')
+            fig_types = px.pie(
+                query.transaction_types(),
+                values='count',
+                names='transaction_type',
+                title="Transaction Types Distribution"
+            )
+            fig_types.update_layout(height=400)
+            return fig_types
+        chart('transaction_types', build_types)
     
     # Charts Row 2
     st.markdown("## 👥 Customer Analytics")
@@ -222,99 +282,164 @@ def main():
     
     with col1:
         # Customer segment analysis
-        segment_analysis = analytics.get_customer_segment_analysis(filtered_customers, filtered_products)
-        fig_segments = px.bar(
-            segment_analysis,
-            x='segment',
-            y='avg_balance',
-            title="Average Balance by Customer Segment",
-            labels={'avg_balance': 'Average Balance (R$)', 'segment': 'Customer Segment'}
-        )
-        fig_segments.update_layout(height=400)
-        st.plotly_chart(fig_segments, use_container_width=True)
+        def build_segments():
+            px = lazy_import('plotly.express')
+            fig_segments = px.bar(
+                query.segment_analysis(),
+                x='segment',
+                y='avg_balance',
+                title="Average Balance by Customer Segment",
+                labels={'avg_balance': 'Average Balance (R$)', 'segment': 'Customer Segment'}
+            )
+            fig_segments.update_layout(height=400)
+            return fig_segments
+        chart('segment_analysis', build_segments)
     
     with col2:
-        # Age distribution
-        fig_age = px.histogram(
-            filtered_customers,
-            x='age',
-            nbins=20,
-            title="Customer Age Distribution",
-            labels={'age': 'Age', 'count': 'Number of Customers'}
-        )
-        fig_age.update_layout(height=400)
-        st.plotly_chart(fig_age, use_container_width=True)
+        # Age distribution, pre-binned so only bin counts reach the browser
+        def build_age():
+            px = lazy_import('plotly.express')
+            age_bins = histogram_bins(query.frame('customers', ['age'])['age'], nbins=20)
+            fig_age = px.bar(
+                age_bins,
+                x='bin_mid',
+                y='count',
+                title="Customer Age Distribution",
+                labels={'bin_mid': 'Age', 'count': 'Number of Customers'}
+            )
+            fig_age.update_traces(width=age_bins['bin_width'])
+            fig_age.update_layout(height=400, bargap=0)
+            return fig_age
+        chart('age_distribution', build_age)
     
     # Fraud Detection Section
     st.markdown("## 🚨 Fraud Detection Analytics")
     
-    fraud_stats = analytics.get_fraud_statistics(filtered_transactions)
-    
     col1, col2, col3 = st.columns(3)
+    fraud_metrics = [col.empty() for col in (col1, col2, col3)]
     
-    with col1:
-        st.metric(
+    def show_fraud_metrics(stats):
+        approximate = stats.get('approximate', False)
+        prefix = "≈ " if approximate else ""
+        intervals = stats.get('confidence_intervals', {})
+        
+        def interval(name, fmt):
+            if not approximate:
+                return None
+            low, high = intervals[name]
+            return f"Estimated: {fmt(low)} – {fmt(high)} (95% CI)"
+        
+        fraud_metrics[0].metric(
             label="Fraud Rate",
-            value=f"{fraud_stats['fraud_rate']:.2%}",
-            delta=f"-{fraud_stats['fraud_rate']*0.1:.2%} vs last month"
+            value=f"{prefix}{stats['fraud_rate']:.2%}",
+            delta=None if approximate else f"-{stats['fraud_rate']*0.1:.2%} vs last month",
+            help=interval('fraud_rate', lambda v: f"{v:.2%}")
         )
-    
-    with col2:
-        st.metric(
+        fraud_metrics[1].metric(
             label="Fraud Amount",
-            value=f"R$ {fraud_stats['fraud_amount']:,.0f}",
-            delta=f"-R$ {fraud_stats['fraud_amount']*0.15:,.0f} vs last month"
+            value=f"{prefix}R$ {stats['fraud_amount']:,.0f}",
+            delta=None if approximate else f"-R$ {stats['fraud_amount']*0.15:,.0f} vs last month",
+            help=interval('fraud_amount', lambda v: f"R$ {v:,.0f}")
         )
-    
-    with col3:
-        st.metric(
+        fraud_metrics[2].metric(
             label="Fraud Cases",
-            value=f"{fraud_stats['fraud_count']:,}",
-            delta=f"-{int(fraud_stats['fraud_count']*0.2):,} vs last month"
+            value=f"{prefix}{stats['fraud_count']:,}",
+            delta=None if approximate else f"-{int(stats['fraud_count']*0.2):,} vs last month",
+            help=interval('fraud_count', lambda v: f"{v:,.0f}")
         )
     
+    with RECORDER.panel(session, 'fraud_metrics'):
+        if approx_stats:
+            show_fraud_metrics(approx_stats)
+        show_fraud_metrics(query.fraud_statistics())
+    
     # Fraud trend chart
-    fraud_trend = analytics.get_fraud_trend(filtered_transactions)
-    fig_fraud = px.line(
-        fraud_trend,
-        x='date',
-        y='fraud_rate',
-        title="Daily Fraud Rate Trend",
-        labels={'fraud_rate': 'Fraud Rate (%)', 'date': 'Date'}
-    )
-    fig_fraud.update_layout(height=300)
-    st.plotly_chart(fig_fraud, use_container_width=True)
+    def build_fraud():
+        px = lazy_import('plotly.express')
+        fraud_trend = downsample_series(query.fraud_trend(), 'date', 'fraud_rate')
+        fig_fraud = px.line(
+            fraud_trend,
+            x='date',
+            y='fraud_rate',
+            title="Daily Fraud Rate Trend",
+            labels={'fraud_rate': 'Fraud Rate (%)', 'date': 'Date'}
+        )
+        fig_fraud.update_layout(height=300)
+        return fig_fraud
+    chart('fraud_trend', build_fraud)
+    
+    # Leaderboard Section
+    st.markdown("## 🏆 Top Customers")
+    
+    metric_label = filters.get('metric') or st.selectbox("Rank customers by", list(LEADERBOARD_METRICS))
+    with RECORDER.panel(session, 'top_customers'):
+        st.dataframe(
+            query.top_customers(LEADERBOARD_METRICS[metric_label], k=10),
+            hide_index=True,
+            use_container_width=True
+        )
     
     # Product Performance Section
     st.markdown("## 💼 Product Performance")
     
-    product_performance = analytics.get_product_performance(filtered_products)
-    
     col1, col2 = st.columns(2)
     
+    # Both product charts read one result, computed only if either misses the figure cache
+    product_results = {}
+    def product_performance():
+        if not product_results:
+            product_results.update(query.collect('product_performance'))
+        return product_results['product_performance']
+    
     with col1:
-        fig_product_balance = px.bar(
-            product_performance,
-            x='product_type',
-            y='total_balance',
-            title="Total Balance by Product Type",
-            labels={'total_balance': 'Total Balance (R$)', 'product_type': 'Product Type'}
-        )
-        fig_product_balance.update_xaxis(tickangle=45)
-        fig_product_balance.update_layout(height=400)
-        st.plotly_chart(fig_product_balance, use_container_width=True)
+        def build_product_balance():
+            px = lazy_import('plotly.express')
+            fig_product_balance = px.bar(
+                product_performance(),
+                x='product_type',
+                y='total_balance',
+                title="Total Balance by Product Type",
+                labels={'total_balance': 'Total Balance (R$)', 'product_type': 'Product Type'}
+            )
+            fig_product_balance.update_xaxes(tickangle=45)
+            fig_product_balance.update_layout(height=400)
+            return fig_product_balance
+        chart('product_balance', build_product_balance)
     
     with col2:
-        fig_product_customers = px.bar(
-            product_performance,
-            x='product_type',
-            y='customer_count',
-            title="Customer Count by Product Type",
-            labels={'customer_count': 'Number of Customers', 'product_type': 'Product Type'}
-        )
-        fig_product_customers.update_xaxis(tickangle=45)
-        fig_product_customers.update_layout(height=400)
-        st.plotly_chart(fig_product_customers, use_container_width=True)
+        def build_product_customers():
+            px = lazy_import('plotly.express')
+            fig_product_customers = px.bar(
+                product_performance(),
+                x='product_type',
+                y='customer_count',
+                title="Customer Count by Product Type",
+                labels={'customer_count': 'Number of Customers', 'product_type': 'Product Type'}
+            )
+            fig_product_customers.update_xaxes(tickangle=45)
+            fig_product_customers.update_layout(height=400)
+            return fig_product_customers
+        chart('product_customers', build_product_customers)
+
+def main():
+    """Main application function"""
+    
+    # Header
+    st.markdown('<h1 class="main-header">🏦 Banking Analytics Dashboard</h1>', 
+                unsafe_allow_html=True)
+    st.markdown('<p style="text-align: center; color: #666; font-size: 1.1rem;">Advanced GCP/Looker Integration for Financial Services</p>', 
+                unsafe_allow_html=True)
+    
+    # Load data (already warming in the background in lazy startup mode)
+    with st.spinner("Loading banking data..."):
+        analytics = dashboard_engine()
+    
+    filters = sidebar_filters(filter_options(analytics))
+    render(analytics, filters)
+    
+    if os.environ.get('BANKING_STARTUP_REPORT'):
+        with st.sidebar.expander("⏱️ Startup timings"):
+            st.dataframe(pd.DataFrame(PROFILER.report()), hide_index=True)
     
     # Footer
     st.markdown("---")
@@ -326,6 +451,10 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+if LAZY:
+    # Start loading data while the header renders
+    analytics_warmup()
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,31 @@
+"""
+Shared test fixtures.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services.dataset_cache import DatasetCache
+
+
+@pytest.fixture(scope='session')
+def dataset_cache(tmp_path_factory):
+    """Generated datasets for the whole test run, stored outside the repository."""
+    return DatasetCache(str(tmp_path_factory.mktemp('dataset_cache')))
+
+
+@pytest.fixture(scope='session')
+def banking_dataset(dataset_cache):
+    """Load (customers, transactions, products) of a given size, generating each size once.
+
+    Every call returns new frames, so tests may modify them.
+    """
+    def load(num_customers: int, days_back: int, seed: int = 42):
+        dataset = dataset_cache.load(num_customers, seed=seed, days_back=days_back)
+        return dataset['customers'], dataset['transactions'], dataset['products']
+    return load
@@ -25,11 +25,8 @@ def generator():
 
 
 @pytest.fixture
-def small_dataset(generator):
-    customers = generator.generate_customers(100)
-    transactions = generator.generate_transactions(customers, days_back=90)
-    products = generator.generate_products(customers)
-    return customers, transactions, products
+def small_dataset(banking_dataset):
+    return banking_dataset(100, 90)
 
 
 @pytest.fixture
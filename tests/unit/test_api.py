@@ -0,0 +1,155 @@
+"""
+Tests for the Banking Analytics API.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import asyncio
+import io
+import pytest
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+pytest.importorskip('fastapi')
+pytest.importorskip('httpx')
+
+from fastapi.testclient import TestClient
+
+from backend.api.main import ARROW_MEDIA_TYPE, RequestCoalescer, create_app
+from backend.services.analytics_engine import BankingAnalytics
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def client(banking_dataset):
+    def small_engine():
+        customers, transactions, products = banking_dataset(60, 60)
+        return BankingAnalytics(customers, transactions, products)
+
+    with TestClient(create_app(small_engine)) as client:
+        yield client
+
+
+# ── Endpoint Tests ───────────────────────────────────────────────────
+
+class TestAnalyticsEndpoints:
+    def test_health(self, client):
+        response = client.get('/health')
+        assert response.status_code == 200
+        assert response.json()['data_version']
+
+    def test_lists_results(self, client):
+        results = client.get('/analytics').json()['results']
+        assert 'daily_volume' in results
+        assert 'credit_risk' in results
+
+    def test_json_result(self, client):
+        response = client.get('/analytics/channel_analysis')
+        assert response.status_code == 200
+        rows = response.json()
+        assert {'channel', 'fraud_rate'} <= set(rows[0])
+
+    def test_dict_result(self, client):
+        result = client.get('/analytics/fraud_statistics').json()
+        assert 'fraud_rate' in result
+
+    def test_filters(self, client):
+        everyone = client.get('/analytics/product_performance').json()
+        premium = client.get('/analytics/product_performance',
+                             params={'segments': ['Premium']}).json()
+        assert sum(r['account_count'] for r in premium) < sum(r['account_count'] for r in everyone)
+
+    def test_unknown_result(self, client):
+        assert client.get('/analytics/nope').status_code == 404
+
+    def test_etag_revalidation(self, client):
+        first = client.get('/analytics/daily_volume', params={'start': '2020-01-01'})
+        etag = first.headers['etag']
+        assert 'max-age' in first.headers['cache-control']
+        second = client.get('/analytics/daily_volume', params={'start': '2020-01-01'},
+                            headers={'If-None-Match': etag})
+        assert second.status_code == 304
+        other = client.get('/analytics/daily_volume', params={'start': '2020-01-02'})
+        assert other.headers['etag'] != etag
+
+    def test_arrow_result(self, client):
+        pa = pytest.importorskip('pyarrow')
+        response = client.get('/analytics/daily_volume', headers={'Accept': ARROW_MEDIA_TYPE})
+        assert response.headers['content-type'] == ARROW_MEDIA_TYPE
+        table = pa.ipc.open_stream(io.BytesIO(response.content)).read_all()
+        assert table.column_names == ['date', 'volume']
+
+    def test_risk_score(self, client):
+        pytest.importorskip('sklearn')
+        result = client.get('/risk/CUST_000001').json()
+        assert result['customer_id'] == 'CUST_000001'
+        assert 0 <= result['risk_probability'] <= 1
+        assert client.get('/risk').json()['requests'] >= 1
+        assert client.get('/risk/NOPE').status_code == 404
+
+
+# ── Request Coalescing Tests ─────────────────────────────────────────
+
+class TestRequestCoalescer:
+    def test_identical_requests_share_computation(self):
+        coalescer = RequestCoalescer()
+        release = threading.Event()
+        calls = []
+
+        def compute(value):
+            calls.append(value)
+            release.wait(5)
+            return value * 2
+
+        async def scenario():
+            tasks = [asyncio.create_task(coalescer.run('same', compute, 21)) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*tasks)
+
+        assert asyncio.run(scenario()) == [42] * 5
+        assert calls == [21]
+        assert coalescer.computations == 1
+
+    def test_errors_reach_every_waiter(self):
+        coalescer = RequestCoalescer()
+
+        def fail():
+            raise RuntimeError('boom')
+
+        async def scenario():
+            return await asyncio.gather(coalescer.run('k', fail), coalescer.run('k', fail),
+                                        return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_cancelled_owner_does_not_strand_waiters(self):
+        coalescer = RequestCoalescer()
+
+        def compute(value):
+            time.sleep(0.2)
+            return value
+
+        async def scenario():
+            owner = asyncio.create_task(coalescer.run('k', compute, 7))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.create_task(coalescer.run('k', compute, 7))
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            result = await asyncio.wait_for(waiter, 5)
+            await asyncio.sleep(0)
+            return owner.cancelled(), result
+
+        assert asyncio.run(scenario()) == (True, 7)
+        assert coalescer.computations == 1
+        assert coalescer._inflight == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
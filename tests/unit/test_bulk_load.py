@@ -0,0 +1,124 @@
+"""
+Tests for the partition-aligned bulk loader.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import io
+import json
+import pytest
+import sys
+import os
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.pipelines.bulk_load import BulkLoader, LocalObjectStore, TABLE_LAYOUT
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def datasets(banking_dataset):
+    customers, transactions, products = banking_dataset(40, 20)
+    return {'customers': customers, 'transactions': transactions, 'products': products}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalObjectStore(str(tmp_path / 'bucket'))
+
+
+# ── Bulk Load Tests ──────────────────────────────────────────────────
+
+class TestBulkLoader:
+    def test_one_file_per_partition(self, datasets, store):
+        pytest.importorskip('pyarrow')
+        manifest = BulkLoader(store).load_table('transactions', datasets['transactions'])
+        days = datasets['transactions']['transaction_date'].dt.strftime('%Y-%m-%d')
+        assert sorted(f['partition'] for f in manifest['files']) == sorted(days.unique())
+        assert manifest['total_rows'] == len(datasets['transactions'])
+        assert all(f['destination'].startswith('banking_analytics.transactions$') for f in manifest['files'])
+
+    def test_files_sorted_by_cluster_keys(self, datasets, store):
+        pytest.importorskip('pyarrow')
+        manifest = BulkLoader(store).load_table('transactions', datasets['transactions'])
+        cluster_keys = TABLE_LAYOUT['transactions'][1]
+        for entry in manifest['files']:
+            df = pd.read_parquet(store.uri(entry['key']))
+            assert len(df) == entry['rows']
+            assert df[cluster_keys].equals(df.sort_values(cluster_keys)[cluster_keys].reset_index(drop=True))
+            assert (df['transaction_date'].dt.strftime('%Y-%m-%d') == entry['partition']).all()
+
+    def test_rerun_is_idempotent(self, datasets, store):
+        pytest.importorskip('pyarrow')
+        loader = BulkLoader(store)
+        first = loader.load(datasets)
+        second = loader.load(datasets)
+        for table in datasets:
+            assert not any(f['uploaded'] for f in second[table]['files'])
+            assert [f['key'] for f in first[table]['files']] == [f['key'] for f in second[table]['files']]
+
+    def test_prunes_stale_files(self, datasets, store):
+        pytest.importorskip('pyarrow')
+        loader = BulkLoader(store)
+        loader.load_table('products', datasets['products'])
+        changed = datasets['products'].assign(balance=datasets['products']['balance'] + 1)
+        manifest = loader.load_table('products', changed)
+        listed = [key for key in store.list('products/') if not key.endswith('_manifest.json')]
+        assert sorted(listed) == sorted(f['key'] for f in manifest['files'])
+
+    def test_null_partition_dates_are_kept(self, datasets, store):
+        pytest.importorskip('pyarrow')
+        products = datasets['products'].copy()
+        products.loc[products.index[:5], 'opening_date'] = pd.NaT
+        manifest = BulkLoader(store).load_table('products', products)
+        assert manifest['total_rows'] == len(products)
+        null, = [f for f in manifest['files'] if f['partition'] == '__NULL__']
+        assert null['rows'] == 5
+        assert null['destination'] == 'banking_analytics.products$__NULL__'
+        assert null['key'].startswith('products/dt=__NULL__/')
+        assert pd.read_parquet(store.uri(null['key']))['opening_date'].isna().all()
+
+    def test_interrupted_prune_leaves_valid_manifest(self, datasets, store):
+        pytest.importorskip('pyarrow')
+        loader = BulkLoader(store)
+        loader.load_table('products', datasets['products'])
+
+        def crash(key):
+            raise OSError('interrupted')
+
+        store.delete = crash
+        changed = datasets['products'].assign(balance=datasets['products']['balance'] + 1)
+        with pytest.raises(OSError):
+            loader.load_table('products', changed)
+        with open(store.uri('products/_manifest.json')) as handle:
+            manifest = json.load(handle)
+        assert all(store.exists(f['key']) for f in manifest['files'])
+        assert sum(f['rows'] for f in manifest['files']) == len(changed)
+        loaded = pd.concat(pd.read_parquet(store.uri(f['key'])) for f in manifest['files'])
+        assert loaded['balance'].sum() == pytest.approx(changed['balance'].sum())
+
+    def test_manifest_written(self, datasets, store):
+        pytest.importorskip('pyarrow')
+        BulkLoader(store).load_table('customers', datasets['customers'])
+        with open(store.uri('customers/_manifest.json')) as handle:
+            manifest = json.load(handle)
+        assert manifest['clustering_fields'] == ['segment', 'city']
+        assert manifest['time_partitioning']['field'] == 'account_opening_date'
+
+    def test_avro_format(self, datasets, store):
+        fastavro = pytest.importorskip('fastavro')
+        manifest = BulkLoader(store, file_format='avro').load_table('products', datasets['products'])
+        entry = manifest['files'][0]
+        with open(store.uri(entry['key']), 'rb') as handle:
+            records = list(fastavro.reader(handle))
+        assert len(records) == entry['rows']
+
+    def test_unknown_format(self, store):
+        with pytest.raises(ValueError):
+            BulkLoader(store, file_format='orc')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,137 @@
+"""
+Tests for the change data capture path.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services.analytics_engine import BankingAnalytics
+from backend.services.cdc import ChangeSet
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture
+def analytics(banking_dataset):
+    customers, transactions, products = banking_dataset(80, 30)
+    return BankingAnalytics(customers, transactions, products)
+
+
+def full_recompute(analytics):
+    products = analytics.get_product_performance(analytics.products)
+    segments = analytics.get_customer_segment_analysis(analytics.customers, analytics.products)
+    return products, segments
+
+
+def assert_matches_full_recompute(analytics):
+    expected_products, expected_segments = full_recompute(analytics)
+    pd.testing.assert_frame_equal(analytics.get_product_performance(), expected_products,
+                                  check_dtype=False, atol=0.02)
+    pd.testing.assert_frame_equal(analytics.get_customer_segment_analysis(), expected_segments,
+                                  check_dtype=False, atol=0.02)
+
+
+# ── Change Detection Tests ───────────────────────────────────────────
+
+class TestChangeDetection:
+    def test_identical_snapshot_has_no_changes(self, analytics):
+        cdc = analytics.change_capture()
+        assert len(cdc.diff_products(analytics.products.copy())) == 0
+        assert len(cdc.diff_customers(analytics.customers.copy())) == 0
+
+    def test_detects_inserts_updates_deletes(self, analytics):
+        cdc = analytics.change_capture()
+        snapshot = analytics.products.copy()
+        snapshot.loc[0, 'balance'] += 100
+        deleted = snapshot.iloc[[1]]
+        snapshot = snapshot.drop(index=1)
+        new_row = snapshot.iloc[[2]].assign(customer_id='CUST_999999')
+        snapshot = pd.concat([snapshot, new_row], ignore_index=True)
+        changes = cdc.diff_products(snapshot)
+        assert changes.summary() == {'inserts': 1, 'updates': 1, 'deletes': 1}
+        assert changes.deletes.iloc[0]['customer_id'] == deleted.iloc[0]['customer_id']
+
+    def test_from_feed(self):
+        feed = pd.DataFrame({'op': ['I', 'u', 'D'], 'customer_id': ['a', 'b', 'c']})
+        assert ChangeSet.from_feed(feed).summary() == {'inserts': 1, 'updates': 1, 'deletes': 1}
+
+
+# ── Incremental Aggregate Tests ──────────────────────────────────────
+
+class TestIncrementalAggregates:
+    def test_initial_state_matches(self, analytics):
+        analytics.change_capture()
+        assert_matches_full_recompute(analytics)
+
+    def test_balance_refresh_updates_in_place(self, analytics):
+        cdc = analytics.change_capture()
+        frame_before = analytics.products
+        snapshot = analytics.products.copy()
+        snapshot.loc[snapshot.index[:10], 'balance'] *= 1.5
+        changes = cdc.sync_products(snapshot)
+        assert changes.summary() == {'inserts': 0, 'updates': 10, 'deletes': 0}
+        assert analytics.products is frame_before
+        assert_matches_full_recompute(analytics)
+
+    def test_product_inserts_and_deletes(self, analytics):
+        cdc = analytics.change_capture()
+        products = analytics.products
+        new_rows = products.drop_duplicates('customer_id').iloc[:3]
+        new_rows = new_rows.assign(product_type='Consórcio', balance=[10.0, 20.0, 30.0])
+        cdc.apply_products(ChangeSet(new_rows, products.iloc[:0], products.iloc[5:8]))
+        assert 'Consórcio' in set(analytics.get_product_performance()['product_type'])
+        assert len(analytics.products) == len(products)
+        assert_matches_full_recompute(analytics)
+
+    def test_customer_segment_change(self, analytics):
+        cdc = analytics.change_capture()
+        snapshot = analytics.customers.copy()
+        snapshot.loc[snapshot.index[:5], 'segment'] = 'Premium'
+        snapshot.loc[snapshot.index[5:8], 'income'] += 1000
+        changes = cdc.sync_customers(snapshot)
+        assert len(changes.updates) >= 3
+        assert ('transactions', 'segment') not in analytics._indexes
+        assert_matches_full_recompute(analytics)
+
+    def test_credit_score_update_refreshes_risk_leaderboard(self, analytics):
+        analytics.top_customers('risk_score')
+        snapshot = analytics.customers.copy()
+        snapshot.loc[snapshot.index[-10:], 'credit_score'] = 300.0
+        analytics.change_capture().sync_customers(snapshot)
+        fresh = BankingAnalytics(analytics.customers, analytics.transactions, analytics.products)
+        pd.testing.assert_frame_equal(analytics.top_customers('risk_score', 10),
+                                      fresh.top_customers('risk_score', 10))
+
+    def test_last_change_per_key_wins(self, analytics):
+        cdc = analytics.change_capture()
+        row = analytics.products.iloc[[0]]
+        updates = pd.concat([row.assign(balance=1.0), row.assign(balance=2.0)], ignore_index=True)
+        applied = cdc.apply_products(ChangeSet(row.iloc[:0], updates, row.iloc[:0]))
+        assert len(applied.updates) == 1
+        assert analytics.products.iloc[0]['balance'] == 2.0
+        assert_matches_full_recompute(analytics)
+
+    def test_update_for_unknown_key_is_insert(self, analytics):
+        cdc = analytics.change_capture()
+        row = analytics.products.iloc[[0]].assign(customer_id='CUST_777777')
+        applied = cdc.apply_products(ChangeSet(row.iloc[:0], row, row.iloc[:0]))
+        assert applied.summary() == {'inserts': 1, 'updates': 0, 'deletes': 0}
+        assert_matches_full_recompute(analytics)
+
+    def test_query_sees_changes(self, analytics):
+        cdc = analytics.change_capture()
+        analytics.query().segments(['Gold']).count('products')
+        row = analytics.products.iloc[[0]].assign(customer_id='CUST_000001', product_type='Consórcio')
+        cdc.apply_products(ChangeSet(row, row.iloc[:0], row.iloc[:0]))
+        result = analytics.query().product_types(['Consórcio']).product_performance()
+        assert result['account_count'].sum() == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
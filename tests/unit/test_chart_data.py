@@ -0,0 +1,146 @@
+"""
+Tests for the chart data layer.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+import json
+import textwrap
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services.chart_data import (
+    FigureCache, _direct_chart_support, downsample_series, histogram_bins, lttb_indices
+)
+from backend.services import chart_data
+
+
+# ── Histogram Binning Tests ──────────────────────────────────────────
+
+class TestHistogramBins:
+    def test_counts_match_numpy(self):
+        values = np.random.default_rng(0).normal(45, 15, 1000)
+        bins = histogram_bins(values, nbins=20)
+        expected, _ = np.histogram(values, bins=20)
+        assert len(bins) == 20
+        assert list(bins['count']) == list(expected)
+
+    def test_ignores_missing_values(self):
+        bins = histogram_bins([1.0, 2.0, np.nan, 3.0], nbins=2)
+        assert bins['count'].sum() == 3
+
+    def test_empty_input(self):
+        bins = histogram_bins([], nbins=5)
+        assert len(bins) == 5
+        assert bins['count'].sum() == 0
+
+
+# ── LTTB Downsampling Tests ──────────────────────────────────────────
+
+class TestLTTB:
+    def test_keeps_endpoints_and_size(self):
+        x = np.arange(10000)
+        y = np.sin(x / 100)
+        keep = lttb_indices(x, y, 500)
+        assert len(keep) == 500
+        assert keep[0] == 0
+        assert keep[-1] == len(x) - 1
+        assert (np.diff(keep) > 0).all()
+
+    def test_keeps_spike(self):
+        y = np.zeros(5000)
+        y[2345] = 100.0
+        keep = lttb_indices(np.arange(5000), y, 50)
+        assert 2345 in keep
+
+    def test_short_series_untouched(self):
+        assert list(lttb_indices([0, 1, 2], [1, 2, 3], 10)) == [0, 1, 2]
+
+    def test_downsample_datetime_series(self):
+        df = pd.DataFrame({
+            'date': pd.date_range('2020-01-01', periods=3000, freq='D'),
+            'volume': np.random.default_rng(1).random(3000),
+        })
+        result = downsample_series(df, 'date', 'volume', max_points=300)
+        assert len(result) == 300
+        assert result['date'].is_monotonic_increasing
+
+
+# ── Figure Cache Tests ───────────────────────────────────────────────
+
+class FakeFigure:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def to_json(self):
+        return self.payload
+
+
+class TestFigureCache:
+    def test_builds_once_per_key(self):
+        cache = FigureCache()
+        calls = []
+
+        def build():
+            calls.append(1)
+            return FakeFigure('{"data": []}')
+
+        assert cache.get_json(('volume', 'a'), build) == '{"data": []}'
+        assert cache.get_json(('volume', 'a'), build) == '{"data": []}'
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_oldest(self):
+        cache = FigureCache(max_entries=2)
+        for key in 'abc':
+            cache.get_json(key, lambda: FakeFigure(key))
+        assert list(cache._items) == ['b', 'c']
+
+
+class TestPlotlyJsonChart:
+    def test_internals_match_installed_streamlit(self):
+        pytest.importorskip('streamlit')
+        assert _direct_chart_support()
+
+    @pytest.mark.parametrize('direct', [True, False])
+    def test_cached_json_renders_as_the_chart(self, tmp_path, monkeypatch, direct):
+        pytest.importorskip('streamlit')
+        pytest.importorskip('plotly')
+        from streamlit.testing.v1 import AppTest
+
+        if not direct:
+            monkeypatch.setattr(chart_data, '_direct_chart_support', lambda: False)
+        script = tmp_path / 'chart_app.py'
+        script.write_text(textwrap.dedent(f"""
+            import sys
+            sys.path.insert(0, {ROOT!r})
+            import plotly.graph_objects as go
+            import streamlit as st
+            from backend.services import chart_data
+
+            figure_json = go.Figure(go.Bar(x=[1, 2], y=[3, 4]), layout={{'height': 300}}).to_json()
+            st.session_state['figure_json'] = figure_json
+            left, right = st.columns(2)
+            with right:
+                chart_data.plotly_json_chart(figure_json)
+        """))
+        at = AppTest.from_file(str(script)).run()
+        assert not at.exception
+        left, right = at.columns
+        assert len(left.children) == 0
+        chart, = right.children.values()
+        spec = json.loads(chart.proto.spec)
+        assert spec['data'][0]['y'] == [3, 4]
+        assert spec['layout']['height'] == 300
+        if direct:
+            assert chart.proto.spec == at.session_state['figure_json']
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
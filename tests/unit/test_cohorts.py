@@ -0,0 +1,113 @@
+"""
+Tests for the cohort retention matrices.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services.analytics_engine import BankingAnalytics
+from backend.services.cohorts import CohortMatrix, month_codes
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture
+def dataset(banking_dataset):
+    return banking_dataset(120, 200)
+
+
+@pytest.fixture
+def analytics(dataset):
+    return BankingAnalytics(*dataset)
+
+
+def reference_activity(customers, transactions):
+    """Distinct active customers per (cohort, months since opening) with pandas groupby."""
+    merged = transactions.merge(customers[['customer_id', 'account_opening_date']], on='customer_id')
+    cohort = merged['account_opening_date'].dt.to_period('M')
+    active = merged['transaction_date'].dt.to_period('M')
+    merged['cohort'] = cohort.dt.to_timestamp()
+    merged['age'] = (active - cohort).apply(lambda offset: offset.n)
+    merged = merged[merged['age'] >= 0]
+    return merged.groupby(['cohort', 'age'])['customer_id'].nunique()
+
+
+# ── Cohort Matrix Tests ──────────────────────────────────────────────
+
+class TestCohortMatrix:
+    def test_month_codes(self):
+        codes = month_codes(pd.to_datetime(['1970-01-31', '1971-02-01']))
+        assert list(codes) == [0, 13]
+
+    def test_activity_matches_groupby(self, analytics):
+        matrix = analytics.cohorts().activity_matrix()
+        expected = reference_activity(analytics.customers, analytics.transactions)
+        for (cohort, age), count in expected.items():
+            assert matrix.loc[cohort, age] == count
+        observed = matrix.stack()
+        assert observed.sum() == expected.sum()
+
+    def test_cohort_sizes_and_retention(self, analytics):
+        cohorts = analytics.cohorts()
+        sizes = cohorts.cohort_sizes()
+        assert sizes.sum() == len(analytics.customers)
+        retention = cohorts.retention_matrix()
+        activity = cohorts.activity_matrix()
+        np.testing.assert_allclose(retention.to_numpy(), activity.to_numpy() / sizes.to_numpy()[:, None])
+        assert np.nanmax(retention.to_numpy()) <= 1.0
+
+    def test_unobserved_cells_are_nan(self, analytics):
+        matrix = analytics.cohorts().activity_matrix()
+        first = analytics.transactions['transaction_date'].min().to_period('M').to_timestamp()
+        oldest = matrix.index[0]
+        months_before_history = (first.year - oldest.year) * 12 + first.month - oldest.month
+        if months_before_history > 0:
+            assert matrix.iloc[0, :months_before_history].isna().all()
+
+    def test_volume_and_transactions_totals(self, analytics):
+        cohorts = analytics.cohorts()
+        merged = analytics.transactions.merge(analytics.customers, on='customer_id')
+        eligible = merged[merged['transaction_date'].dt.to_period('M') >=
+                          merged['account_opening_date'].dt.to_period('M')]
+        assert cohorts.transaction_matrix().sum().sum() == len(eligible)
+        assert cohorts.volume_matrix().sum().sum() == pytest.approx(eligible['amount'].sum())
+
+
+class TestIncrementalExtension:
+    def test_month_by_month_equals_full_build(self, dataset):
+        customers, transactions, products = dataset
+        full = BankingAnalytics(customers, transactions, products).cohorts()
+
+        months = transactions['transaction_date'].dt.to_period('M')
+        first_month = months.min()
+        engine = BankingAnalytics(customers, transactions[months == first_month], products)
+        cohorts = engine.cohorts()
+        for month in sorted(months.unique())[1:]:
+            engine.append_transactions(transactions[months == month])
+        assert engine.cohorts() is cohorts
+        pd.testing.assert_frame_equal(cohorts.activity_matrix(), full.activity_matrix())
+        pd.testing.assert_frame_equal(cohorts.volume_matrix(), full.volume_matrix())
+
+    def test_repeat_activity_in_same_month_is_counted_once(self, analytics):
+        cohorts = analytics.cohorts()
+        before = cohorts.activity_matrix()
+        transactions_before = cohorts.transaction_matrix().sum().sum()
+        analytics.append_transactions(analytics.transactions.tail(20))
+        pd.testing.assert_frame_equal(cohorts.activity_matrix(), before)
+        assert cohorts.transaction_matrix().sum().sum() >= transactions_before
+
+    def test_retention_curve(self, analytics):
+        curve = analytics.cohorts().retention_curve(cohorts=6)
+        assert ((curve >= 0) & (curve <= 1)).all()
+        assert isinstance(CohortMatrix(analytics).retention_curve(), pd.Series)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,98 @@
+"""
+Tests for the shared per-customer moments and risk formula.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services.analytics_engine import BankingAnalytics
+from backend.services.customer_risk import (
+    MOMENTS, amount_mean_std, combine_m2, customer_moments, merge_moments, risk_level
+)
+from backend.services.parallel import ParallelAnalytics
+
+
+def offset_amounts(transactions: pd.DataFrame) -> pd.DataFrame:
+    """Amounts far from zero, where a sum-of-squares variance loses every digit."""
+    transactions = transactions.copy()
+    transactions['amount'] = 1e9 + transactions['amount'] / 100
+    return transactions
+
+
+# ── Moment Tests ─────────────────────────────────────────────────────
+
+class TestMoments:
+    def test_merged_batches_match_pandas_std(self):
+        rng = np.random.default_rng(0)
+        codes = rng.integers(0, 50, 20000)
+        amount = 1e9 + rng.normal(0, 1, len(codes))
+        fraud = (rng.random(len(codes)) < 0.05).astype(float)
+        moments = {name: np.zeros(50) for name in MOMENTS}
+        for batch in np.array_split(np.arange(len(codes)), 7):
+            merge_moments(moments, customer_moments(codes[batch], amount[batch], fraud[batch], 50))
+        expected = pd.Series(amount).groupby(codes).agg(['mean', 'std', 'count'])
+        mean, std = amount_mean_std(moments)
+        np.testing.assert_allclose(std, expected['std'], rtol=1e-6)
+        np.testing.assert_allclose(mean, expected['mean'], rtol=1e-12)
+        np.testing.assert_array_equal(moments['count'], expected['count'])
+        np.testing.assert_allclose(moments['fraud_count'], np.bincount(codes, weights=fraud))
+
+    def test_combine_m2_on_plain_numbers(self):
+        values = [3.0, 5.0, 10.0]
+        m2 = 0.0
+        for i, value in enumerate(values):
+            m2 = combine_m2(i, sum(values[:i]), m2, 1, value, 0.0)
+        assert float(m2) == pytest.approx(np.var(values) * len(values))
+
+    def test_undefined_std_is_nan(self):
+        moments = customer_moments(np.array([0, 1, 1]), np.array([5.0, 1.0, 3.0]),
+                                   np.zeros(3), 3)
+        mean, std = amount_mean_std(moments)
+        assert np.isnan(std[0]) and np.isnan(std[2]) and np.isnan(mean[2])
+        assert std[1] == pytest.approx(np.sqrt(2))
+
+    def test_levels_are_right_closed(self):
+        assert list(risk_level(np.array([10.0, 10.01, 25.0, 50.0, 50.01]))) == \
+            ['Low', 'Medium', 'Medium', 'High', 'Critical']
+
+
+# ── Consumer Tests ───────────────────────────────────────────────────
+
+class TestConsumers:
+    @pytest.fixture
+    def analytics(self, banking_dataset):
+        customers, transactions, products = banking_dataset(150, 60)
+        return BankingAnalytics(customers, offset_amounts(transactions), products)
+
+    def test_appended_leaderboard_risk_matches_engine(self, banking_dataset):
+        customers, transactions, products = banking_dataset(150, 60)
+        transactions = offset_amounts(transactions)
+        analytics = BankingAnalytics(customers, transactions.iloc[:1000], products)
+        analytics.leaderboard()
+        for batch in np.array_split(np.arange(1000, len(transactions)), 3):
+            analytics.append_transactions(transactions.iloc[batch])
+        expected = analytics.credit_risk_score().set_index('customer_id')
+        board = analytics.leaderboard()
+        ids = analytics.customers['customer_id']
+        std = pd.Series(np.nan_to_num(amount_mean_std(board._stats)[1]), index=ids).loc[expected.index]
+        np.testing.assert_allclose(std, expected['std_amount'], rtol=1e-6)
+        risk = pd.Series(board.values('risk_score'), index=ids).loc[expected.index]
+        np.testing.assert_allclose(risk, expected['risk_score'], atol=0.011)
+
+    def test_parallel_risk_matches_engine(self, analytics):
+        expected = analytics.credit_risk_score()
+        with ParallelAnalytics(analytics, workers=1, partitions=4, partition_by='date') as executor:
+            result = executor.credit_risk_score()
+        np.testing.assert_allclose(result['std_amount'], expected['std_amount'], rtol=1e-6)
+        assert list(result['risk_level']) == list(expected['risk_level'])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,141 @@
+"""
+Tests for the generated dataset cache.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services import dataset_cache
+from backend.services.analytics_engine import BankingAnalytics
+from backend.services.data_generator import BankingDataGenerator
+from backend.services.dataset_cache import DatasetCache, _read_table, _write_table, dataset_key
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture
+def cache(tmp_path):
+    return DatasetCache(str(tmp_path / 'cache'), block_customers=50)
+
+
+def is_mapped(values) -> bool:
+    """Whether an array is a view of a memory-mapped file."""
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = getattr(values, 'base', None)
+    return False
+
+
+def without_dates(frame):
+    return frame[[column for column in frame.columns if 'date' not in column]]
+
+
+# ── Dataset Cache Tests ──────────────────────────────────────────────
+
+class TestDatasetCache:
+    def test_key_covers_every_input(self):
+        keys = {
+            dataset_key(42, 100, 90),
+            dataset_key(7, 100, 90),
+            dataset_key(42, 200, 90),
+            dataset_key(42, 100, 365),
+            dataset_key(42, 100, 90, version=999),
+        }
+        assert len(keys) == 5
+
+    def test_hit_matches_miss(self, cache):
+        first = cache.load(120, days_back=30)
+        second = cache.load(120, days_back=30)
+        assert (cache.misses, cache.hits) == (1, 1)
+        for name in first:
+            pd.testing.assert_frame_equal(first[name], second[name])
+
+    def test_hit_is_memory_mapped(self, cache):
+        cache.load(60, days_back=30)
+        data = cache.load(60, days_back=30)
+        assert is_mapped(data['transactions']['amount'].to_numpy())
+        assert is_mapped(data['transactions']['transaction_date'].to_numpy())
+        assert is_mapped(data['customers']['credit_score'].to_numpy())
+
+    def test_loaded_frames_are_writable_in_memory_only(self, cache):
+        data = cache.load(60, days_back=30)
+        original = data['products'].loc[0, 'balance']
+        data['products'].loc[0, 'balance'] = -1.0
+        assert cache.load(60, days_back=30)['products'].loc[0, 'balance'] == original
+
+    def test_engine_keeps_cache_hit_mapped(self, cache):
+        cache.load(60, days_back=30)
+        data = cache.load(60, days_back=30)
+        engine = BankingAnalytics(data['customers'], data['transactions'], data['products'])
+        assert is_mapped(engine.transactions['amount'].to_numpy())
+        original = data['products'].loc[0, 'balance']
+        engine.products.loc[0, 'balance'] = -1.0
+        assert data['products'].loc[0, 'balance'] == original
+
+    def test_missing_strings_round_trip(self, tmp_path):
+        frame = pd.DataFrame({'city': ['Recife', None, 'Natal', np.nan, 'Recife'],
+                              'balance': [1.0, 2.0, 3.0, 4.0, 5.0]})
+        meta = _write_table(str(tmp_path), 'customers', frame)
+        loaded = _read_table(str(tmp_path), 'customers', meta)
+        assert list(loaded['city'].isna()) == [False, True, False, True, False]
+        assert list(loaded['city'].dropna()) == ['Recife', 'Natal', 'Recife']
+        assert list(loaded['balance']) == list(frame['balance'])
+
+    def test_dataset_shape(self, cache):
+        data = cache.load(120, days_back=30)
+        customers, transactions, products = data['customers'], data['transactions'], data['products']
+        assert list(customers['customer_id']) == [f'CUST_{i:06d}' for i in range(1, 121)]
+        assert transactions['transaction_id'].is_unique
+        assert set(transactions['customer_id']) <= set(customers[customers['is_active']]['customer_id'])
+        assert (products.groupby('customer_id').size() ==
+                customers.set_index('customer_id')['num_products']).all()
+        span = transactions['transaction_date'].max() - transactions['transaction_date'].min()
+        assert span.days < 30
+
+
+class TestExtension:
+    def test_larger_size_generates_only_missing_blocks(self, cache):
+        cache.load(120, days_back=30)
+        assert cache.generated_customers == 120
+        cache.load(260, days_back=30)
+        # Blocks [0, 50) and [50, 100) are reused; the partial block at 100 is regenerated
+        assert cache.reused_customers == 100
+        assert cache.generated_customers == 120 + 160
+
+    def test_extension_equals_fresh_build(self, cache, tmp_path):
+        small = cache.load(120, days_back=30)
+        extended = cache.load(260, days_back=30)
+        fresh = DatasetCache(str(tmp_path / 'fresh'), block_customers=50).load(260, days_back=30)
+        for name in extended:
+            pd.testing.assert_frame_equal(without_dates(extended[name]), without_dates(fresh[name]))
+        # Reused blocks keep their dates, so the first build's reference time carries over
+        prefix = small['customers'].iloc[:100]
+        pd.testing.assert_frame_equal(extended['customers'].iloc[:100], prefix)
+
+    def test_other_seeds_are_not_reused(self, cache):
+        cache.load(120, seed=1, days_back=30)
+        cache.load(120, seed=2, days_back=30)
+        assert cache.reused_customers == 0
+
+    def test_generator_version_invalidates(self, cache, monkeypatch):
+        cache.load(60, days_back=30)
+        monkeypatch.setattr(dataset_cache, 'GENERATOR_VERSION', dataset_cache.GENERATOR_VERSION + 1)
+        cache.load(60, days_back=30)
+        assert (cache.misses, cache.reused_customers) == (2, 0)
+
+    def test_generate_complete_dataset_uses_cache(self, cache):
+        data = BankingDataGenerator(seed=3).generate_complete_dataset(80, days_back=30, cache=cache)
+        assert len(data['customers']) == 80
+        assert os.path.isdir(cache.path(80, seed=3, days_back=30))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
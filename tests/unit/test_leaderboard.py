@@ -0,0 +1,116 @@
+"""
+Tests for the top-K customer leaderboards.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services.analytics_engine import BankingAnalytics
+from backend.services.leaderboard import top_k_positions
+from backend.services.query_plan import warm_indexes
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture
+def analytics(banking_dataset):
+    customers, transactions, products = banking_dataset(150, 60)
+    return BankingAnalytics(customers, transactions, products)
+
+
+def full_sort(analytics, metric, k):
+    """Reference leaderboard from the engine's own results, fully sorted."""
+    risk = analytics.credit_risk_score()
+    risk['volume'] = risk['total_amount']
+    risk['transactions'] = risk['txn_count']
+    fraud = analytics.transactions[analytics.transactions['is_fraud']]
+    exposure = fraud.groupby('customer_id')['amount'].sum()
+    risk['fraud_exposure'] = risk['customer_id'].map(exposure).fillna(0)
+    return risk.sort_values(metric, ascending=False, kind='stable')[metric].head(k).to_numpy()
+
+
+# ── Selection Tests ──────────────────────────────────────────────────
+
+class TestTopKPositions:
+    def test_matches_full_sort(self):
+        values = np.random.default_rng(0).normal(size=1000)
+        assert list(top_k_positions(values, 25)) == list(np.argsort(-values, kind='stable')[:25])
+
+    def test_ties_and_nan(self):
+        values = np.array([1.0, np.nan, 3.0, 3.0, 2.0])
+        assert list(top_k_positions(values, 3)) == [2, 3, 4]
+        assert list(top_k_positions(values, 10)) == [2, 3, 4, 0, 1]
+
+    def test_empty(self):
+        assert len(top_k_positions(np.array([]), 5)) == 0
+
+
+# ── Leaderboard Tests ────────────────────────────────────────────────
+
+class TestLeaderboard:
+    @pytest.mark.parametrize('metric', ['volume', 'transactions', 'fraud_exposure', 'risk_score'])
+    def test_matches_engine_results(self, analytics, metric):
+        board = analytics.top_customers(metric, k=10)
+        assert list(board['rank']) == list(range(1, 11))
+        np.testing.assert_allclose(board[metric].to_numpy(), full_sort(analytics, metric, 10), atol=0.011)
+
+    def test_larger_than_capacity(self, analytics):
+        board = analytics.leaderboard(capacity=5).top('volume', k=20)
+        np.testing.assert_allclose(board['volume'].to_numpy(), full_sort(analytics, 'volume', 20))
+
+    def test_unknown_metric(self, analytics):
+        with pytest.raises(ValueError):
+            analytics.top_customers('balance')
+
+    @pytest.mark.parametrize('metric', ['volume', 'fraud_exposure', 'risk_score'])
+    def test_running_top_k_after_appends(self, analytics, metric):
+        analytics.leaderboard(capacity=10)
+        rng = np.random.default_rng(1)
+        for batch in range(5):
+            rows = analytics.transactions.sample(40, random_state=batch).copy()
+            rows['transaction_id'] = [f'APP_{batch}_{i}' for i in range(len(rows))]
+            rows['amount'] = rng.uniform(1, 50000, len(rows))
+            rows['is_fraud'] = rng.random(len(rows)) < 0.2
+            analytics.append_transactions(rows)
+        board = analytics.top_customers(metric, k=10)
+        np.testing.assert_allclose(board[metric].to_numpy(), full_sort(analytics, metric, 10), atol=0.011)
+
+    def test_append_extends_indexes(self, analytics):
+        warm_indexes(analytics)
+        rows = analytics.transactions.sample(40, random_state=1).assign(
+            transaction_id=[f'X{i}' for i in range(40)])
+        analytics.append_transactions(rows)
+        fresh = BankingAnalytics(analytics.customers, analytics.transactions, analytics.products)
+        warm_indexes(fresh)
+        order, dates = analytics._indexes['transaction_date']
+        fresh_order, fresh_dates = fresh._indexes['transaction_date']
+        assert np.array_equal(order, fresh_order)
+        assert np.array_equal(dates, fresh_dates)
+        for column in ('segment', 'channel'):
+            codes, categories = analytics._indexes[('transactions', column)]
+            fresh_codes, fresh_categories = fresh._indexes[('transactions', column)]
+            assert np.array_equal(categories[codes], fresh_categories[fresh_codes])
+        assert analytics.query().between('2000-01-01', '2100-01-01').count('transactions') == \
+            len(analytics.transactions)
+
+
+class TestQueryTopCustomers:
+    def test_filtered_leaderboard(self, analytics):
+        query = analytics.query().segments(['Gold'])
+        board = query.top_customers('volume', k=5)
+        assert set(board['segment']) == {'Gold'}
+        gold = analytics.customers.loc[analytics.customers['segment'] == 'Gold', 'customer_id']
+        txns = analytics.transactions[analytics.transactions['customer_id'].isin(gold)]
+        expected = txns.groupby('customer_id')['amount'].sum().nlargest(5).to_numpy()
+        np.testing.assert_allclose(board['volume'].to_numpy(), expected)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,137 @@
+"""
+Tests for the dashboard load-test harness.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+import random
+import textwrap
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+pytest.importorskip('streamlit')
+
+from backend.services.loadtest import (
+    find_saturation, load_app, random_filters, run_level, run_session
+)
+from backend.services.startup import RECORDER
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture
+def app_path(tmp_path):
+    """A small app exposing the dashboard's render interface."""
+    script = tmp_path / 'app.py'
+    script.write_text(textwrap.dedent(f"""
+        import sys
+        from datetime import date
+        sys.path.insert(0, {ROOT!r})
+        import streamlit as st
+        from backend.services.startup import RECORDER
+
+        BUILDS = []
+
+        @st.cache_resource
+        def engine_resource():
+            BUILDS.append(1)
+            return {{'rows': 10}}
+
+        def dashboard_engine():
+            return engine_resource()
+
+        def filter_options(engine):
+            return {{
+                'date_range': (date(2024, 1, 1), date(2024, 3, 31)),
+                'segments': ['a', 'b', 'c'],
+                'product_types': ['x', 'y'],
+                'metric': ['volume', 'count'],
+            }}
+
+        def render(engine, filters, session=None):
+            with RECORDER.panel(session, 'summary'):
+                start, end = filters['date_range']
+                assert start <= end and filters['segments'] and filters['product_types']
+                st.metric(filters['metric'], engine['rows'])
+    """))
+    return str(script)
+
+
+# ── Harness Tests ────────────────────────────────────────────────────
+
+class TestHarness:
+    def test_session_reruns_with_random_filters(self, app_path):
+        records, cpu = run_session(app_path, 'single', reruns=4, seed=3)
+        panels = [record[0] for record in records]
+        assert panels.count('page') == 5
+        assert panels.count('summary') == 5
+        assert cpu >= 0
+        assert RECORDER.drain('single') == []
+
+    def test_failing_session_raises(self, tmp_path):
+        script = tmp_path / 'broken.py'
+        script.write_text(textwrap.dedent("""
+            def dashboard_engine():
+                return None
+
+            def filter_options(engine):
+                from datetime import date
+                return {'date_range': (date(2024, 1, 1), date(2024, 1, 2)), 'segments': ['a'],
+                        'product_types': ['x'], 'metric': ['volume']}
+
+            def render(engine, filters, session=None):
+                raise ValueError('boom')
+        """))
+        with pytest.raises(RuntimeError, match='boom'):
+            run_session(str(script), 'broken', reruns=1)
+        assert RECORDER.drain('broken') == []
+
+    def test_level_report(self, app_path):
+        level = run_level(app_path, sessions=3, reruns=2)
+        assert level['sessions'] == 3
+        assert level['pages'] == 9
+        assert level['pages_per_second'] > 0
+        assert level['cpu_seconds_per_session'] > 0
+        panels = level['panels'].set_index('panel')
+        assert set(panels.index) == {'page', 'summary'}
+        assert (panels['p50_ms'] <= panels['p95_ms']).all()
+        assert (panels['p95_ms'] <= panels['p99_ms']).all()
+        assert panels.loc['page', 'renders'] == 9
+
+    def test_sessions_share_one_engine(self, app_path):
+        run_level(app_path, sessions=4, reruns=1)
+        run_level(app_path, sessions=2, reruns=1)
+        assert load_app(app_path).BUILDS == [1]
+
+    def test_random_filters_stay_valid(self, app_path):
+        app = load_app(app_path)
+        options = app.filter_options(app.dashboard_engine())
+        low, high = options['date_range']
+        rng = random.Random(0)
+        for _ in range(50):
+            filters = random_filters(options, rng)
+            start, end = filters['date_range']
+            assert low <= start <= end <= high
+            assert filters['segments'] and set(filters['segments']) <= set(options['segments'])
+            assert filters['product_types'] and set(filters['product_types']) <= set(options['product_types'])
+            assert filters['metric'] in options['metric']
+
+
+class TestSaturation:
+    @pytest.mark.parametrize('throughputs, expected', [
+        ([(1, 2.0), (2, 3.8), (4, 7.0), (8, 7.2)], 4),
+        ([(1, 2.0), (2, 2.1), (4, 2.0)], 1),
+        ([(1, 2.0), (2, 4.0)], 2),
+    ])
+    def test_first_level_without_throughput_gain(self, throughputs, expected):
+        levels = [{'sessions': s, 'pages_per_second': rate} for s, rate in throughputs]
+        assert find_saturation(levels) == expected
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,100 @@
+"""
+Tests for the nightly KPI Beam pipeline.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import glob
+import gzip
+import json
+import pytest
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+beam = pytest.importorskip('apache_beam')
+
+from backend.services.analytics_engine import BankingAnalytics
+from backend.pipelines.nightly_kpis import run
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def dataset(banking_dataset):
+    return banking_dataset(60, 30)
+
+
+@pytest.fixture(scope='module')
+def outputs(dataset, tmp_path_factory):
+    customers, transactions, products = dataset
+    root = tmp_path_factory.mktemp('kpis')
+    for name, df in zip(['customers', 'transactions', 'products'], dataset):
+        df.to_csv(root / f'{name}.csv', index=False)
+    run([
+        '--customers', str(root / 'customers.csv'),
+        '--transactions', str(root / 'transactions.csv'),
+        '--products', str(root / 'products.csv'),
+        '--output', str(root / 'out'),
+        '--runner', 'DirectRunner',
+    ])
+
+    def read(name):
+        rows = []
+        for path in glob.glob(str(root / 'out' / name / 'part*')):
+            with gzip.open(path, 'rt') as handle:
+                rows.extend(json.loads(line) for line in handle)
+        return pd.DataFrame(rows)
+
+    return {name: read(name) for name in ['daily_kpis', 'segment_analysis', 'rfm_scores', 'credit_risk']}
+
+
+# ── Pipeline Output Tests ────────────────────────────────────────────
+
+class TestNightlyKpis:
+    def test_daily_kpis(self, dataset, outputs):
+        transactions = dataset[1]
+        day = transactions['transaction_date'].dt.date.astype(str)
+        expected = transactions.groupby(day).agg(
+            daily_transactions=('amount', 'size'),
+            daily_active_customers=('customer_id', 'nunique'),
+            daily_fraud_count=('is_fraud', 'sum'),
+        )
+        result = outputs['daily_kpis'].set_index('transaction_date').sort_index()
+        assert list(result.index) == list(expected.index)
+        assert list(result['daily_transactions']) == list(expected['daily_transactions'])
+        assert list(result['daily_active_customers']) == list(expected['daily_active_customers'])
+        assert list(result['daily_fraud_count']) == list(expected['daily_fraud_count'])
+
+    def test_segment_analysis(self, dataset, outputs):
+        customers, transactions, products = dataset
+        active = customers[customers['is_active']]
+        expected_counts = active['segment'].value_counts()
+        result = outputs['segment_analysis'].set_index('segment')
+        assert result['customer_count'].to_dict() == expected_counts.to_dict()
+        active_txns = transactions[transactions['customer_id'].isin(active['customer_id'])]
+        assert result['total_transactions'].sum() == len(active_txns)
+        active_products = products[products['customer_id'].isin(active['customer_id'])]
+        assert result['total_balance'].sum() == pytest.approx(active_products['balance'].sum(), rel=1e-6)
+
+    def test_credit_risk_matches_engine(self, dataset, outputs):
+        expected = BankingAnalytics(*dataset).credit_risk_score().set_index('customer_id')
+        result = outputs['credit_risk'].set_index('customer_id').loc[expected.index]
+        np.testing.assert_allclose(result['risk_score'], expected['risk_score'], atol=0.011)
+        assert list(result['risk_level']) == list(expected['risk_level'].astype(str))
+
+    def test_rfm_scores(self, dataset, outputs):
+        rfm = outputs['rfm_scores']
+        assert len(rfm) == dataset[1]['customer_id'].nunique()
+        for col in ['recency_score', 'frequency_score', 'monetary_score']:
+            assert rfm[col].between(1, 4).all()
+        assert set(rfm['segment']).issubset({'At Risk', 'Regular', 'Loyal', 'Champion'})
+        # Quartile scoring spreads customers over the whole range
+        assert rfm['monetary_score'].nunique() == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
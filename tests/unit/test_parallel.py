@@ -0,0 +1,105 @@
+"""
+Tests for the parallel analytics executor.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services.analytics_engine import BankingAnalytics
+from backend.services.parallel import ParallelAnalytics, _partial
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def analytics(banking_dataset):
+    customers, transactions, products = banking_dataset(80, 60)
+    return BankingAnalytics(customers, transactions, products)
+
+
+@pytest.fixture(params=[('customer', 1), ('date', 1), ('customer', 2)],
+                ids=['customer-inprocess', 'date-inprocess', 'customer-pool'])
+def parallel(request, analytics):
+    partition_by, workers = request.param
+    with ParallelAnalytics(analytics, workers=workers, partition_by=partition_by,
+                           partitions=5) as executor:
+        yield executor
+
+
+# ── Map-Reduce Equivalence Tests ─────────────────────────────────────
+
+class TestParallelAnalytics:
+    def test_daily_volume(self, analytics, parallel):
+        expected = analytics.get_daily_transaction_volume().reset_index(drop=True)
+        result = parallel.get_daily_transaction_volume()
+        assert list(result['date']) == list(expected['date'])
+        np.testing.assert_allclose(result['volume'], expected['volume'])
+
+    def test_fraud_trend(self, analytics, parallel):
+        expected = analytics.get_fraud_trend().reset_index(drop=True)
+        result = parallel.get_fraud_trend()
+        assert list(result['fraud_count']) == list(expected['fraud_count'])
+        assert list(result['fraud_rate']) == list(expected['fraud_rate'])
+
+    def test_channel_analysis(self, analytics, parallel):
+        expected = analytics.get_channel_analysis()
+        result = parallel.get_channel_analysis()
+        assert list(result['channel']) == list(expected['channel'])
+        assert list(result['transaction_count']) == list(expected['transaction_count'])
+        np.testing.assert_allclose(result['total_volume'], expected['total_volume'])
+        np.testing.assert_allclose(result['fraud_rate'], expected['fraud_rate'])
+
+    def test_fraud_statistics(self, analytics, parallel):
+        expected = analytics.get_fraud_statistics()
+        result = parallel.get_fraud_statistics()
+        assert result['fraud_count'] == expected['fraud_count']
+        assert result['total_transactions'] == expected['total_transactions']
+        assert result['fraud_amount'] == pytest.approx(expected['fraud_amount'])
+
+    def test_product_performance(self, analytics, parallel):
+        expected = analytics.get_product_performance()
+        result = parallel.get_product_performance()
+        assert list(result['product_type']) == list(expected['product_type'])
+        assert list(result['customer_count']) == list(expected['customer_count'])
+        np.testing.assert_allclose(result['total_balance'], expected['total_balance'])
+
+    def test_credit_risk(self, analytics, parallel):
+        expected = analytics.credit_risk_score()
+        result = parallel.credit_risk_score()
+        np.testing.assert_allclose(result['std_amount'], expected['std_amount'], rtol=1e-6)
+        np.testing.assert_allclose(result['risk_score'], expected['risk_score'], atol=0.011)
+
+    def test_run_many(self, parallel):
+        results = parallel.run('daily_volume', 'fraud_statistics', 'credit_risk')
+        assert set(results) == {'daily_volume', 'fraud_statistics', 'credit_risk'}
+
+    def test_unknown_aggregate(self, parallel):
+        with pytest.raises(ValueError):
+            parallel.run('nope')
+
+
+def test_customer_partials_cover_only_owned_customers(analytics):
+    # More partitions than active customers leaves some partitions empty
+    with ParallelAnalytics(analytics, workers=1, partitions=200) as executor:
+        partials = [_partial(executor._columns, executor._sizes, txn, prod, ['customer'])
+                    for txn, prod in zip(executor._txn_ranges, executor._prod_ranges)]
+        assert all(len(p['customer_codes']) <= len(analytics.customers) // 200 + 1 for p in partials)
+        assert all((p['customer_codes'] % 200 == i).all() for i, p in enumerate(partials))
+        np.testing.assert_allclose(executor.credit_risk_score()['std_amount'],
+                                   analytics.credit_risk_score()['std_amount'], rtol=1e-6)
+
+
+def test_invalid_partitioning(analytics):
+    with pytest.raises(ValueError):
+        ParallelAnalytics(analytics, partition_by='city')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,102 @@
+"""
+Tests for lazy query plans.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services.analytics_engine import BankingAnalytics
+from backend.services.query_plan import AnalyticsQuery
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture
+def analytics(banking_dataset):
+    customers, transactions, products = banking_dataset(100, 90)
+    return BankingAnalytics(customers, transactions, products)
+
+
+@pytest.fixture
+def window(analytics):
+    end = analytics.transactions['transaction_date'].max().date()
+    return end - timedelta(days=30), end
+
+
+def eager_transactions(analytics, window, segments):
+    start, end = window
+    txns = analytics.transactions
+    customer_ids = analytics.customers.loc[analytics.customers['segment'].isin(segments), 'customer_id']
+    return txns[
+        (txns['transaction_date'].dt.date >= start) &
+        (txns['transaction_date'].dt.date <= end) &
+        txns['customer_id'].isin(customer_ids)
+    ]
+
+
+# ── Query Plan Tests ─────────────────────────────────────────────────
+
+class TestAnalyticsQuery:
+    def test_query_is_lazy(self, analytics):
+        query = analytics.query().segments(['Gold'])
+        assert isinstance(query, AnalyticsQuery)
+        assert analytics._indexes == {}
+
+    def test_filters_return_new_query(self, analytics, window):
+        base = analytics.query()
+        narrowed = base.between(*window)
+        assert base.count('transactions') == len(analytics.transactions)
+        assert narrowed.count('transactions') < len(analytics.transactions)
+
+    def test_daily_volume_matches_eager(self, analytics, window):
+        segments = ['Premium', 'Gold']
+        expected = analytics.get_daily_transaction_volume(
+            eager_transactions(analytics, window, segments))
+        result = analytics.query().between(*window).segments(segments).daily_volume()
+        pd.testing.assert_frame_equal(result.reset_index(drop=True),
+                                      expected.reset_index(drop=True))
+
+    def test_fraud_statistics_matches_eager(self, analytics, window):
+        segments = ['Silver']
+        expected = analytics.get_fraud_statistics(eager_transactions(analytics, window, segments))
+        result = analytics.query().between(*window).segments(segments).fraud_statistics()
+        assert result['fraud_count'] == expected['fraud_count']
+        assert result['total_amount'] == pytest.approx(expected['total_amount'])
+
+    def test_product_filter(self, analytics):
+        result = analytics.query().product_types(['Poupança']).product_performance()
+        assert list(result['product_type']) == ['Poupança']
+
+    def test_projection_pruning(self, analytics, window):
+        query = analytics.query().between(*window)
+        query.daily_volume()
+        frame = query.frame('transactions', ['amount'])
+        assert list(frame.columns) == ['amount']
+        assert set(query._frames['transactions'].columns) == {'transaction_date', 'amount'}
+
+    def test_collect_shares_scan(self, analytics, window):
+        query = analytics.query().between(*window)
+        results = query.collect('daily_volume', 'fraud_trend', 'channel_analysis')
+        assert set(results) == {'daily_volume', 'fraud_trend', 'channel_analysis'}
+        assert set(query._frames['transactions'].columns) == {
+            'transaction_date', 'amount', 'is_fraud', 'channel'}
+
+    def test_unknown_result(self, analytics):
+        with pytest.raises(ValueError):
+            analytics.query().collect('nope')
+
+    def test_explain(self, analytics, window):
+        plan = analytics.query().between(*window).segments(['Gold']).explain('daily_volume')
+        assert 'date index range' in plan
+        assert 'segment' in plan
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
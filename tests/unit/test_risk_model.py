@@ -0,0 +1,112 @@
+"""
+Tests for the credit risk model and micro-batching scorer.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+pytest.importorskip('sklearn')
+
+from backend.services.analytics_engine import BankingAnalytics
+from backend.services.risk_model import (FEATURES, MicroBatchScorer, RiskModel, build_features,
+                                         load_test, risk_labels)
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def analytics(banking_dataset):
+    customers, transactions, products = banking_dataset(300, 60)
+    return BankingAnalytics(customers, transactions, products)
+
+
+@pytest.fixture(scope='module')
+def features(analytics):
+    return build_features(analytics.customers, analytics.transactions, analytics.products)
+
+
+@pytest.fixture(scope='module')
+def model(analytics):
+    return RiskModel.train_from(analytics)
+
+
+# ── Model Tests ──────────────────────────────────────────────────────
+
+class TestRiskModel:
+    def test_features_from_aggregates(self, analytics, features):
+        assert list(features.columns) == FEATURES
+        assert len(features) == len(analytics.customers)
+        assert not features.isna().any().any()
+        risk = analytics.credit_risk_score().set_index('customer_id')
+        np.testing.assert_allclose(features['total_amount'], risk.loc[features.index, 'total_amount'])
+        np.testing.assert_allclose(features['fraud_count'], risk.loc[features.index, 'fraud_count'])
+
+    def test_model_learns_risk_levels(self, analytics, features, model):
+        labels = risk_labels(analytics).reindex(features.index)
+        predicted = model.predict_proba(features[FEATURES].to_numpy()) > 0.5
+        assert (predicted == labels.to_numpy()).mean() > 0.9
+
+    def test_save_and_load(self, features, model, tmp_path):
+        path = str(tmp_path / 'model' / 'risk.joblib')
+        model.save(path)
+        loaded = RiskModel.load(path)
+        X = features[FEATURES].to_numpy()[:20]
+        np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
+        assert loaded.metrics == model.metrics
+
+
+# ── Scorer Tests ─────────────────────────────────────────────────────
+
+class TestMicroBatchScorer:
+    def test_scores_match_direct_predict(self, features, model):
+        ids = list(features.index[:10])
+        with MicroBatchScorer(model, features) as scorer:
+            single = scorer.score(ids[0])
+            many = scorer.score(ids)
+        expected = model.predict_proba(features.loc[ids, FEATURES].to_numpy())
+        assert single == pytest.approx(expected[0])
+        np.testing.assert_allclose(many, expected)
+
+    def test_unknown_customer(self, features, model):
+        with MicroBatchScorer(model, features) as scorer:
+            with pytest.raises(KeyError):
+                scorer.submit('NOPE')
+
+    def test_concurrent_requests_are_batched(self, features, model):
+        ids = list(features.index)
+        with MicroBatchScorer(model, features, max_batch_rows=64, max_wait_ms=20) as scorer:
+            stats = load_test(scorer, ids, clients=16, requests_per_client=20)
+        assert stats['requests'] == 320
+        assert stats['rows'] == 320
+        assert stats['avg_batch_rows'] > 1
+        assert stats['throughput_rows_per_s'] > 0
+        assert stats['p99_latency_ms'] >= stats['p50_latency_ms']
+
+    def test_batch_row_limit(self, features, model):
+        ids = list(features.index)
+        with MicroBatchScorer(model, features, max_batch_rows=4, max_wait_ms=50) as scorer:
+            futures = [scorer.submit(ids[i]) for i in range(12)]
+            [future.result() for future in futures]
+            stats = scorer.stats()
+        assert stats['batches'] >= 3
+        assert stats['avg_batch_rows'] <= 4
+
+    def test_cancelled_request_does_not_stop_scorer(self, features, model):
+        ids = list(features.index)
+        with MicroBatchScorer(model, features, max_wait_ms=50) as scorer:
+            cancelled = scorer.submit(ids[0])
+            assert cancelled.cancel()
+            assert scorer.submit(ids[1]).result(timeout=2) == pytest.approx(
+                model.predict_proba(features.loc[[ids[1]], FEATURES].to_numpy())[0])
+            assert scorer._thread.is_alive()
+            assert scorer.stats()['rows'] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,159 @@
+"""
+Tests for the dirty-partition rollup scheduler.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import time
+import pytest
+import sys
+import os
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services.analytics_engine import BankingAnalytics
+from backend.services.rollups import RollupScheduler
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture
+def analytics(banking_dataset):
+    customers, transactions, products = banking_dataset(60, 45)
+    return BankingAnalytics(customers, transactions, products)
+
+
+@pytest.fixture
+def scheduler(analytics):
+    with RollupScheduler(analytics, workers=2, interval=0.05) as scheduler:
+        scheduler.refresh()
+        yield scheduler
+
+
+def expected_daily(transactions):
+    daily = transactions.groupby(transactions['transaction_date'].dt.normalize()).agg(
+        daily_transactions=('amount', 'size'),
+        daily_volume=('amount', 'sum'),
+        daily_active_customers=('customer_id', 'nunique'),
+        daily_fraud_count=('is_fraud', 'sum'),
+    )
+    daily.index.name = 'transaction_date'
+    return daily.reset_index()
+
+
+def expected_monthly(transactions):
+    months = transactions['transaction_date'].dt.to_period('M').dt.to_timestamp()
+    return transactions.groupby(months).agg(
+        monthly_transactions=('amount', 'size'),
+        monthly_volume=('amount', 'sum'),
+    ).reset_index(drop=True)
+
+
+# ── Rollup Tests ─────────────────────────────────────────────────────
+
+class TestRollups:
+    def test_initial_refresh_matches_full_computation(self, analytics, scheduler):
+        daily = scheduler.daily()
+        expected = expected_daily(analytics.transactions)
+        pd.testing.assert_frame_equal(daily[expected.columns], expected, check_dtype=False)
+        monthly = scheduler.monthly()
+        pd.testing.assert_frame_equal(monthly[['monthly_transactions', 'monthly_volume']],
+                                      expected_monthly(analytics.transactions), check_dtype=False)
+        assert scheduler.metrics()['dirty_partitions'] == 0
+
+    def test_segment_rollup_totals(self, analytics, scheduler):
+        segments = scheduler.segments()
+        assert segments['transactions'].sum() == len(analytics.transactions)
+        assert set(segments['segment']) <= set(analytics.customers['segment'])
+
+    def test_unknown_rollup(self, scheduler):
+        with pytest.raises(ValueError):
+            scheduler.rollup('weekly')
+
+
+# ── Dirty Partition Tests ────────────────────────────────────────────
+
+class TestDirtyPartitions:
+    def test_append_marks_only_its_dates(self, analytics, scheduler):
+        day = analytics.transactions['transaction_date'].max().normalize()
+        new_rows = analytics.transactions[analytics.transactions['transaction_date'] >= day].head(3)
+        new_rows = new_rows.assign(transaction_id=['NEW_1', 'NEW_2', 'NEW_3'])
+        scheduler.append(new_rows)
+        dirty = scheduler.dirty
+        assert dirty['daily'] == [day]
+        assert dirty['segment'] == [day]
+        assert dirty['monthly'] == [day.replace(day=1)]
+
+        scanned = scheduler.metrics()['rollups']['daily']['rows_scanned']
+        scheduler.refresh()
+        day_rows = (analytics.transactions['transaction_date'].dt.normalize() == day).sum()
+        assert scheduler.metrics()['rollups']['daily']['rows_scanned'] - scanned == day_rows
+        pd.testing.assert_frame_equal(scheduler.daily()[expected_daily(analytics.transactions).columns],
+                                      expected_daily(analytics.transactions), check_dtype=False)
+
+    def test_append_extends_indexes_for_the_next_refresh(self, analytics, scheduler):
+        scheduler.refresh()
+        day = analytics.transactions['transaction_date'].max().normalize()
+        new_rows = analytics.transactions.tail(3).assign(
+            transaction_id=['EXT_1', 'EXT_2', 'EXT_3'], transaction_date=day,
+            customer_id=[analytics.transactions['customer_id'].iloc[0], 'UNKNOWN', 'UNKNOWN'])
+        scheduler.append(new_rows)
+        # The refresh reads indexes the append extended, not ones rebuilt from scratch
+        assert 'transaction_date' in analytics._indexes
+        assert ('transactions', 'segment') in analytics._indexes
+        scheduler.refresh()
+        segments = analytics.customers.set_index('customer_id')['segment']
+        rows = analytics.transactions[analytics.transactions['transaction_date'].dt.normalize() == day]
+        expected = rows.groupby(rows['customer_id'].map(segments))['amount'].size()
+        refreshed = scheduler.segments()
+        refreshed = refreshed[refreshed['transaction_date'] == day].set_index('segment')['transactions']
+        assert refreshed.to_dict() == expected.to_dict()
+        assert scheduler.metrics()['snapshot_seconds'] > 0
+
+    def test_correction_refreshes_old_and_new_dates(self, analytics, scheduler):
+        row = analytics.transactions.iloc[[0]]
+        old_day = row['transaction_date'].iloc[0].normalize()
+        new_date = analytics.transactions['transaction_date'].max()
+        assert scheduler.correct(row.assign(transaction_date=new_date, amount=1.0)) == 1
+        assert scheduler.dirty['daily'] == sorted({old_day, new_date.normalize()})
+        scheduler.refresh()
+        pd.testing.assert_frame_equal(scheduler.daily()[expected_daily(analytics.transactions).columns],
+                                      expected_daily(analytics.transactions), check_dtype=False)
+
+    def test_correction_refreshes_leaderboard_and_cohorts(self, analytics, scheduler):
+        analytics.top_customers('volume')
+        analytics.cohorts()
+        row = analytics.transactions.iloc[[0]]
+        scheduler.correct(row.assign(amount=10_000_000.0))
+        fresh = BankingAnalytics(analytics.customers, analytics.transactions, analytics.products)
+        pd.testing.assert_frame_equal(analytics.top_customers('volume', 3), fresh.top_customers('volume', 3))
+        assert analytics.top_customers('volume', 1)['customer_id'].iloc[0] == row['customer_id'].iloc[0]
+        pd.testing.assert_frame_equal(analytics.cohorts().volume_matrix(), fresh.cohorts().volume_matrix())
+
+    def test_unknown_correction_is_ignored(self, scheduler):
+        missing = pd.DataFrame({'transaction_id': ['NOPE'], 'amount': [1.0],
+                                'transaction_date': [pd.Timestamp('2020-01-01')]})
+        assert scheduler.correct(missing) == 0
+        assert scheduler.metrics()['dirty_partitions'] == 0
+
+    def test_background_refresh(self, analytics, scheduler):
+        new_rows = analytics.transactions.head(2).assign(transaction_id=['BG_1', 'BG_2'])
+        scheduler.start()
+        scheduler.append(new_rows)
+        deadline = time.monotonic() + 5
+        while scheduler.metrics()['dirty_partitions'] and time.monotonic() < deadline:
+            time.sleep(0.02)
+        scheduler.stop()
+        assert scheduler.metrics()['dirty_partitions'] == 0
+        assert scheduler.daily()['daily_transactions'].sum() == len(analytics.transactions)
+
+    def test_metrics_report_lag_and_cost(self, analytics, scheduler):
+        scheduler.mark_dirty(analytics.transactions['transaction_date'].head(1))
+        assert scheduler.metrics()['lag_seconds'] >= 0
+        stats = scheduler.metrics()['rollups']['segment']
+        assert stats['partitions'] > 0 and stats['seconds'] > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
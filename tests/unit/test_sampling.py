@@ -0,0 +1,109 @@
+"""
+Tests for the stratified approximate query mode.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services.analytics_engine import BankingAnalytics
+from backend.services.data_generator import BankingDataGenerator
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def analytics(banking_dataset):
+    customers, transactions, products = banking_dataset(300, 120)
+    return BankingAnalytics(customers, transactions, products)
+
+
+@pytest.fixture(scope='module')
+def window(analytics):
+    end = analytics.transactions['transaction_date'].max()
+    return analytics.query().between(end - pd.Timedelta(days=60), end).segments(['Gold', 'Silver', 'Bronze'])
+
+
+# ── Sample Tests ─────────────────────────────────────────────────────
+
+class TestStratifiedSample:
+    def test_every_stratum_is_represented(self, analytics):
+        sample = analytics.sample()
+        draw = sample.draw(500)
+        assert (draw.taken >= np.minimum(sample.min_per_stratum, sample._sizes)).all()
+        fraud_rows = draw.columns['is_fraud'].sum()
+        assert fraud_rows >= min(sample.min_per_stratum, analytics.transactions['is_fraud'].sum())
+
+    def test_samples_are_persistent_and_nested(self, analytics):
+        sample = analytics.sample()
+        assert analytics.sample() is sample
+        small, large = sample.draw(300), sample.draw(3000)
+        assert sample.draw(300) is small
+        assert set(zip(small.columns['date'], small.columns['amount'])) <= \
+            set(zip(large.columns['date'], large.columns['amount']))
+
+    def test_rebuilt_when_transactions_change(self):
+        generator = BankingDataGenerator(seed=7)
+        customers = generator.generate_customers(30)
+        engine = BankingAnalytics(customers, generator.generate_transactions(customers, days_back=10),
+                                  generator.generate_products(customers))
+        sample = engine.sample()
+        engine.transactions = engine.transactions.iloc[:-5].copy()
+        engine._indexes.clear()
+        assert engine.sample() is not sample
+        assert engine.sample().population == len(engine.transactions)
+
+    def test_latency_target_sizes_the_sample(self, analytics):
+        sample = analytics.sample()
+        assert sample.rows_for(0.0001) <= sample.rows_for(0.01) <= sample.population
+
+
+# ── Estimate Tests ───────────────────────────────────────────────────
+
+class TestApproximateQuery:
+    def test_full_sample_is_exact(self, analytics, window):
+        approx = window.approximate(rows=len(analytics.transactions))
+        exact = window.fraud_statistics()
+        estimate = approx.fraud_statistics()
+        for key in ['total_transactions', 'fraud_count', 'fraud_rate', 'fraud_amount', 'total_amount']:
+            assert estimate[key] == pytest.approx(float(exact[key]))
+            low, high = estimate['confidence_intervals'][key]
+            assert high - low == pytest.approx(0, abs=1e-6)
+
+    def test_intervals_cover_exact_values(self, window):
+        approx = window.approximate(rows=800)
+        exact = window.fraud_statistics()
+        estimate = approx.fraud_statistics()
+        assert estimate['approximate'] is True
+        for key in ['total_transactions', 'fraud_rate', 'total_amount']:
+            low, high = estimate['confidence_intervals'][key]
+            assert low <= exact[key] <= high
+
+    def test_channel_analysis_matches_engine_shape(self, analytics, window):
+        exact = window.channel_analysis()
+        estimate = window.approximate(rows=len(analytics.transactions)).channel_analysis()
+        assert list(estimate['channel']) == list(exact['channel'])
+        pd.testing.assert_frame_equal(estimate[exact.columns], exact, check_dtype=False, atol=0.01)
+        approx = window.approximate(rows=800).channel_analysis()
+        assert (approx['total_volume_low'] <= approx['total_volume']).all()
+        assert (approx['total_volume'] <= approx['total_volume_high']).all()
+
+    def test_daily_volume(self, analytics, window):
+        exact = window.daily_volume().reset_index(drop=True)
+        estimate = window.approximate(rows=len(analytics.transactions)).daily_volume()
+        pd.testing.assert_frame_equal(estimate[['date', 'volume']], exact, check_dtype=False, atol=0.01)
+
+    def test_engine_approximate_covers_all_rows(self, analytics):
+        estimate = analytics.approximate(latency_target=0.001).fraud_statistics()
+        low, high = estimate['confidence_intervals']['total_transactions']
+        assert low <= len(analytics.transactions) <= high
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,140 @@
+"""
+Tests for startup profiling helpers.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import sys
+import os
+import ast
+import importlib.util
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services import startup
+from backend.services.startup import (
+    DASHBOARD_MODULES, PROFILER, BackgroundWarmup, PanelRecorder, StartupProfiler, import_times,
+    lazy_import, main
+)
+
+APP_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'frontend', 'app.py')
+
+
+# ── Profiler Tests ───────────────────────────────────────────────────
+
+class TestStartupProfiler:
+    def test_records_phase_once(self):
+        profiler = StartupProfiler()
+        with profiler.phase('load'):
+            pass
+        first = profiler.phases['load']
+        with profiler.phase('load'):
+            pass
+        assert profiler.phases['load'] == first
+
+    def test_report_ordered_by_start(self):
+        profiler = StartupProfiler()
+        with profiler.phase('b'):
+            pass
+        with profiler.phase('a'):
+            pass
+        report = profiler.report()
+        assert [row['phase'] for row in report] == ['b', 'a']
+        assert all(row['duration_ms'] >= 0 for row in report)
+
+    def test_lazy_import(self):
+        sys.modules.pop('colorsys', None)
+        module = lazy_import('colorsys')
+        assert module.__name__ == 'colorsys'
+        assert 'import colorsys' in PROFILER.phases
+
+
+# ── Panel Recorder Tests ─────────────────────────────────────────────
+
+class TestPanelRecorder:
+    def test_untagged_sessions_are_not_recorded(self):
+        recorder = PanelRecorder()
+        with recorder.panel(None, 'kpis'):
+            pass
+        assert recorder._records == {}
+
+    def test_records_wall_and_cpu_per_session(self):
+        recorder = PanelRecorder()
+        with recorder.panel('a', 'kpis'):
+            sum(range(10000))
+        with recorder.panel('b', 'chart'):
+            pass
+        (name, wall, cpu), = recorder.drain('a')
+        assert name == 'kpis' and wall > 0 and cpu >= 0
+        assert recorder.drain('a') == []
+        assert [record[0] for record in recorder.drain('b')] == ['chart']
+
+
+# ── Background Warm-up Tests ─────────────────────────────────────────
+
+class TestBackgroundWarmup:
+    def test_result(self):
+        release = threading.Event()
+        warmup = BackgroundWarmup(lambda: release.wait(5) and 42)
+        assert not warmup.ready
+        release.set()
+        assert warmup.result() == 42
+        assert warmup.ready
+
+    def test_error_is_reraised(self):
+        def fail():
+            raise RuntimeError('boom')
+
+        with pytest.raises(RuntimeError):
+            BackgroundWarmup(fail).result()
+
+    def test_dashboard_retries_failed_warmup(self, monkeypatch):
+        pytest.importorskip('streamlit')
+        # Eager mode, so importing the page does not start a real warm-up
+        monkeypatch.setattr(startup, 'LAZY', False)
+        spec = importlib.util.spec_from_file_location('dashboard_under_test', APP_PATH)
+        app = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(app)
+
+        def fail():
+            raise RuntimeError('boom')
+
+        monkeypatch.setattr(app, 'build_analytics', fail)
+        with pytest.raises(RuntimeError, match='boom'):
+            app.dashboard_engine()
+        monkeypatch.setattr(app, 'build_analytics', lambda: 'engine')
+        assert app.dashboard_engine() == 'engine'
+        app.analytics_warmup.clear()
+
+
+# ── Import Timing Tests ──────────────────────────────────────────────
+
+class TestImportTimes:
+    def test_reports_requested_module(self):
+        rows = import_times(['json'])
+        top_level = [row['module'] for row in rows if row['top_level']]
+        assert 'json' in top_level
+
+    def test_dashboard_modules_cover_app_imports(self):
+        with open(APP_PATH) as handle:
+            tree = ast.parse(handle.read())
+        imported = set()
+        for node in tree.body:
+            statements = node.body if isinstance(node, ast.With) else [node]
+            for statement in statements:
+                if isinstance(statement, ast.Import):
+                    imported.update(alias.name for alias in statement.names)
+                elif isinstance(statement, ast.ImportFrom):
+                    imported.add(statement.module)
+        imported = {name for name in imported if name.split('.')[0] not in sys.stdlib_module_names}
+        assert imported <= set(DASHBOARD_MODULES)
+
+    def test_budget_exceeded(self, capsys):
+        assert main(['--budget', '0', 'json']) == 1
+        assert 'Over cold-start budget' in capsys.readouterr().out
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,87 @@
+"""
+Tests for the Monte Carlo portfolio stress test.
+
+Author: Gabriel Demetrios Lafis
+"""
+
+import pytest
+import subprocess
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.services.analytics_engine import BankingAnalytics
+from backend.services.stress_test import PRODUCT_PARAMETERS, SEGMENT_MULTIPLIERS, StressTest
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def analytics(banking_dataset):
+    customers, transactions, products = banking_dataset(200, 10)
+    return BankingAnalytics(customers, transactions, products)
+
+
+@pytest.fixture(scope='module')
+def stress(analytics):
+    return StressTest(analytics.products, analytics.customers)
+
+
+# ── Stress Test Tests ────────────────────────────────────────────────
+
+class TestStressTest:
+    def test_exposures_are_pre_aggregated(self, analytics, stress):
+        merged = analytics.products.merge(analytics.customers[['customer_id', 'segment']], on='customer_id')
+        expected = merged.groupby(['segment', 'product_type'])['balance'].sum()
+        assert len(stress.groups) == len(expected)
+        np.testing.assert_allclose(stress.groups.set_index(['segment', 'product_type'])['exposure']
+                                   .loc[expected.index].to_numpy(), expected.to_numpy())
+
+    def test_chunks_respect_memory_cap(self, stress):
+        size = stress.chunk_size(memory_cap_mb=0.01)
+        assert size * len(stress.groups) * 8 * 6 <= 0.01 * 1024 * 1024
+        result = stress.run(scenarios=size * 3 + 1, memory_cap_mb=0.01, workers=1)
+        assert result.scenarios == size * 3 + 1
+
+    def test_results_independent_of_worker_count(self, stress):
+        serial = stress.run(scenarios=2000, seed=7, workers=1, memory_cap_mb=0.05)
+        parallel = stress.run(scenarios=2000, seed=7, workers=2, memory_cap_mb=0.05)
+        np.testing.assert_array_equal(serial.losses, parallel.losses)
+
+    def test_expected_credit_loss_matches_pd_times_lgd(self, analytics):
+        no_market = {product: (pd_, lgd, 0.0) for product, (pd_, lgd, _) in PRODUCT_PARAMETERS.items()}
+        stress = StressTest(analytics.products, analytics.customers, parameters=no_market)
+        result = stress.run(scenarios=20000, workers=1)
+        groups = stress.groups
+        rates = groups['product_type'].map(lambda p: no_market[p][0] * no_market[p][1])
+        expected = (groups['exposure'] * rates * groups['segment'].map(SEGMENT_MULTIPLIERS)).sum()
+        assert result.losses.sum(axis=1).mean() == pytest.approx(expected, rel=0.05)
+
+    def test_riskless_products_lose_nothing(self, analytics):
+        riskless = {product: (0.0, 0.0, 0.0) for product in PRODUCT_PARAMETERS}
+        result = StressTest(analytics.products, analytics.customers, parameters=riskless).run(500, workers=1)
+        assert np.abs(result.losses).max() == 0
+
+    def test_quantile_report(self, analytics):
+        report = analytics.stress_test(scenarios=3000, workers=1)
+        assert list(report['segment']) == sorted(analytics.customers['segment'].unique()) + ['Total']
+        assert (report['loss_p50'] <= report['loss_p95']).all()
+        assert (report['loss_p95'] <= report['loss_p99']).all()
+        assert (report['loss_p99'] <= report['expected_shortfall_p99']).all()
+        total = report.set_index('segment').loc['Total', 'exposure']
+        assert total == pytest.approx(analytics.products['balance'].sum(), rel=1e-6)
+
+
+def test_engine_import_does_not_load_scipy():
+    root = os.path.join(os.path.dirname(__file__), '..', '..')
+    code = ("import sys; import backend.services.analytics_engine; "
+            "print('scipy.special' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])